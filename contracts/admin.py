@@ -1,9 +1,15 @@
 from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html
 from .models import (
     ContractTemplate, Contract, ContractParty,
     ContractSignature, ContractApproval, ContractComment, UserProfile, Notification,
-    SubscriptionPlan, UserSubscription, Payment, PdfDownloadAccess
+    UserContractStats, NumberSequence, EmailOutbox, DailyMetrics, SubscriptionPlan, UserSubscription, Payment, PdfDownloadAccess
 )
+from .pdf import pdf_filename, render_contract
 
 @admin.register(ContractTemplate)
 class ContractTemplateAdmin(admin.ModelAdmin):
@@ -33,7 +39,7 @@ class ContractTemplateAdmin(admin.ModelAdmin):
 
 @admin.register(Contract)
 class ContractAdmin(admin.ModelAdmin):
-    list_display = ['contract_number', 'title', 'creator', 'status', 'visibility', 'is_self_contract', 'start_date', 'duration_display', 'created_at', 'total_parties', 'signed_parties']
+    list_display = ['contract_number', 'title', 'creator', 'status', 'visibility', 'is_self_contract', 'start_date', 'duration_display', 'created_at', 'total_parties', 'signed_parties', 'pdf_link']
     list_filter = ['status', 'visibility', 'is_self_contract', 'is_indefinite', 'system_approved', 'created_at', 'start_date']
     search_fields = ['contract_number', 'title', 'content', 'creator__username', 'creator__email']
     readonly_fields = ['id', 'contract_number', 'created_at', 'updated_at', 'completed_at']
@@ -42,6 +48,35 @@ class ContractAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).prefetch_related('parties', 'signatures')
 
+    def get_urls(self):
+        urls = [
+            path(
+                '<uuid:pk>/pdf/',
+                self.admin_site.admin_view(self.pdf_view),
+                name='contracts_contract_pdf',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def pdf_view(self, request, pk):
+        """Sözleşme PDF'ini görünürlükten bağımsız olarak indir"""
+        contract = get_object_or_404(
+            Contract.objects.prefetch_related('parties__user', 'signatures'),
+            pk=pk
+        )
+        return HttpResponse(
+            render_contract(contract),
+            content_type='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename="{pdf_filename(contract)}"'},
+        )
+
+    @admin.display(description='PDF')
+    def pdf_link(self, obj):
+        return format_html(
+            '<a href="{}">İndir</a>',
+            reverse('admin:contracts_contract_pdf', args=[obj.pk])
+        )
+
 @admin.register(ContractParty)
 class ContractPartyAdmin(admin.ModelAdmin):
     list_display = ['display_name', 'display_email', 'contract', 'role', 'invitation_status', 'invited_at', 'joined_at', 'declined_at']
@@ -112,6 +147,47 @@ class UserProfileAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_value']
+
+
+@admin.register(UserContractStats)
+class UserContractStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created_count', 'signed_count', 'invited_count', 'declined_count', 'updated_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['created_count', 'signed_count', 'invited_count', 'declined_count', 'notification_version', 'updated_at']
+    ordering = ['-updated_at']
+
+
+@admin.register(DailyMetrics)
+class DailyMetricsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'new_users', 'contracts_created', 'contracts_completed', 'revenue', 'updated_at']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+    readonly_fields = [
+        'date', 'new_users', 'contracts_created', 'contracts_completed',
+        'revenue', 'payments_by_type', 'notifications_by_type', 'updated_at'
+    ]
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    readonly_fields = ['attempts', 'last_error', 'locked_at', 'created_at', 'sent_at']
+    ordering = ['-created_at']
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_at=None
+        )
+        self.message_user(request, f'{updated} e-posta tekrar kuyruğa alındı.')
+    requeue.short_description = 'Seçili e-postaları tekrar kuyruğa al'
+
+
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['title', 'recipient', 'sender', 'notification_type', 'priority', 'is_read', 'is_sent', 'created_at']
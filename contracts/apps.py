@@ -4,3 +4,38 @@ from django.apps import AppConfig
 class ContractsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contracts'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+
+        # User modeli bu uygulamada değil; arama anahtarları kaydedildikçe güncellenir
+        post_save.connect(refresh_user_search_keys, sender=User, dispatch_uid='contracts.user_search_keys')
+        # Dashboard kullanıcı widget'ı
+        post_save.connect(invalidate_user_widgets, sender=User, dispatch_uid='contracts.user_widgets')
+        post_delete.connect(invalidate_user_widgets, sender=User, dispatch_uid='contracts.user_widgets_delete')
+
+        # Anonim sayfa önbelleği (ana sayfa, sözleşme havuzu)
+        from .models import Contract
+        from .page_cache import invalidate_for_contract_delete, invalidate_for_contract_save
+        post_save.connect(invalidate_for_contract_save, sender=Contract, dispatch_uid='contracts.public_pages')
+        post_delete.connect(invalidate_for_contract_delete, sender=Contract, dispatch_uid='contracts.public_pages_delete')
+
+
+SEARCH_KEY_FIELDS = {'first_name', 'last_name', 'username', 'email'}
+
+
+def refresh_user_search_keys(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Girişte sadece last_login güncellenir; anahtarlara dokunmaya gerek yok
+    if raw or (update_fields is not None and not SEARCH_KEY_FIELDS & set(update_fields)):
+        return
+    from .models import UserSearchKey
+    UserSearchKey.refresh_for([instance])
+
+
+def invalidate_user_widgets(sender, instance, raw=False, created=True, update_fields=None, **kwargs):
+    # last_login güncellemeleri sayıları değiştirmez
+    if raw or (not created and update_fields is not None and 'is_active' not in update_fields):
+        return
+    from .widgets import invalidate_widgets
+    invalidate_widgets('user')
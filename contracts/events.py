@@ -0,0 +1,133 @@
+"""
+Bildirim olayları için süreç içi yayın/abone (pub/sub) altyapısı.
+
+Model kancaları (senkron thread'ler) olay yayınlar, SSE ve long-polling
+view'ları (ASGI event loop'u) bu olayları kullanıcı bazlı kuyruklardan okur.
+Harici bir servis (Redis vb.) gerektirmez; tek süreçli dağıtımlar ve yerel
+testler için tasarlanmıştır.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+
+class Subscription:
+    """Tek bir bağlantının olay kuyruğu"""
+
+    def __init__(self, user_id, loop, maxsize=100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _put(self, event):
+        # Yavaş istemci kuyruğu doldurduysa en eski olayı at
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        """Herhangi bir thread'den güvenle çağrılabilir"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop kapanmış; bağlantı zaten sonlanmış
+            pass
+
+    async def get(self, timeout=None):
+        """Sıradaki olayı bekle, zaman aşımında None döndür"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self):
+        """Kuyrukta bekleyen tüm olayları döndür"""
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+
+class NotificationBroker:
+    """Kullanıcı bazlı süreç içi olay dağıtıcısı"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def subscribe(self, user_id):
+        """Çalışan event loop içinden çağrılmalı"""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event_type, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        event = {'type': event_type, 'data': data}
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+broker = NotificationBroker()
+
+
+def publish_on_commit(user_id, event_type, build_data):
+    """
+    Transaction commit edildikten sonra olay yayınla.
+    build_data sadece kullanıcının açık bağlantısı varsa çağrılır, böylece
+    dinleyen yokken ek sorgu çalışmaz.
+    """
+    def _publish():
+        if broker.has_subscribers(user_id):
+            broker.publish(user_id, event_type, build_data())
+
+    if user_id and broker.has_subscribers(user_id):
+        transaction.on_commit(_publish)
+
+
+def serialize_notification(notification):
+    """
+    Bildirimi dropdown ve akış için JSON'a dönüştür.
+    Göreli süre ("5 dakika önce") istemcide hesaplanır; yanıt ETag ile
+    önbelleğe alındığından burada zaman damgası döner.
+    """
+    return {
+        'id': str(notification.id),
+        'title': notification.title,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat(),
+        'icon_class': notification.icon_class,
+        'color_class': notification.color_class,
+        'action_url': notification.get_action_url(),
+    }
+
+
+def unread_count_payload(user_id):
+    from .models import Notification
+    return {
+        'unread_notifications_count': Notification.objects.filter(
+            recipient_id=user_id,
+            is_read=False
+        ).count()
+    }
+
+
+def publish_unread_count(user_id):
+    """Okunmamış bildirim sayısı değişti"""
+    publish_on_commit(user_id, 'counts', lambda: unread_count_payload(user_id))
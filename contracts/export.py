@@ -0,0 +1,176 @@
+"""
+Sözleşme PDF'lerinin toplu ZIP olarak dışa aktarımı.
+
+PDF'ler bir ProcessPoolExecutor üzerinde paralel üretilir ve ZIP arşivi
+bellekte biriktirilmeden, her dosya hazır oldukça parça parça akıtılır.
+Aynı anda işlenen belge sayısı sınırlı olduğundan bellek kullanımı dışa
+aktarılan sözleşme sayısından bağımsızdır. Web istekleri süreç başına bir
+kez başlatılan ortak havuzu kullanır; her istekte yeni süreçler açılmaz.
+Üretilemeyen belgeler arşivi yarıda kesmez, yerine hata dosyası yazılır.
+"""
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Contract
+from .pdf import PdfRenderError, pdf_filename, render_contract, render_error_pdf
+
+
+def contracts_for_export(user=None, creator=None, date_from=None, date_to=None, status='completed'):
+    """
+    Dışa aktarılacak sözleşmeler.
+    user: oluşturan ya da taraf olduğu sözleşmeler, creator: sadece oluşturduğu,
+    date_from/date_to: tamamlanma tarihi aralığı (dahil).
+    """
+    contracts = Contract.objects.all()
+    if status:
+        contracts = contracts.filter(status=status)
+    if user is not None:
+        contracts = contracts.filter(Q(creator=user) | Q(parties__user=user)).distinct()
+    if creator is not None:
+        contracts = contracts.filter(creator=creator)
+    if date_from:
+        contracts = contracts.filter(completed_at__date__gte=date_from)
+    if date_to:
+        contracts = contracts.filter(completed_at__date__lte=date_to)
+    return contracts.order_by('contract_number').prefetch_related('parties__user', 'signatures')
+
+
+def _init_worker():
+    # spawn ile başlatılan süreçlerde Django ayarlarını yükle
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def export_workers():
+    return getattr(settings, 'CONTRACT_PDF_EXPORT_WORKERS', None) or os.cpu_count() or 1
+
+
+def shared_executor(broken=None):
+    """
+    Dışa aktarımların paylaştığı süreç havuzu (ilk kullanımda başlatılır).
+    broken: çökmüş bir worker yüzünden kullanılamayan havuz; hâlâ ortak havuzsa yenisi açılır.
+    """
+    global _executor
+    with _executor_lock:
+        if broken is not None and _executor is broken:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=export_workers(), initializer=_init_worker)
+        return _executor
+
+
+def _render_job(contract):
+    """Worker sürecinde çalışır; sonucu ana sürece (arşiv adı, PDF) olarak döndür"""
+    from .pdf_cache import pdf_cache
+    try:
+        # Tamamlanan sözleşmelerin çoğu önbellekte hazırdır
+        with open(pdf_cache.get(contract), 'rb') as pdf_file:
+            data = pdf_file.read()
+    except PdfRenderError:
+        data = render_error_pdf()
+    except OSError:
+        data = render_contract(contract)
+    return f'{contract.contract_number}_{pdf_filename(contract)}', data
+
+
+class _ZipStream:
+    """zipfile'ın yazdığı baytları toplayan, geri sarılamayan çıktı"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_contract_pdfs_zip(contracts, workers=None):
+    """
+    Sözleşme PDF'lerini içeren ZIP arşivini parça parça üret (generator).
+    Her PDF hazır olduğu anda arşive eklenir ve bayt olarak dışarı verilir.
+    workers verilirse bu dışa aktarım için ayrı bir havuz açılır (yönetim komutu).
+    """
+    shared = not workers
+    if not shared:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    else:
+        executor = shared_executor()
+        workers = export_workers()
+    # Kuyrukta bekleyen iş sayısı sınırlı; tüm sözleşmeler belleğe alınmaz
+    max_in_flight = workers * 2
+
+    stream = _ZipStream()
+    # PDF'ler zaten sıkıştırılmış; tekrar sıkıştırmak sadece CPU harcar
+    archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)
+    pending = {}
+
+    def submit(contract):
+        nonlocal executor
+        try:
+            future = executor.submit(_render_job, contract)
+        except BrokenProcessPool:
+            if not shared:
+                raise
+            executor = shared_executor(broken=executor)
+            future = executor.submit(_render_job, contract)
+        pending[future] = contract
+
+    def write_done(done):
+        for future in done:
+            contract = pending.pop(future)
+            try:
+                name, data = future.result()
+            except Exception as e:
+                # Tek belgenin hatası arşivi yarıda kesmesin
+                print(f"PDF dışa aktarım hatası ({contract.contract_number}): {e}")
+                name = f'{contract.contract_number}_HATA.txt'
+                data = f'Sozlesme #{contract.contract_number} PDF olarak uretilemedi: {e}\n'.encode('utf-8')
+            archive.writestr(name, data)
+
+    try:
+        for contract in contracts.iterator(chunk_size=100):
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                write_done(done)
+                yield stream.pop()
+            submit(contract)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            write_done(done)
+            yield stream.pop()
+
+        archive.close()
+        yield stream.pop()
+    finally:
+        # İstemci bağlantıyı kestiğinde bu dışa aktarımın bekleyen işlerini iptal et
+        for future in pending:
+            future.cancel()
+        if not shared:
+            executor.shutdown(wait=False, cancel_futures=True)
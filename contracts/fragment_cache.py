@@ -0,0 +1,33 @@
+"""
+contract_detail şablon parçaları için sözleşme başına sürüm anahtarı.
+
+Ağır parçalar (içerik, taraf listesi, imza listesi, yorumlar) {% cache %}
+ile sözleşmenin veritabanındaki durumundan türetilen bir anahtarla saklanır:
+updated_at, taraf/imza/red sayaçları, katılan taraf sayısı ve yorumların
+sayısı ile son değişiklik zamanı. Bu değerler sözleşme sorgusuna
+(with_fragment_state) eklendiği için ek sorgu gerekmez ve anahtar her
+süreçte aynıdır; ortak bir önbellek sunucusu ya da geçersiz kılma sinyali
+gerekmez. Eski parçalar bir daha okunmaz ve CONTRACT_FRAGMENT_CACHE_TTL
+sonunda önbellekten düşer. Kullanıcıya özel kısımlar (imza butonu, taraf
+çıkarma formu) önbelleğe alınmaz.
+"""
+from django.conf import settings
+
+
+def fragment_cache_ttl():
+    return getattr(settings, 'CONTRACT_FRAGMENT_CACHE_TTL', 3600)
+
+
+def contract_fragment_version(contract):
+    """with_fragment_state ile yüklenmiş sözleşmenin parça anahtarı"""
+    state = [
+        contract.updated_at.isoformat(),
+        contract.party_count,
+        contract.signed_count,
+        contract.declined_count,
+        contract.accepted_party_count,
+        contract.comment_count,
+        contract.last_comment_at.isoformat() if contract.last_comment_at else '',
+    ]
+    # {% cache %} vary_on değerlerini kendisi özetler
+    return ':'.join(map(str, state))
@@ -0,0 +1,61 @@
+from django.utils.functional import cached_property
+
+from .models import Notification, UserContractStats
+
+
+class InboxSummary:
+    """
+    Request bazlı gelen kutusu özeti.
+    Sayaçlar ilk erişimde hesaplanır ve request boyunca tekrar sorgulanmaz;
+    hiç kullanılmazsa veritabanına gidilmez.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def stats(self):
+        if not self.user.is_authenticated:
+            return None
+        return UserContractStats.for_user(self.user)
+
+    def _counter(self, field):
+        return getattr(self.stats, field) if self.stats else 0
+
+    @property
+    def invited_contracts_count(self):
+        return self._counter('invited_count')
+
+    @property
+    def declined_contracts_count(self):
+        return self._counter('declined_count')
+
+    @property
+    def created_contracts_count(self):
+        return self._counter('created_count')
+
+    @property
+    def signed_contracts_count(self):
+        return self._counter('signed_count')
+
+    @cached_property
+    def unread_notifications_count(self):
+        if not self.user.is_authenticated:
+            return 0
+        return Notification.objects.filter(recipient=self.user, is_read=False).count()
+
+    def as_dict(self):
+        """Bildirim API'leri ve akış için sayaçlar"""
+        return {
+            'declined_contracts_count': self.declined_contracts_count,
+            'invited_contracts_count': self.invited_contracts_count,
+            'unread_notifications_count': self.unread_notifications_count,
+        }
+
+
+def get_inbox(request):
+    """Request'e bağlı özeti döndür (middleware yoksa oluştur)"""
+    inbox = getattr(request, 'inbox', None)
+    if inbox is None:
+        inbox = request.inbox = InboxSummary(request.user)
+    return inbox
@@ -0,0 +1,383 @@
+import json
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, count
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from contracts.models import (
+    Contract, ContractParty, ContractSignature, Notification, SubscriptionPlan,
+    UserSubscription,
+)
+from contracts.querybudget import percentile
+from contracts.widgets import DASHBOARD_WIDGETS
+
+USER_PREFIX = 'bench_'
+STAFF_USERNAME = f'{USER_PREFIX}admin'
+BATCH_SIZE = 5000
+
+CONTRACT_STATUSES = ['completed', 'pending_signatures', 'draft', 'archived']
+CONTRACT_STATUS_WEIGHTS = [40, 35, 20, 5]
+NOTIFICATION_TYPES = [choice for choice, _ in Notification.TYPE_CHOICES]
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def manual_timestamps(*fields):
+    """bulk_create sırasında auto_now_add alanlarına verilen tarihler korunur"""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Sik kullanilan view\'larin gecikmesini olc: buyuk ornek veri (bulk_create) olusturur, '
+        'view\'lari test client ile cagirir, p50/p95/p99 ve sorgu sayilarini JSON rapora yazar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000, help='Olusturulacak kullanici sayisi')
+        parser.add_argument('--contracts', type=int, default=500000, help='Olusturulacak sozlesme sayisi')
+        parser.add_argument('--max-parties', type=int, default=4, help='Sozlesme basina en fazla taraf (olusturan dahil)')
+        parser.add_argument('--notifications', type=int, default=2000000, help='Olusturulacak bildirim sayisi')
+        parser.add_argument('--iterations', type=int, default=50, help='Her view icin olcum sayisi')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele veri tohumu')
+        parser.add_argument('--output', default='bench_report.json', help='JSON rapor dosyasi')
+        parser.add_argument('--baseline', help='Karsilastirilacak onceki rapor (JSON)')
+        parser.add_argument(
+            '--max-regression', type=float, default=20.0,
+            help='Baseline\'a gore izin verilen en fazla p95 artisi (yuzde)',
+        )
+        parser.add_argument('--keep', action='store_true', help='Ornek veriyi silme (sonraki olcumler --no-seed ile)')
+        parser.add_argument('--no-seed', action='store_true', help='Veri olusturma; onceden --keep ile birakilan veriyi kullan')
+
+    def handle(self, *args, **options):
+        if options['max_parties'] < 2:
+            raise CommandError('--max-parties en az 2 olmali')
+
+        if options['no_seed']:
+            report = self.run(options)
+        else:
+            if User.objects.filter(username__startswith=USER_PREFIX).exists():
+                raise CommandError('Onceki olcum verisi mevcut; --no-seed ile calistirin')
+            # Ornek veri transaction icinde olusturulur; --keep verilmezse sonunda geri alinir
+            try:
+                with transaction.atomic():
+                    dataset = self.seed(options)
+                    report = self.run(options)
+                    report['seed'] = dataset
+                    if not options['keep']:
+                        raise _Rollback
+            except _Rollback:
+                pass
+
+        Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        self.print_report(report)
+        self.stdout.write(f'Rapor: {options["output"]}')
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['max_regression'])
+
+    # ---------- Veri ----------
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        user_ids = self.seed_users(rng, options['users'])
+        # Zipf dagilimi: az sayida kullanici sozlesme ve bildirimlerin buyuk kismini alir
+        cum_weights = list(accumulate(1 / rank for rank in range(1, len(user_ids) + 1)))
+        contract_ids = self.seed_contracts(rng, user_ids, cum_weights, options['contracts'], options['max_parties'])
+        self.seed_notifications(rng, user_ids, cum_weights, contract_ids, options['notifications'])
+
+        # bulk_create sinyal ve save() kancalarini calistirmaz; kullanici sayaclari toplu hesaplanir
+        call_command('rebuild_contract_stats', stdout=self.stdout)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Ornek veri olusturuldu ({elapsed:.1f} sn)'))
+        return {
+            'users': options['users'],
+            'contracts': options['contracts'],
+            'max_parties': options['max_parties'],
+            'notifications': options['notifications'],
+            'seed': options['seed'],
+            'seconds': round(elapsed, 1),
+        }
+
+    def seed_users(self, rng, total):
+        plan, _ = SubscriptionPlan.objects.get_or_create(
+            plan_type='free', defaults={'name': 'Ucretsiz', 'contract_limit': 5}
+        )
+        # Kullanilamaz parola: her kullanici icin hash hesaplanmaz
+        password = make_password(None)
+        now = timezone.now()
+        for offset in range(0, total, BATCH_SIZE):
+            User.objects.bulk_create([
+                User(
+                    username=f'{USER_PREFIX}{i}',
+                    email=f'{USER_PREFIX}{i}@example.com',
+                    first_name=f'Kullanici{i}',
+                    password=password,
+                    date_joined=now - timedelta(days=rng.randint(0, 365)),
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, total))
+            ])
+        User.objects.create_user(STAFF_USERNAME, f'{STAFF_USERNAME}@example.com', is_staff=True, is_superuser=True)
+
+        user_ids = list(
+            User.objects.filter(username__startswith=USER_PREFIX, is_staff=False)
+            .order_by('id').values_list('id', flat=True)
+        )
+        for offset in range(0, len(user_ids), BATCH_SIZE):
+            UserSubscription.objects.bulk_create([
+                UserSubscription(user_id=user_id, plan=plan)
+                for user_id in user_ids[offset:offset + BATCH_SIZE]
+            ])
+        self.stdout.write(f'{total} kullanici')
+        return user_ids
+
+    def seed_contracts(self, rng, user_ids, cum_weights, total, max_parties):
+        codes = count(1)
+        now = timezone.now()
+        contract_ids = []
+
+        with manual_timestamps(Contract._meta.get_field('created_at')):
+            for offset in range(0, total, BATCH_SIZE):
+                contracts, party_users = [], []
+                for _ in range(min(BATCH_SIZE, total - offset)):
+                    creator_id = rng.choices(user_ids, cum_weights=cum_weights)[0]
+                    others = set(rng.choices(user_ids, cum_weights=cum_weights, k=rng.randint(1, max_parties - 1)))
+                    others.discard(creator_id)
+                    status = rng.choices(CONTRACT_STATUSES, CONTRACT_STATUS_WEIGHTS)[0]
+                    contracts.append(Contract(
+                        title=f'Ornek sozlesme {offset + len(contracts)}',
+                        content='Taraflar asagidaki maddeler uzerinde anlasmistir.\n' * rng.randint(5, 40),
+                        creator_id=creator_id,
+                        status=status,
+                        visibility='public' if status == 'completed' and rng.random() < 0.5 else 'private',
+                        is_editable=status == 'draft',
+                        created_at=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+                        completed_at=now if status == 'completed' else None,
+                    ))
+                    party_users.append([creator_id, *others])
+
+                parties, signed = [], []
+                for contract, members in zip(contracts, party_users):
+                    for user_id in members:
+                        is_creator = user_id == contract.creator_id
+                        declined = (contract.status == 'pending_signatures' and not is_creator
+                                    and rng.random() < 0.05)
+                        is_signed = contract.status == 'completed' or (
+                            contract.status in ('pending_signatures', 'archived') and not declined and rng.random() < 0.5
+                        )
+                        parties.append(ContractParty(
+                            contract=contract, user_id=user_id,
+                            invitation_status='declined' if declined else 'accepted',
+                        ))
+                        signed.append(is_signed)
+                        contract.party_count += 1
+                        contract.signed_count += is_signed
+                        contract.declined_count += declined
+                # Sayaclar taraflarla birlikte hesaplandi; sozlesmeler tek seferde yazilir
+                Contract.objects.bulk_create(Contract.assign_numbers(contracts))
+                ContractParty.objects.bulk_create(parties)
+                ContractSignature.objects.bulk_create([
+                    ContractSignature(
+                        contract_id=party.contract_id, party=party, user_id=party.user_id,
+                        signature_code=f'B{next(codes):011d}', is_signed=is_signed,
+                        signed_at=now if is_signed else None,
+                    )
+                    for party, is_signed in zip(parties, signed)
+                ])
+                contract_ids.extend(contract.pk for contract in contracts)
+                self.stdout.write(f'{offset + len(contracts)}/{total} sozlesme')
+        return contract_ids
+
+    def seed_notifications(self, rng, user_ids, cum_weights, contract_ids, total):
+        now = timezone.now()
+        with manual_timestamps(Notification._meta.get_field('created_at')):
+            for offset in range(0, total, BATCH_SIZE):
+                Notification.objects.bulk_create([
+                    Notification(
+                        recipient_id=rng.choices(user_ids, cum_weights=cum_weights)[0],
+                        notification_type=rng.choice(NOTIFICATION_TYPES),
+                        title='Ornek bildirim',
+                        message='Sozlesmenizde bir degisiklik oldu.',
+                        contract_id=rng.choice(contract_ids) if contract_ids and rng.random() < 0.3 else None,
+                        is_read=rng.random() < 0.7,
+                        created_at=now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+                    )
+                    for _ in range(min(BATCH_SIZE, total - offset))
+                ])
+        self.stdout.write(f'{total} bildirim')
+
+    # ---------- Olcum ----------
+
+    def scenarios(self):
+        """(ad, [(kullanici, [url, ...]), ...]) listesi; her ornek bir sayfa yuklemesi"""
+        users = list(
+            User.objects.filter(username__startswith=USER_PREFIX, is_staff=False).order_by('id')[:10]
+        )
+        staff = User.objects.filter(username=STAFF_USERNAME).first()
+        if not users or staff is None:
+            raise CommandError('Olcum verisi bulunamadi; once --keep ile olusturun')
+
+        # En yogun kullanicilar (Zipf dagiliminin basi)
+        own = {
+            user.pk: list(Contract.objects.filter(creator=user).order_by('-created_at').values_list('pk', flat=True)[:20])
+            for user in users
+        }
+        public = list(
+            Contract.objects.filter(
+                visibility='public', status='completed', creator__username__startswith=USER_PREFIX,
+            ).order_by('-created_at').values_list('pk', flat=True)[:5]
+        )
+        detail = [(user, contract_id) for user in users for contract_id in own[user.pk]]
+
+        def each_user(*names):
+            return [(user, [reverse(name) for name in names]) for user in users]
+
+        widgets = [reverse('contracts:admin_dashboard_widget', args=[name]) for name in DASHBOARD_WIDGETS]
+        return [
+            ('home', each_user('contracts:home')),
+            ('contract_detail', [
+                (user, [reverse('contracts:contract_detail', args=[pk])]) for user, pk in detail
+            ]),
+            ('contract_pool', each_user('contracts:contract_pool')),
+            ('my_contracts', each_user('contracts:my_contracts')),
+            ('invited_contracts', each_user('contracts:invited_contracts')),
+            ('get_notification_counts', each_user('contracts:get_notification_counts')),
+            # Ilk indirmeler PDF uretir, sonrakiler onbellekten okunur
+            ('contract_pdf', [
+                (users[0], [reverse('contracts:contract_pdf', args=[pk])]) for pk in public
+            ]),
+            ('admin_dashboard', [(staff, [reverse('contracts:admin_dashboard')])]),
+            # Dashboard'un tum widget'lari tek sayfa yuklemesi olarak
+            ('admin_dashboard_widgets', [(staff, widgets)]),
+        ]
+
+    def measure(self, client, urls):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for url in urls:
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                if response.status_code != 200:
+                    raise CommandError(f'{url}: HTTP {response.status_code}')
+            elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, len(queries)
+
+    def run(self, options):
+        iterations = options['iterations']
+        results = {}
+        with tempfile.TemporaryDirectory(prefix='bench-pdf-') as pdf_dir, override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CONTRACT_PDF_CACHE_DIR=pdf_dir,
+        ):
+            cache.clear()
+            client = Client()
+            for name, samples in self.scenarios():
+                if not samples:
+                    self.stdout.write(self.style.WARNING(f'{name}: ornek yok, atlandi'))
+                    continue
+                timings, query_counts = [], []
+                current_user = None
+                for i in range(iterations):
+                    user, urls = samples[i % len(samples)]
+                    if user != current_user:
+                        client.force_login(user)
+                        current_user = user
+                    elapsed, queries = self.measure(client, urls)
+                    timings.append(elapsed)
+                    query_counts.append(queries)
+
+                timings.sort()
+                query_counts.sort()
+                results[name] = {
+                    'requests': len(timings),
+                    'p50_ms': round(percentile(timings, 50), 2),
+                    'p95_ms': round(percentile(timings, 95), 2),
+                    'p99_ms': round(percentile(timings, 99), 2),
+                    'mean_ms': round(statistics.fmean(timings), 2),
+                    'queries_p50': percentile(query_counts, 50),
+                    'queries_max': query_counts[-1],
+                }
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'dataset': {
+                'users': User.objects.count(),
+                'contracts': Contract.objects.count(),
+                'parties': ContractParty.objects.count(),
+                'signatures': ContractSignature.objects.count(),
+                'notifications': Notification.objects.count(),
+            },
+            'views': results,
+        }
+
+    # ---------- Rapor ----------
+
+    def print_report(self, report):
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(', '.join(f'{name}: {total}' for name, total in report['dataset'].items()))
+        self.stdout.write('-'*50)
+        for name, row in report['views'].items():
+            self.stdout.write(
+                f'{name:<26} p50 {row["p50_ms"]:>8.1f} | p95 {row["p95_ms"]:>8.1f} | '
+                f'p99 {row["p99_ms"]:>8.1f} ms | sorgu {row["queries_p50"]}/{row["queries_max"]}'
+            )
+        self.stdout.write('='*50)
+
+    def compare(self, report, baseline_path, max_regression):
+        try:
+            baseline = json.loads(Path(baseline_path).read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Baseline okunamadi: {e}')
+
+        regressions = []
+        self.stdout.write(f'\nBaseline: {baseline_path} ({baseline.get("created_at", "?")})')
+        for name, row in report['views'].items():
+            previous = baseline.get('views', {}).get(name)
+            if previous is None:
+                self.stdout.write(f'{name}: baseline\'da yok')
+                continue
+            change = (row['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            line = (
+                f'{name}: p95 {previous["p95_ms"]:.1f} -> {row["p95_ms"]:.1f} ms ({change:+.0f}%), '
+                f'sorgu {previous["queries_max"]} -> {row["queries_max"]}'
+            )
+            # Sorgu sayisi belirleyicidir; her artis gerilemedir
+            if change > max_regression or row['queries_max'] > previous['queries_max']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if regressions:
+            raise CommandError(f'Gerileme: {", ".join(regressions)}')
@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from contracts.models import Contract, ContractParty
+from contracts.pdf import engine
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'PDF uretim suresini olc: her belgede kurulum (eski davranis) ve onceden hazirlanmis motor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Her mod icin uretilecek belge sayisi',
+        )
+        parser.add_argument(
+            '--contract',
+            help='Olculecek sozlesme id (verilmezse gecici ornek sozlesme olusturulur)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        if options['contract']:
+            try:
+                contract = Contract.objects.prefetch_related('parties__user', 'signatures').get(pk=options['contract'])
+            except (Contract.DoesNotExist, ValueError):
+                raise CommandError('Sozlesme bulunamadi')
+            self.run(contract, iterations)
+            return
+
+        # Ornek veri transaction icinde olusturulur ve sonunda geri alinir
+        try:
+            with transaction.atomic():
+                self.run(self.sample_contract(), iterations)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def sample_contract(self):
+        creator = User.objects.create_user('benchmark_pdf_creator', 'creator@example.com')
+        contract = Contract.objects.create(
+            title='Kira Sözleşmesi - Örnek',
+            content=('Madde: Kiracı, kira bedelini her ayın ilk beş günü içinde öder. ' * 8 + '\n\n') * 40,
+            creator=creator,
+        )
+        for i in range(5):
+            user = User.objects.create_user(f'benchmark_pdf_party_{i}', f'party{i}@example.com')
+            ContractParty.objects.create(contract=contract, user=user)
+        return Contract.objects.prefetch_related('parties__user', 'signatures').get(pk=contract.pk)
+
+    def measure(self, contract, iterations, reset):
+        timings = []
+        for _ in range(iterations):
+            if reset:
+                engine.reset()
+            start = time.perf_counter()
+            engine.render(contract)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def run(self, contract, iterations):
+        # Isinma: ReportLab modul ici onbellekleri dolsun
+        engine.render(contract)
+
+        cold = self.measure(contract, iterations, reset=True)
+        warm = self.measure(contract, iterations, reset=False)
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(f'Sozlesme: {contract.title} | Font: {engine.font_name}')
+        for label, timings in (('Her belgede kurulum', cold), ('Hazir motor', warm)):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{label}: ortalama {statistics.mean(timings):.1f} ms, '
+                    f'medyan {statistics.median(timings):.1f} ms, '
+                    f'en iyi {min(timings):.1f} ms'
+                )
+            )
+        self.stdout.write('='*50)
@@ -0,0 +1,100 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from contracts.models import Contract
+from contracts.search import ContractSearchResults, rebuild_index, search_available
+
+WORDS = (
+    'kira sözleşme taraf ödeme süre madde kiracı kiralayan bedel teslim '
+    'dostluk spor buluşma ilişki söz tarih imza şart yükümlülük fesih '
+    'güvence depozito aidat anahtar ev araba iş hizmet eğitim proje'
+).split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Havuz aramasini olc: icontains taramasi ve FTS5 indeksi (ornek veri gecici olarak olusturulur)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contracts', type=int, default=100000, help='Olusturulacak ornek sozlesme sayisi')
+        parser.add_argument('--iterations', type=int, default=10, help='Her sorgu icin tekrar sayisi')
+        parser.add_argument('--keep', action='store_true', help='Ornek veriyi silme')
+        parser.add_argument('queries', nargs='*', default=['kira', 'sözleşme fesih', 'depozito', 'anahtar teslim'])
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('FTS5 arama tablosu bulunamadi')
+
+        try:
+            with transaction.atomic():
+                self.seed(options['contracts'])
+                rebuild_index()
+                self.run(options['queries'], options['iterations'])
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def seed(self, count):
+        rng = random.Random(42)
+        # Gercekci dagilim: az sayida sik kelime, cok sayida nadir kelime (Zipf)
+        vocabulary = WORDS + [
+            ''.join(rng.choices('abcçdefgğhıijklmnoöprsştuüvyz', k=rng.randint(4, 10)))
+            for _ in range(20000)
+        ]
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        creator = User.objects.create_user('benchmark_search_creator', 'bench@example.com')
+        started = time.perf_counter()
+        for offset in range(0, count, 5000):
+            contracts = [
+                Contract(
+                    title=' '.join(rng.choices(vocabulary, weights, k=4)).capitalize(),
+                    content=' '.join(rng.choices(vocabulary, weights, k=200)),
+                    creator=creator,
+                    visibility='public',
+                    status='completed',
+                )
+                for _ in range(min(5000, count - offset))
+            ]
+            Contract.objects.bulk_create(Contract.assign_numbers(contracts))
+        self.stdout.write(f'{count} ornek sozlesme olusturuldu ({time.perf_counter() - started:.1f} sn)')
+
+    def timed(self, func, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def run(self, queries, iterations):
+        pool = Contract.objects.filter(visibility='public', status='completed').order_by('-created_at')
+
+        self.stdout.write('\n' + '='*50)
+        for query in queries:
+            def icontains():
+                results = pool.filter(Q(title__icontains=query) | Q(content__icontains=query))
+                results.count()
+                list(results[:12])
+
+            def fts():
+                results = ContractSearchResults(query, pool)
+                results.count()
+                results[0:12]
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'"{query}": icontains {self.timed(icontains, iterations):.1f} ms | '
+                    f'FTS5 {self.timed(fts, iterations):.1f} ms (medyan, ilk sayfa + toplam)'
+                )
+            )
+        self.stdout.write('='*50)
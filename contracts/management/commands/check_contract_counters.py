@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from contracts.models import Contract
+
+
+class Command(BaseCommand):
+    help = 'Sozlesme taraf/imza sayaclarini (party_count, signed_count, declined_count) kontrol et ve sapmalari duzelt'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece raporla, duzeltme yapma',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tek seferde yazilacak kayit sayisi',
+        )
+
+    def handle(self, *args, **options):
+        # Sapmalar veritabaninda tek sorguda bulunur; sadece hatali satirlar okunur
+        drifted = Contract.objects.with_actual_counters().filter(
+            ~Q(party_count=F('actual_party_count')) |
+            ~Q(signed_count=F('actual_signed_count')) |
+            ~Q(declined_count=F('actual_declined_count'))
+        ).only('id', 'contract_number', *Contract.COUNTER_FIELDS)
+
+        contracts = []
+        for contract in drifted.iterator(chunk_size=options['batch_size']):
+            changes = []
+            for field in Contract.COUNTER_FIELDS:
+                actual = getattr(contract, f'actual_{field}')
+                if getattr(contract, field) != actual:
+                    changes.append(f'{field}: {getattr(contract, field)} -> {actual}')
+                    setattr(contract, field, actual)
+            self.stdout.write(f'#{contract.contract_number}: ' + ', '.join(changes))
+            contracts.append(contract)
+
+        if contracts and not options['dry_run']:
+            Contract.objects.bulk_update(contracts, Contract.COUNTER_FIELDS, batch_size=options['batch_size'])
+
+        self.stdout.write('\n' + '='*50)
+        if not contracts:
+            self.stdout.write(self.style.SUCCESS('Tum sayaclar tutarli'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Sapma bulunan sozlesme: {len(contracts)} (duzeltilmedi)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Duzeltilen sozlesme: {len(contracts)}'))
+        self.stdout.write('='*50)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from contracts.export import contracts_for_export, stream_contract_pdfs_zip
+
+
+class Command(BaseCommand):
+    help = 'Tamamlanan sozlesmelerin PDF\'lerini tek bir ZIP dosyasina aktar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Yazilacak ZIP dosyasi')
+        parser.add_argument('--user', help='Kullanicinin olusturdugu veya taraf oldugu sozlesmeler (kullanici adi)')
+        parser.add_argument('--creator', help='Sadece bu kullanicinin olusturdugu sozlesmeler (kullanici adi)')
+        parser.add_argument('--date-from', help='Tamamlanma tarihi baslangici (YYYY-AA-GG)')
+        parser.add_argument('--date-to', help='Tamamlanma tarihi bitisi (YYYY-AA-GG)')
+        parser.add_argument('--workers', type=int, help='PDF ureten surec sayisi (varsayilan: CPU sayisi)')
+
+    def get_user(self, username):
+        if not username:
+            return None
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Kullanici bulunamadi: {username}')
+
+    def get_date(self, value):
+        if not value:
+            return None
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise CommandError(f'Gecersiz tarih: {value}')
+        return date
+
+    def handle(self, *args, **options):
+        contracts = contracts_for_export(
+            user=self.get_user(options['user']),
+            creator=self.get_user(options['creator']),
+            date_from=self.get_date(options['date_from']),
+            date_to=self.get_date(options['date_to']),
+        )
+        total = contracts.count()
+
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_contract_pdfs_zip(contracts, workers=options['workers']):
+                output.write(chunk)
+                written += len(chunk)
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(self.style.SUCCESS(f'Aktarilan sozlesme: {total}'))
+        self.stdout.write(self.style.SUCCESS(f'Dosya: {options["output"]} ({written / 1024:.1f} KB)'))
+        self.stdout.write('='*50)
@@ -0,0 +1,360 @@
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import got_request_exception
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from contracts.models import Contract, ContractParty, ContractSignature, SubscriptionPlan, UserSubscription
+from contracts.querybudget import percentile
+
+USER_PREFIX = 'loadtest_'
+PLAN_TYPE = 'loadtest'
+OPERATIONS = ('sign', 'comment', 'create', 'poll')
+DEFAULT_MIX = 'sign=30,comment=20,create=10,poll=40'
+# BEGIN IMMEDIATE yazma kilidini transaction başında bekler
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'BEGIN')
+
+_local = threading.local()
+
+
+def _remember_exception(sender, request=None, **kwargs):
+    # Handler hatayı 500 yanıtına çevirir; sınıflandırma için istisna saklanır
+    _local.exception = sys.exc_info()[1]
+
+
+class WriteTimer:
+    """execute_wrapper: yazma sorgularında geçen süre (SQLite'ta kilit beklemesi burada birikir)"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+                self.seconds += time.perf_counter() - start
+
+
+class WsgiClient:
+    """sozumsoz.wsgi uygulamasına doğrudan WSGI çağrısı (oturum ve CSRF çerezleriyle)"""
+
+    def __init__(self, application, session_key):
+        self.application = application
+        self.csrf_token = get_random_string(32)
+        self.cookie = (
+            f'{settings.SESSION_COOKIE_NAME}={session_key}; '
+            f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}'
+        )
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+        self.host = hosts[0] if hosts else 'localhost'
+
+    def request(self, method, path, data=None):
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'HTTP_HOST': self.host,
+            'HTTP_COOKIE': self.cookie,
+            'HTTP_X_CSRFTOKEN': self.csrf_token,
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+        }
+        setup_testing_defaults(environ)
+
+        status = []
+        result = self.application(environ, lambda value, headers, exc_info=None: status.append(int(value.split()[0])))
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return status[0]
+
+
+def run_worker(application, fixture, mix, deadline, seed, samples):
+    """Süre dolana kadar karışık iş yükü; her istek için (işlem, ms, yazma ms, hata) ekler"""
+    rng = random.Random(seed)
+    clients = [WsgiClient(application, key) for key in fixture['sessions']]
+    operations, weights = zip(*mix.items())
+    timer = WriteTimer()
+
+    try:
+        with connection.execute_wrapper(timer):
+            while time.monotonic() < deadline:
+                operation = rng.choices(operations, weights)[0]
+                index = rng.randrange(len(clients))
+                method, path, data, expected = build_request(operation, fixture, index, rng)
+
+                timer.seconds = 0.0
+                _local.exception = None
+                started = time.perf_counter()
+                try:
+                    status = clients[index].request(method, path, data)
+                except Exception as e:
+                    # DEBUG_PROPAGATE_EXCEPTIONS vb. ile handler dışına çıkan hatalar
+                    status, _local.exception = 500, e
+                elapsed = (time.perf_counter() - started) * 1000
+
+                error = None
+                if status >= 500:
+                    exception = _local.exception
+                    error = 'locked' if exception and 'locked' in str(exception).lower() else (
+                        type(exception).__name__ if exception else f'HTTP {status}'
+                    )
+                elif status != expected:
+                    error = f'HTTP {status}'
+                samples.append((operation, elapsed, timer.seconds * 1000, error))
+    finally:
+        connections.close_all()
+
+
+def build_request(operation, fixture, index, rng):
+    """(method, path, data, beklenen durum)"""
+    if operation == 'sign':
+        contract_id, code = rng.choice(fixture['sign_targets'][index])
+        return 'POST', reverse('contracts:contract_sign', args=[contract_id]), {'signature_code': code}, 302
+    if operation == 'comment':
+        contract_id, _ = rng.choice(fixture['sign_targets'][index])
+        return 'POST', reverse('contracts:add_contract_comment', args=[contract_id]), {'content': 'Yuk testi yorumu'}, 200
+    if operation == 'create':
+        return 'POST', reverse('contracts:contract_create'), {
+            'title': 'Yuk testi sozlesmesi',
+            'content': 'Taraflar asagidaki maddeler uzerinde anlasmistir.\n' * 10,
+            'visibility': 'private',
+            'start_date': timezone.localdate().isoformat(),
+            'duration_months': 12,
+            'second_party': fixture['user_ids'][(index + 1) % len(fixture['user_ids'])],
+        }, 302
+    return 'GET', reverse('contracts:get_notification_counts'), None, 200
+
+
+def run_process(fixture, mix, threads, deadline, seed):
+    """Ayrı süreçte çalışan işçi grubu (fork ile; Django ayarları miras alınır)"""
+    from sozumsoz.wsgi import application
+
+    samples = []
+    workers = [
+        threading.Thread(target=run_worker, args=(application, fixture, mix, deadline, seed * 1000 + i, samples))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return samples
+
+
+class Command(BaseCommand):
+    help = (
+        'Eszamanli yuk testi: imza, yorum, sozlesme olusturma ve bildirim sorgulama isteklerini '
+        'birden fazla thread/surec ile WSGI uygulamasina gonderir; islem basina verim, hata ve kilit beklemesi'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Surec basina thread sayisi')
+        parser.add_argument('--processes', type=int, default=1, help='Surec sayisi (fork)')
+        parser.add_argument('--duration', type=float, default=30, help='Test suresi (saniye)')
+        parser.add_argument('--users', type=int, default=20, help='Yuk testi kullanici sayisi')
+        parser.add_argument('--contracts-per-user', type=int, default=5, help='Kullanici basina imzalanacak sozlesme')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Islem agirliklari (varsayilan: {DEFAULT_MIX})')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+        parser.add_argument('--output', help='Sonuclari JSON olarak yaz')
+        parser.add_argument('--keep', action='store_true', help='Olusturulan verileri silme')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        if options['users'] < 2:
+            raise CommandError('--users en az 2 olmali')
+
+        self.cleanup()
+        fixture = self.setup(options['users'], options['contracts_per_user'])
+
+        got_request_exception.connect(_remember_exception, dispatch_uid='contracts.loadtest')
+        try:
+            started = time.monotonic()
+            samples = self.run(fixture, mix, options, started + options['duration'])
+            elapsed = time.monotonic() - started
+        finally:
+            got_request_exception.disconnect(dispatch_uid='contracts.loadtest')
+            if not options['keep']:
+                self.cleanup()
+
+        report = self.summarize(samples, elapsed, options)
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Rapor: {options["output"]}')
+
+    def parse_mix(self, value):
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in OPERATIONS:
+                raise CommandError(f'Bilinmeyen islem: {name} ({", ".join(OPERATIONS)})')
+            try:
+                mix[name] = float(weight)
+            except ValueError:
+                raise CommandError(f'Gecersiz agirlik: {item}')
+        if not any(mix.values()):
+            raise CommandError('En az bir islemin agirligi sifirdan buyuk olmali')
+        return mix
+
+    # ---------- Veri ----------
+
+    def setup(self, user_count, contracts_per_user):
+        # Sözleşme limiti yük testini kesmesin
+        plan = SubscriptionPlan.objects.create(name='Yuk testi', plan_type=PLAN_TYPE, contract_limit=10 ** 9)
+        users = [
+            User.objects.create_user(f'{USER_PREFIX}{i}', f'{USER_PREFIX}{i}@example.com')
+            for i in range(user_count)
+        ]
+        UserSubscription.objects.bulk_create([UserSubscription(user=user, plan=plan) for user in users])
+
+        # Her kullanıcı, diğerlerinin oluşturduğu sözleşmelerde imza bekleyen taraf
+        sign_targets = []
+        for i, user in enumerate(users):
+            targets = []
+            others = users[:i] + users[i + 1:]
+            for j in range(contracts_per_user):
+                creator = others[j % len(others)]
+                contract = Contract.objects.create(
+                    title=f'Yuk testi {i}-{j}', content='Yuk testi maddeleri', creator=creator,
+                    status='pending_signatures',
+                )
+                code = get_random_string(12, allowed_chars='0123456789')
+                for member in (creator, user):
+                    party = ContractParty.objects.create(contract=contract, user=member, invitation_status='accepted')
+                    ContractSignature.objects.create(
+                        contract=contract, party=party, user=member,
+                        signature_code=code if member == user else get_random_string(12, '0123456789'),
+                    )
+                targets.append((str(contract.pk), code))
+            sign_targets.append(targets)
+
+        sessions = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+        self.stdout.write(f'{len(users)} kullanici, {len(users) * contracts_per_user} sozlesme hazirlandi')
+        return {
+            'user_ids': [user.pk for user in users],
+            'sessions': sessions,
+            'sign_targets': sign_targets,
+        }
+
+    def cleanup(self):
+        deleted, _ = User.objects.filter(username__startswith=USER_PREFIX).delete()
+        SubscriptionPlan.objects.filter(plan_type=PLAN_TYPE).delete()
+        if deleted:
+            self.stdout.write(f'Yuk testi verileri silindi ({deleted} kayit)')
+
+    # ---------- Çalıştırma ----------
+
+    def run(self, fixture, mix, options, deadline):
+        threads, processes = options['threads'], options['processes']
+        self.stdout.write(
+            f'{processes} surec x {threads} thread, {options["duration"]:.0f} sn, '
+            f'veritabani: {connection.vendor} {self.journal_mode() or ""}'.rstrip()
+        )
+
+        if processes <= 1:
+            return run_process(fixture, mix, threads, deadline, options['seed'])
+
+        # Çocuk süreçler ebeveynin açık bağlantısını paylaşmamalı
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(processes) as pool:
+            results = pool.starmap(run_process, [
+                (fixture, mix, threads, deadline, options['seed'] + i) for i in range(processes)
+            ])
+        return [sample for samples in results for sample in samples]
+
+    def journal_mode(self):
+        if connection.vendor != 'sqlite':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            return f'(journal_mode={cursor.fetchone()[0]})'
+
+    # ---------- Rapor ----------
+
+    def summarize(self, samples, elapsed, options):
+        operations = {}
+        for operation in OPERATIONS:
+            rows = [sample for sample in samples if sample[0] == operation]
+            if not rows:
+                continue
+            latencies = sorted(row[1] for row in rows)
+            waits = sorted(row[2] for row in rows)
+            errors = [row[3] for row in rows if row[3]]
+            error_kinds = {}
+            for error in errors:
+                error_kinds[error] = error_kinds.get(error, 0) + 1
+            operations[operation] = {
+                'requests': len(rows),
+                'throughput_rps': round(len(rows) / elapsed, 1),
+                'error_rate': round(len(errors) / len(rows), 4),
+                'locked_errors': error_kinds.get('locked', 0),
+                'errors': error_kinds,
+                'latency_p50_ms': round(percentile(latencies, 50), 1),
+                'latency_p95_ms': round(percentile(latencies, 95), 1),
+                'latency_p99_ms': round(percentile(latencies, 99), 1),
+                'write_wait_p50_ms': round(percentile(waits, 50), 1),
+                'write_wait_p95_ms': round(percentile(waits, 95), 1),
+                'write_wait_max_ms': round(waits[-1], 1),
+            }
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'journal_mode': self.journal_mode(),
+            'threads': options['threads'],
+            'processes': options['processes'],
+            'duration_s': round(elapsed, 1),
+            'requests': len(samples),
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            'operations': operations,
+        }
+
+    def print_report(self, report):
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(
+            f'Toplam: {report["requests"]} istek, {report["throughput_rps"]} istek/sn ({report["duration_s"]} sn)'
+        )
+        self.stdout.write('-'*50)
+        for name, row in report['operations'].items():
+            line = (
+                f'{name:<8} {row["throughput_rps"]:>7.1f} istek/sn | hata %{row["error_rate"] * 100:.1f} '
+                f'(kilit {row["locked_errors"]}) | p50 {row["latency_p50_ms"]:.0f} p95 {row["latency_p95_ms"]:.0f} '
+                f'p99 {row["latency_p99_ms"]:.0f} ms | yazma bekleme p95 {row["write_wait_p95_ms"]:.0f} '
+                f'max {row["write_wait_max_ms"]:.0f} ms'
+            )
+            self.stdout.write(self.style.ERROR(line) if row['error_rate'] else self.style.SUCCESS(line))
+            for error, total in row['errors'].items():
+                if error != 'locked':
+                    self.stdout.write(f'         {error}: {total}')
+        self.stdout.write('='*50)
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from contracts.models import Contract
+from contracts.pdf_cache import pdf_cache
+
+
+class Command(BaseCommand):
+    help = 'Sozlesme PDF onbellegini yonet (durum, temizle, doldur, boyut sinirina indir)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=['status', 'purge', 'prewarm', 'evict'],
+            help='status: ozet, purge: tumunu sil, prewarm: tamamlanan sozlesmeleri uret, evict: LRU ile boyut sinirina indir',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='prewarm icin sadece tamamlananlari degil tum sozlesmeleri uret',
+        )
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(f'Onbellek dizini: {pdf_cache.directory}')
+
+        if action == 'purge':
+            removed = pdf_cache.purge()
+            self.stdout.write(self.style.SUCCESS(f'Silinen PDF: {removed}'))
+
+        elif action == 'evict':
+            removed = pdf_cache.evict()
+            self.stdout.write(self.style.SUCCESS(f'Silinen PDF: {removed}'))
+
+        elif action == 'prewarm':
+            contracts = Contract.objects.prefetch_related('parties__user', 'signatures')
+            if not options['all']:
+                contracts = contracts.filter(status='completed')
+
+            warmed = 0
+            for contract in contracts.iterator(chunk_size=100):
+                try:
+                    pdf_cache.warm(contract)
+                    warmed += 1
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'{contract.title}: {e}'))
+            self.stdout.write(self.style.SUCCESS(f'Hazirlanan PDF: {warmed}'))
+
+        entries = pdf_cache.entries()
+        total = sum(size for _, size, _ in entries)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Dosya sayisi: {len(entries)} | Toplam: {total / 1024 / 1024:.1f} MB '
+                f'/ {pdf_cache.max_bytes / 1024 / 1024:.1f} MB'
+            )
+        )
+        self.stdout.write('='*50)
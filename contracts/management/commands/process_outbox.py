@@ -0,0 +1,138 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from contracts.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = 'E-posta kuyrugundaki (EmailOutbox) bekleyen e-postalari toplu halde gonder'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50),
+            help='Tek SMTP baglantisi uzerinden gonderilecek e-posta sayisi',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+            help='Bu kadar basarisiz denemeden sonra e-posta dead olarak isaretlenir',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Kuyrugu surekli dinle (worker modu)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=5,
+            help='Worker modunda kuyruk bosken bekleme suresi (saniye)',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Bu kadar saniyedir sending durumunda kalan kayitlar tekrar kuyruga alinir',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.max_attempts = options['max_attempts']
+        self.backoff = getattr(settings, 'EMAIL_OUTBOX_RETRY_BACKOFF', 60)
+
+        totals = {'sent': 0, 'failed': 0, 'dead': 0}
+
+        while True:
+            self.release_stale(options['stale_after'])
+
+            # Kuyruk bosalana kadar batch batch gonder
+            while True:
+                result = self.process_batch()
+                if result is None:
+                    break
+                for key in totals:
+                    totals[key] += result[key]
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(self.style.SUCCESS(f'Gonderilen: {totals["sent"]}'))
+        self.stdout.write(self.style.WARNING(f'Tekrar denenecek: {totals["failed"]}'))
+        self.stdout.write(self.style.ERROR(f'Vazgecilen (dead): {totals["dead"]}'))
+        self.stdout.write('='*50)
+
+    def release_stale(self, stale_after):
+        """Worker cokmesiyle sending durumunda kalan kayitlari geri al"""
+        cutoff = timezone.now() - timedelta(seconds=stale_after)
+        released = EmailOutbox.objects.filter(
+            status='sending',
+            locked_at__lt=cutoff,
+        ).update(status='pending', locked_at=None)
+        if released:
+            self.stdout.write(f'Takilan {released} kayit tekrar kuyruga alindi')
+
+    def process_batch(self):
+        """Bir batch gonder; kuyrukta gonderilecek kayit yoksa None dondur"""
+        candidates = list(
+            EmailOutbox.objects.filter(
+                status='pending',
+                next_attempt_at__lte=timezone.now(),
+            ).order_by('next_attempt_at', 'created_at')[:self.batch_size]
+        )
+        if not candidates:
+            return None
+
+        # Ayni kaydi baska bir worker aldiysa atla
+        batch = [email for email in candidates if email.claim()]
+        result = {'sent': 0, 'failed': 0, 'dead': 0}
+        if not batch:
+            return result
+
+        # Tum batch tek SMTP baglantisi uzerinden gonderilir
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # Sunucuya ulasilamiyor; batch'in tamami sonraki denemeye kalir
+            for email in batch:
+                self._fail(email, e, result)
+            return result
+
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                    to=email.to,
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as e:
+                    self._fail(email, e, result)
+                else:
+                    email.mark_sent()
+                    result['sent'] += 1
+        finally:
+            connection.close()
+
+        return result
+
+    def _fail(self, email, error, result):
+        email.mark_failed(error, self.max_attempts, self.backoff)
+        if email.status == 'dead':
+            result['dead'] += 1
+            self.stdout.write(self.style.ERROR(f'Vazgecildi: {email.subject} ({error})'))
+        else:
+            result['failed'] += 1
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from contracts.models import UserContractStats, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Kullanici sozlesme sayaclarini (UserContractStats) sifirdan yeniden hesapla'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tek seferde yazilacak kayit sayisi',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Tum sayaclar tek geciste GROUP BY sorgulari ile hesaplanir
+        counters = UserContractStats.compute()
+        user_ids = list(User.objects.values_list('id', flat=True))
+
+        rows = []
+        for uid in user_ids:
+            values = counters.get(uid, {})
+            rows.append(UserContractStats(
+                user_id=uid,
+                **{f: values.get(f, 0) for f in UserContractStats.COUNTER_FIELDS}
+            ))
+
+        UserContractStats.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=UserContractStats.COUNTER_FIELDS + ['updated_at'],
+        )
+
+        # UserProfile istatistik alanlarini da senkronize et
+        profiles = list(UserProfile.objects.all())
+        for profile in profiles:
+            values = counters.get(profile.user_id, {})
+            profile.total_contracts_created = values.get('created_count', 0)
+            profile.total_contracts_signed = values.get('signed_count', 0)
+        UserProfile.objects.bulk_update(
+            profiles,
+            ['total_contracts_created', 'total_contracts_signed'],
+            batch_size=batch_size,
+        )
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(
+            self.style.SUCCESS(f'Yeniden hesaplanan kullanici: {len(rows)}')
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Guncellenen profil: {len(profiles)}')
+        )
+        self.stdout.write('='*50)
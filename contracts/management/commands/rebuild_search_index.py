@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from contracts.models import UserSearchKey
+from contracts.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Sozlesme havuzu FTS5 arama indeksini (ve istenirse kullanici arama anahtarlarini) sifirdan olustur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tek seferde indekse yazilacak kayit sayisi',
+        )
+        parser.add_argument(
+            '--users',
+            action='store_true',
+            help='Kullanici arama anahtarlarini (UserSearchKey) da yeniden olustur',
+        )
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('FTS5 arama tablosu bulunamadi (SQLite FTS5 destegi ve migrate gerekli)')
+
+        batch_size = options['batch_size']
+        total = rebuild_index(batch_size=batch_size)
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(self.style.SUCCESS(f'Indekslenen sozlesme: {total}'))
+
+        if options['users']:
+            users = 0
+            batch = []
+            for user in User.objects.all().iterator(chunk_size=batch_size):
+                batch.append(user)
+                if len(batch) >= batch_size:
+                    UserSearchKey.refresh_for(batch)
+                    users += len(batch)
+                    batch = []
+            UserSearchKey.refresh_for(batch)
+            users += len(batch)
+            self.stdout.write(self.style.SUCCESS(f'Anahtarlari yenilenen kullanici: {users}'))
+
+        self.stdout.write('='*50)
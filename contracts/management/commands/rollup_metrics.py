@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from contracts.metrics import first_activity_date, rollup_daily_metrics
+from contracts.widgets import invalidate_all_widgets
+
+
+class Command(BaseCommand):
+    help = 'Admin dashboard icin gunluk metrik ozetlerini (DailyMetrics) guncelle; eksik gunleri doldurur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Bu tarihten (YYYY-AA-GG) itibaren tum gunleri yeniden hesapla',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ilk kayittan itibaren tum gecmisi yeniden hesapla',
+        )
+        parser.add_argument(
+            '--refresh-days',
+            type=int,
+            default=getattr(settings, 'DAILY_METRICS_REFRESH_DAYS', 7),
+            help='Durum degisiklikleri icin her calistirmada yeniden hesaplanan son gun sayisi',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_date(options['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                raise CommandError(f'Gecersiz tarih: {options["since"]}')
+        elif options['full']:
+            since = first_activity_date()
+            if since is None:
+                self.stdout.write('Ozetlenecek kayit yok.')
+                return
+
+        start = time.perf_counter()
+        days = rollup_daily_metrics(since=since, refresh_days=options['refresh_days'])
+        # Yeniden hesaplanan günler dashboard özetlerini değiştirebilir
+        invalidate_all_widgets()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(self.style.SUCCESS(f'Guncellenen gun: {days}'))
+        self.stdout.write(self.style.SUCCESS(f'Sure: {elapsed:.2f} sn'))
+        self.stdout.write('='*50)
@@ -0,0 +1,257 @@
+"""
+Admin dashboard için günlük metrik özetleri (DailyMetrics).
+
+Her kaynak tablo için yarı açık [gün başı, bitiş) datetime aralığında tek
+bir GROUP BY sorgusu çalışır; tarih sütunlarının indeksleri kullanılır
+(__date aramaları indeksi kullanamaz). Tamamlanmış günler tabloya yazılır,
+henüz özetlenmemiş günler (bugün dahil) dashboard açılırken aynı sorgularla
+anlık hesaplanır. Tablo rollup_metrics komutuyla doldurulur; dashboard
+isteği geçmişi kendisi yazmaz.
+
+Tamamlanan sözleşmeler oluşturulma gününe değil completed_at gününe
+yazılır. Sözleşmeler sonradan durum değiştirebildiği ve silinebildiği
+(reddedilenler otomatik silinir) için güncel toplamlar ve durum dağılımı
+özetten değil anlık GROUP BY status sorgusundan gelir; ödeme durumları da
+aynı şekilde anlık sayılır. Gelir ödemenin completed_at gününe yazılır.
+Son DAILY_METRICS_REFRESH_DAYS gün her çalıştırmada yeniden hesaplanır.
+Tablo hiç doldurulmamışsa tüm zamanların toplamları özet yerine tek
+GROUP BY sorgularıyla hesaplanır.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+ROLLUP_FIELDS = [
+    'new_users', 'contracts_created', 'contracts_completed',
+    'revenue', 'payments_by_type', 'notifications_by_type', 'updated_at',
+]
+
+
+def day_start(day):
+    """Günün başlangıcı (yerel saat dilimine göre)"""
+    value = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        value = timezone.make_aware(value)
+    return value
+
+
+def _grouped(queryset, field, start, end, *group_by, **aggregates):
+    """Aralıktaki kayıtları gün (ve verilen alanlar) bazında grupla"""
+    return (
+        queryset
+        .filter(**{f'{field}__gte': start, f'{field}__lt': end})
+        .annotate(day=TruncDate(field))
+        .values('day', *group_by)
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def collect_daily_metrics(first_day, last_day):
+    """[first_day, last_day] günleri için kaydedilmemiş DailyMetrics nesneleri (her gün için bir tane)"""
+    from .models import Contract, DailyMetrics, Notification, Payment
+
+    days = {}
+    day = first_day
+    while day <= last_day:
+        days[day] = DailyMetrics(
+            date=day, payments_by_type={}, notifications_by_type={},
+        )
+        day += timedelta(days=1)
+    if not days:
+        return []
+
+    start, end = day_start(first_day), day_start(last_day + timedelta(days=1))
+
+    for row in _grouped(User.objects, 'date_joined', start, end, count=Count('id')):
+        days[row['day']].new_users = row['count']
+
+    for row in _grouped(Contract.objects, 'created_at', start, end, count=Count('pk')):
+        days[row['day']].contracts_created = row['count']
+
+    # Tamamlanma, sözleşmenin oluşturulduğu güne değil imzaların bittiği güne yazılır
+    completed = Contract.objects.filter(status='completed')
+    for row in _grouped(completed, 'completed_at', start, end, count=Count('pk')):
+        days[row['day']].contracts_completed = row['count']
+
+    # Gelir ödemenin tamamlandığı güne yazılır
+    completed = Payment.objects.filter(status='completed')
+    for row in _grouped(completed, 'completed_at', start, end, 'payment_type', count=Count('id'), total=Sum('amount')):
+        metrics = days[row['day']]
+        total = row['total'] or Decimal('0')
+        metrics.revenue += total
+        # JSON'da tutar kayıpsız saklanması için metin olarak tutulur
+        metrics.payments_by_type[row['payment_type']] = {'count': row['count'], 'total': str(total)}
+
+    for row in _grouped(Notification.objects, 'created_at', start, end, 'notification_type', count=Count('id')):
+        days[row['day']].notifications_by_type[row['notification_type']] = row['count']
+
+    return list(days.values())
+
+
+def first_activity_date():
+    """Özetlenecek ilk gün (hiç kayıt yoksa None)"""
+    from .models import Contract, Notification, Payment
+
+    candidates = [
+        User.objects.aggregate(first=Min('date_joined'))['first'],
+        Contract.objects.aggregate(first=Min('created_at'))['first'],
+        Payment.objects.aggregate(first=Min('created_at'))['first'],
+        Notification.objects.aggregate(first=Min('created_at'))['first'],
+    ]
+    candidates = [value for value in candidates if value is not None]
+    if not candidates:
+        return None
+    return timezone.localtime(min(candidates)).date() if settings.USE_TZ else min(candidates).date()
+
+
+def rollup_daily_metrics(since=None, until=None, refresh_days=None):
+    """
+    Eksik günleri doldur ve son refresh_days günü yeniden hesapla.
+    Sadece tamamlanmış günler (dün ve öncesi) yazılır; yazılan gün sayısını döndürür.
+    """
+    from .models import DailyMetrics
+
+    if until is None:
+        until = timezone.localdate() - timedelta(days=1)
+    if refresh_days is None:
+        refresh_days = getattr(settings, 'DAILY_METRICS_REFRESH_DAYS', 7)
+
+    if since is None:
+        last = DailyMetrics.objects.aggregate(last=Max('date'))['last']
+        if last is None:
+            since = first_activity_date()
+            if since is None:
+                return 0
+        else:
+            since = min(last + timedelta(days=1), until - timedelta(days=refresh_days - 1))
+
+    rows = collect_daily_metrics(since, until)
+    DailyMetrics.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(rows)
+
+
+def _sorted_counts(counter, key):
+    return [{key: name, 'count': count} for name, count in counter.most_common()]
+
+
+def _live_totals():
+    """Özet tablosu boşken tüm zamanların gelir, ödeme türü ve bildirim toplamları"""
+    from .models import Notification, Payment
+
+    total_revenue = Decimal('0')
+    payments_by_type = {}
+    completed = Payment.objects.filter(status='completed')
+    for row in completed.values('payment_type').annotate(count=Count('id'), total=Sum('amount')).order_by():
+        total = row['total'] or Decimal('0')
+        total_revenue += total
+        payments_by_type[row['payment_type']] = {
+            'payment_type': row['payment_type'], 'count': row['count'], 'total': total,
+        }
+
+    notifications_by_type = Counter({
+        row['notification_type']: row['count']
+        for row in Notification.objects.values('notification_type').annotate(count=Count('id')).order_by()
+    })
+    return total_revenue, payments_by_type, notifications_by_type
+
+
+def dashboard_metrics(days=30):
+    """
+    Dashboard grafik ve toplamları: kaydedilmiş özetler + henüz özetlenmemiş
+    günlerin anlık hesabı. Tablo henüz doldurulmamışsa (rollup_metrics hiç
+    çalışmamışsa) günlük kırılımlar sadece grafik penceresi için, tüm
+    zamanların toplamları ise doğrudan kaynak tablolardan hesaplanır.
+    """
+    from .models import Contract, DailyMetrics, Payment
+
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    window_start = today - timedelta(days=days - 1)
+
+    rows = list(DailyMetrics.objects.filter(date__lt=today))
+    has_rollup = bool(rows)
+    next_day = rows[-1].date + timedelta(days=1) if rows else min(window_start, month_start)
+    rows += collect_daily_metrics(next_day, today)
+
+    # Silinen ve durum değiştiren sözleşmeler özette kalmasın diye güncel durum anlık sayılır
+    contracts_by_status = Counter({
+        row['status']: row['count']
+        for row in Contract.objects.values('status').annotate(count=Count('pk')).order_by()
+    })
+    payments_by_status = Counter({
+        row['status']: row['count']
+        for row in Payment.objects.values('status').annotate(count=Count('id')).order_by()
+    })
+    notifications_by_type = Counter()
+    payments_by_type = {}
+    by_date = {}
+    summary = {
+        'total_contracts': sum(contracts_by_status.values()),
+        'contracts_this_month': 0,
+        'contracts_completed_this_month': 0,
+        'new_users_this_month': 0,
+        'new_users_last_30_days': 0,
+        'total_revenue': Decimal('0'),
+        'monthly_revenue': Decimal('0'),
+    }
+
+    for row in rows:
+        by_date[row.date] = row
+        summary['total_revenue'] += row.revenue
+        notifications_by_type.update(row.notifications_by_type)
+        for payment_type, values in row.payments_by_type.items():
+            item = payments_by_type.setdefault(
+                payment_type, {'payment_type': payment_type, 'count': 0, 'total': Decimal('0')}
+            )
+            item['count'] += values['count']
+            item['total'] += Decimal(values['total'])
+        if row.date >= month_start:
+            summary['contracts_this_month'] += row.contracts_created
+            summary['contracts_completed_this_month'] += row.contracts_completed
+            summary['new_users_this_month'] += row.new_users
+            summary['monthly_revenue'] += Decimal(row.payments_by_type.get('subscription', {}).get('total', '0'))
+        if row.date >= window_start:
+            summary['new_users_last_30_days'] += row.new_users
+
+    if not has_rollup:
+        # Satırlar sadece son günleri kapsar; toplamlar kısmi kalmasın
+        summary['total_revenue'], payments_by_type, notifications_by_type = _live_totals()
+
+    daily_revenue = []
+    daily_contracts = []
+    for offset in range(days):
+        day = window_start + timedelta(days=offset)
+        row = by_date.get(day)
+        daily_revenue.append({'date': day.strftime('%d.%m'), 'revenue': float(row.revenue) if row else 0.0})
+        daily_contracts.append({'date': day.strftime('%d.%m'), 'contracts': row.contracts_created if row else 0})
+
+    payments_by_type = sorted(payments_by_type.values(), key=lambda item: item['total'], reverse=True)
+    by_type = {item['payment_type']: item['total'] for item in payments_by_type}
+
+    summary.update({
+        'contracts_by_status': _sorted_counts(contracts_by_status, 'status'),
+        'signed_contracts': contracts_by_status.get('completed', 0),
+        'total_payments': payments_by_status.get('completed', 0),
+        'pending_payments': payments_by_status.get('pending', 0),
+        'failed_payments': payments_by_status.get('failed', 0),
+        'payments_by_type': payments_by_type,
+        'subscription_revenue': by_type.get('subscription', 0),
+        'pdf_revenue': by_type.get('pdf_download', 0),
+        'notifications_by_type': _sorted_counts(notifications_by_type, 'notification_type')[:5],
+        'daily_revenue': daily_revenue,
+        'daily_contracts': daily_contracts,
+    })
+    return summary
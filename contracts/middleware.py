@@ -0,0 +1,48 @@
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from .inbox import InboxSummary
+from .querybudget import QueryCounter, report
+
+
+class InboxSummaryMiddleware:
+    """Her request'e tembel hesaplanan `request.inbox` özetini ekler"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.inbox = SimpleLazyObject(lambda: InboxSummary(request.user))
+        return self.get_response(request)
+
+
+class QueryBudgetMiddleware:
+    """
+    Örneklenen isteklerde SQL sorgu sayısını ve veritabanı süresini ölçer
+    (QUERY_BUDGET_ENABLED, QUERY_BUDGET_SAMPLE_RATE). Diğer middleware'lerin
+    sorgularını da sayması için listenin başına yakın durmalıdır.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_BUDGET_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        report(request, counter)
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0021_payment_pdfdownloadaccess_subscriptionplan_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserContractStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Oluşturulan Sözleşme')),
+                ('signed_count', models.PositiveIntegerField(default=0, verbose_name='İmzalanan Sözleşme')),
+                ('invited_count', models.PositiveIntegerField(default=0, verbose_name='Bekleyen Davet')),
+                ('declined_count', models.PositiveIntegerField(default=0, verbose_name='Red Edilen Sözleşme')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='contract_stats', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Kullanıcı Sözleşme İstatistiği',
+                'verbose_name_plural': 'Kullanıcı Sözleşme İstatistikleri',
+            },
+        ),
+    ]
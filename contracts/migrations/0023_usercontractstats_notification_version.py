@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0022_usercontractstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercontractstats',
+            name='notification_version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Bildirim Versiyonu'),
+        ),
+    ]
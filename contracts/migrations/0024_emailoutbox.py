@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0023_usercontractstats_notification_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Konu')),
+                ('body', models.TextField(verbose_name='İçerik')),
+                ('from_email', models.CharField(blank=True, max_length=255, verbose_name='Gönderen')),
+                ('to', models.JSONField(default=list, verbose_name='Alıcılar')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('sending', 'Gönderiliyor'), ('sent', 'Gönderildi'), ('dead', 'Başarısız (Vazgeçildi)')], default='pending', max_length=10, verbose_name='Durum')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Sonraki Deneme')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Kilitlenme Zamanı')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gönderilme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'E-posta Kuyruğu',
+                'verbose_name_plural': 'E-posta Kuyruğu',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='contracts_e_status_9aea6c_idx')],
+            },
+        ),
+    ]
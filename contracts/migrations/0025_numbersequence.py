@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+def seed_contract_number_sequence(apps, schema_editor):
+    """Sayacı mevcut en büyük sözleşme numarasından başlat"""
+    Contract = apps.get_model('contracts', 'Contract')
+    NumberSequence = apps.get_model('contracts', 'NumberSequence')
+    last_number = Contract.objects.aggregate(last=models.Max('contract_number'))['last']
+    NumberSequence.objects.update_or_create(
+        name='contract_number',
+        defaults={'last_value': last_number or 999},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0024_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Sayaç')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Son Değer')),
+            ],
+            options={
+                'verbose_name': 'Numara Sayacı',
+                'verbose_name_plural': 'Numara Sayaçları',
+            },
+        ),
+        migrations.RunPython(seed_contract_number_sequence, migrations.RunPython.noop),
+    ]
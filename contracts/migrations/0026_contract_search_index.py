@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    """Herkese açık ve tamamlanmış sözleşmeler için FTS5 tablosu oluştur ve doldur"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    from contracts.search import SEARCH_TABLE, fold_text
+
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "title, content, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        # SQLite FTS5 olmadan derlenmiş; arama icontains ile devam eder
+        return
+
+    Contract = apps.get_model('contracts', 'Contract')
+    rows = [
+        (contract_number, fold_text(title), fold_text(content))
+        for contract_number, title, content in Contract.objects.filter(
+            visibility='public', status='completed'
+        ).values_list('contract_number', 'title', 'content')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, content) VALUES (%s, %s, %s)',
+            rows
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    from contracts.search import SEARCH_TABLE
+
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0025_numbersequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
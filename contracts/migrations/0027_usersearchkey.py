@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_user_search_keys(apps, schema_editor):
+    """Mevcut kullanıcılar için arama anahtarlarını oluştur"""
+    from contracts.search import user_search_keys
+
+    User = apps.get_model('auth', 'User')
+    UserSearchKey = apps.get_model('contracts', 'UserSearchKey')
+    UserSearchKey.objects.bulk_create(
+        [
+            UserSearchKey(user_id=user.pk, key=key)
+            for user in User.objects.all().iterator()
+            for key in user_search_keys(user)
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0026_contract_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=254, verbose_name='Anahtar')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_keys', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Kullanıcı Arama Anahtarı',
+                'verbose_name_plural': 'Kullanıcı Arama Anahtarları',
+                'unique_together': {('user', 'key')},
+            },
+        ),
+        migrations.RunPython(populate_user_search_keys, migrations.RunPython.noop),
+    ]
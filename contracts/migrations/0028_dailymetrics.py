@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0027_usersearchkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Tarih')),
+                ('new_users', models.PositiveIntegerField(default=0, verbose_name='Yeni Kullanıcı')),
+                ('contracts_created', models.PositiveIntegerField(default=0, verbose_name='Oluşturulan Sözleşme')),
+                ('contracts_by_status', models.JSONField(default=dict, verbose_name='Durumlara Göre Sözleşmeler')),
+                ('payments_by_status', models.JSONField(default=dict, verbose_name='Durumlara Göre Ödemeler')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Gelir (TL)')),
+                ('payments_by_type', models.JSONField(default=dict, verbose_name='Türlere Göre Tamamlanan Ödemeler')),
+                ('notifications_by_type', models.JSONField(default=dict, verbose_name='Türlere Göre Bildirimler')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Günlük Metrik',
+                'verbose_name_plural': 'Günlük Metrikler',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:32
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_contract_counters(apps, schema_editor):
+    """Mevcut sözleşmelerin taraf ve imza sayaçlarını tek UPDATE ile doldur"""
+    Contract = apps.get_model('contracts', 'Contract')
+    ContractParty = apps.get_model('contracts', 'ContractParty')
+    ContractSignature = apps.get_model('contracts', 'ContractSignature')
+
+    def count(queryset):
+        counts = queryset.filter(contract=models.OuterRef('pk')).order_by().values('contract').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        return Coalesce(models.Subquery(counts[:1]), 0)
+
+    Contract.objects.update(
+        party_count=count(ContractParty.objects.all()),
+        signed_count=count(ContractSignature.objects.filter(is_signed=True)),
+        declined_count=count(ContractParty.objects.filter(invitation_status='declined')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0028_dailymetrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='declined_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Reddeden Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='party_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Taraf Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='signed_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='İmzalayan Sayısı'),
+        ),
+        migrations.RunPython(populate_contract_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:07
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_contracts_completed(apps, schema_editor):
+    """Mevcut özet günlerine tamamlanan sözleşme sayılarını yaz"""
+    Contract = apps.get_model('contracts', 'Contract')
+    DailyMetrics = apps.get_model('contracts', 'DailyMetrics')
+
+    rows = (
+        Contract.objects
+        .filter(status='completed', completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at'))
+        .values('day')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for row in rows:
+        DailyMetrics.objects.filter(date=row['day']).update(contracts_completed=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0029_contract_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailymetrics',
+            name='contracts_by_status',
+        ),
+        migrations.AddField(
+            model_name='dailymetrics',
+            name='contracts_completed',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tamamlanan Sözleşme'),
+        ),
+        migrations.RunPython(fill_contracts_completed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0030_dailymetrics_contracts_completed'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailymetrics',
+            name='payments_by_status',
+        ),
+    ]
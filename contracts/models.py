@@ -1,10 +1,22 @@
 import uuid
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
 from datetime import datetime, timedelta
 
+from .events import (
+    broker, publish_on_commit, publish_unread_count,
+    serialize_notification, unread_count_payload
+)
+from .notifications import NotificationDispatcher, contract_party_user_ids
+from .widgets import invalidate_widgets
+from .search import (
+    index_contract, invalidate_user_search, is_searchable, unindex_contract_number,
+    user_search_keys
+)
+
 
 class ContractTemplate(models.Model):
     """Sözleşme şablonları"""
@@ -65,6 +77,79 @@ class ContractTemplate(models.Model):
         return None
 
 
+class ContractQuerySet(models.QuerySet):
+    """
+    Kullanıcıya göre sözleşme listeleri. Filtreler JOIN + DISTINCT yerine
+    EXISTS alt sorguları ile kurulur (tekrar eden satır olmaz, sıralama ve
+    keyset sayfalama SQL'de kalır); kullanıcıya ait taraf ve imza kayıtları
+    Prefetch(to_attr=...) ile sayfa başına tek sorguda yüklenir.
+    """
+
+    def created_by(self, user):
+        return self.filter(creator=user)
+
+    def signed_by(self, user):
+        return self.filter(models.Exists(
+            ContractSignature.objects.filter(contract=models.OuterRef('pk'), user=user, is_signed=True)
+        ))
+
+    def awaiting_signature_from(self, user):
+        """Kullanıcının davetli olduğu (reddetmediği) ve henüz imzalamadığı sözleşmeler"""
+        return self.filter(models.Exists(
+            ContractParty.objects.filter(
+                contract=models.OuterRef('pk'), user=user, invitation_status__in=['pending', 'accepted']
+            )
+        )).exclude(models.Exists(
+            ContractSignature.objects.filter(contract=models.OuterRef('pk'), user=user, is_signed=True)
+        ))
+
+    def declined_by_others(self, user):
+        """Kullanıcının oluşturduğu ve başka bir tarafın reddettiği sözleşmeler (declined_parties ile)"""
+        declined = ContractParty.objects.filter(invitation_status='declined').exclude(user=user)
+        return self.created_by(user).filter(models.Exists(
+            declined.filter(contract=models.OuterRef('pk'))
+        )).prefetch_related(
+            models.Prefetch('parties', queryset=declined.select_related('user'), to_attr='declined_parties')
+        )
+
+    def with_user_party(self, user):
+        """contract.user_parties: kullanıcının taraf kaydı (en fazla bir)"""
+        return self.prefetch_related(
+            models.Prefetch('parties', queryset=ContractParty.objects.filter(user=user), to_attr='user_parties')
+        )
+
+    def with_user_signature(self, user):
+        """contract.user_signatures: kullanıcının imza kaydı (en fazla bir)"""
+        return self.prefetch_related(
+            models.Prefetch('signatures', queryset=ContractSignature.objects.filter(user=user), to_attr='user_signatures')
+        )
+
+    def with_fragment_state(self):
+        """contract_detail parça önbelleği anahtarı için ilişkili kayıtların durumu (bkz. fragment_cache)"""
+        comments = ContractComment.objects.filter(contract=models.OuterRef('pk')).order_by('-updated_at')
+        return self.annotate(
+            accepted_party_count=_count_subquery(ContractParty.objects.filter(invitation_status='accepted')),
+            comment_count=_count_subquery(ContractComment.objects.all()),
+            last_comment_at=models.Subquery(comments.values('updated_at')[:1]),
+        )
+
+    def with_actual_counters(self):
+        """Sayaç sütunlarının gerçek değerleri (actual_party_count vb.); tutarlılık kontrolü için"""
+        return self.annotate(
+            actual_party_count=_count_subquery(ContractParty.objects.all()),
+            actual_signed_count=_count_subquery(ContractSignature.objects.filter(is_signed=True)),
+            actual_declined_count=_count_subquery(ContractParty.objects.filter(invitation_status='declined')),
+        )
+
+
+def _count_subquery(queryset):
+    """Sözleşme başına kayıt sayısı (ilişkili kayıt yoksa 0)"""
+    counts = queryset.filter(contract=models.OuterRef('pk')).order_by().values('contract').annotate(
+        count=models.Count('pk')
+    ).values('count')
+    return Coalesce(models.Subquery(counts[:1]), 0)
+
+
 class Contract(models.Model):
     """Ana sözleşme modeli"""
     STATUS_CHOICES = [
@@ -105,22 +190,119 @@ class Contract(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Tamamlanma Tarihi")
 
+    # Taraf ve imza sayaçları; sadece ContractParty / ContractSignature
+    # kaydedildikçe F() ile güncellenir (bkz. adjust_counters)
+    party_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Taraf Sayısı")
+    signed_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="İmzalayan Sayısı")
+    declined_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Reddeden Sayısı")
+
+    objects = ContractQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Sözleşme"
         verbose_name_plural = "Sözleşmeler"
         ordering = ['-created_at']
 
+    NUMBER_SEQUENCE = 'contract_number'
+    COUNTER_FIELDS = ['party_count', 'signed_count', 'declined_count']
+    SEARCH_FIELDS = {'title', 'content', 'status', 'visibility'}
+    FIRST_CONTRACT_NUMBER = 1000  # İlk sözleşme numarası
+
+    @classmethod
+    def assign_numbers(cls, contracts):
+        """Toplu oluşturma (bulk_create) öncesi numaraları tek seferde ayır"""
+        missing = [contract for contract in contracts if not contract.contract_number]
+        numbers = NumberSequence.reserve(cls.NUMBER_SEQUENCE, len(missing))
+        for contract, number in zip(missing, numbers):
+            contract.contract_number = number
+        return contracts
+
+    @classmethod
+    def adjust_counters(cls, contract_id, instance=None, **deltas):
+        """
+        Sayaçları tek UPDATE ile değiştir (örn. party_count=1, signed_count=-1).
+        instance verilirse bellekteki nesne de güncellenir.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        cls.objects.filter(pk=contract_id).update(**{
+            field: Greatest(models.F(field) + delta, 0) for field, delta in deltas.items()
+        })
+        if instance is not None:
+            for field, delta in deltas.items():
+                setattr(instance, field, max(getattr(instance, field) + delta, 0))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Yüklendiği andaki arama alanları ve havuz üyeliği; kayıtta indeks ve
+        # anonim sayfa önbelleği sadece bunlar gerçekten değiştiyse güncellenir
+        if cls.SEARCH_FIELDS.issubset(field_names):
+            instance._loaded_search_state = {name: getattr(instance, name) for name in cls.SEARCH_FIELDS}
+        if 'status' in field_names and 'visibility' in field_names:
+            instance._was_searchable = is_searchable(instance)
+        return instance
+
+    def changed_search_fields(self, update_fields=None):
+        """Yüklendikten sonra değişen arama alanları (önceki durum bilinmiyorsa None)"""
+        loaded = getattr(self, '_loaded_search_state', None)
+        if self._state.adding or loaded is None:
+            return None
+        return {
+            name for name, value in loaded.items()
+            if getattr(self, name) != value and (update_fields is None or name in update_fields)
+        }
+
     def save(self, *args, **kwargs):
         # Sözleşme numarası otomatik oluştur
         if not self.contract_number:
-            last_contract = Contract.objects.all().order_by('contract_number').last()
-            if last_contract:
-                self.contract_number = last_contract.contract_number + 1
-            else:
-                self.contract_number = 1000  # İlk sözleşme numarası
-
+            self.contract_number = NumberSequence.next_value(self.NUMBER_SEQUENCE)
+
+        is_new = self._state.adding
+        was_searchable = None if is_new else getattr(self, '_was_searchable', None)
+        changed = self.changed_search_fields(kwargs.get('update_fields'))
+        if not is_new and kwargs.get('update_fields') is None:
+            # Sayaçlar bellekte eskimiş olabilir; tam kayıtta üzerlerine yazılmasın
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
+        if is_new:
+            UserContractStats.refresh_for([self.creator_id])
+
+        update_fields = kwargs.get('update_fields')
+        # Tam kayıtlar da tüm alanları update_fields ile geçtiği için yüklenen durumla karşılaştırılır
+        if changed is None or 'status' in changed:
+            invalidate_widgets('contract')
+
+        # Havuz arama indeksi: havuzdaki sözleşmenin aranan alanları değiştiyse
+        # veya havuza girdiyse yeniden yazılır, havuzdan çıktıysa silinir
+        if is_searchable(self):
+            if changed is None or changed or not was_searchable:
+                index_contract(self)
+        elif not is_new and was_searchable is not False:
+            unindex_contract_number(self.contract_number)
+
+        # Bir sonraki kayıt yazılan değerlerle karşılaştırılır
+        saved = self.SEARCH_FIELDS if update_fields is None else self.SEARCH_FIELDS & set(update_fields)
+        if saved == self.SEARCH_FIELDS:
+            self._loaded_search_state = {name: getattr(self, name) for name in saved}
+        elif changed is not None:
+            self._loaded_search_state.update({name: getattr(self, name) for name in saved})
+
+    def delete(self, *args, **kwargs):
+        # Silinen sözleşme tarafların ve oluşturucunun sayaçlarını etkiler
+        affected_users = {self.creator_id, *self.parties.values_list('user_id', flat=True)}
+        contract_number = self.contract_number
+        result = super().delete(*args, **kwargs)
+        unindex_contract_number(contract_number)
+        UserContractStats.refresh_for(affected_users)
+        invalidate_widgets('contract')
+        return result
+
     def __str__(self):
         return f"#{self.contract_number} - {self.title}"
 
@@ -129,11 +311,11 @@ class Contract(models.Model):
 
     @property
     def total_parties(self):
-        return self.parties.count()
+        return self.party_count
 
     @property
     def signed_parties(self):
-        return self.signatures.filter(is_signed=True).count()
+        return self.signed_count
 
     @property
     def approved_parties(self):
@@ -156,8 +338,8 @@ class Contract(models.Model):
 
     @property
     def pending_signatures_count(self):
-        """Bekleyen imza sayısı"""
-        return self.signatures.filter(is_signed=False).count()
+        """Bekleyen imza sayısı (reddetmemiş ve henüz imzalamamış taraflar)"""
+        return max(self.party_count - self.declined_count - self.signed_count, 0)
 
     @property
     def status_display(self):
@@ -208,8 +390,17 @@ class Contract(models.Model):
             self.status = 'completed'
             self.completed_at = timezone.now()
             self.save(update_fields=['status', 'completed_at'])
+            # Kilitlenen sözleşmenin PDF'i artık değişmez; önbelleği hemen doldur
+            transaction.on_commit(self._warm_pdf_cache)
             return True
         return False
+
+    def _warm_pdf_cache(self):
+        from .pdf_cache import pdf_cache
+        try:
+            pdf_cache.warm(self)
+        except Exception as e:
+            print(f"PDF önbellek hatası: {e}")
     
     def has_declined_parties(self):
         """Sözleşmede red eden taraflar var mı kontrolü"""
@@ -320,12 +511,35 @@ class Notification(models.Model):
     def __str__(self):
         return f"{self.title} - {self.recipient.username}"
 
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+
+        UserContractStats.bump_notification_version([self.recipient_id])
+        invalidate_widgets('notification')
+
+        # Açık bildirim akışı varsa yeni bildirimi yayınla
+        if is_new:
+            publish_on_commit(self.recipient_id, 'notification', lambda: {
+                'notification': serialize_notification(self),
+                **unread_count_payload(self.recipient_id),
+            })
+
+    def delete(self, *args, **kwargs):
+        recipient_id = self.recipient_id
+        result = super().delete(*args, **kwargs)
+        UserContractStats.bump_notification_version([recipient_id])
+        invalidate_widgets('notification')
+        publish_unread_count(recipient_id)
+        return result
+
     def mark_as_read(self):
         """Bildirimi okundu olarak işaretle"""
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            publish_unread_count(self.recipient_id)
 
     def mark_as_sent(self):
         """Bildirimi gönderildi olarak işaretle"""
@@ -452,9 +666,11 @@ class ContractParty(models.Model):
         if self.contract.is_locked:
             return False
         # Sözleşme taslaktaysa ve taraf henüz imza atmadıysa çıkarılabilir
+        # (.all() ile listelerde önceden yüklenmiş imza ve onaylar kullanılır)
         return (self.contract.status == 'draft' and
-                not self.signatures.filter(is_signed=True).exists() and
-                not self.approvals.filter(is_approved=True).exists())
+                not any(signature.is_signed for signature in self.signatures.all()) and
+                not any(approval.is_approved for approval in self.contract.approvals.all()
+                        if approval.user_id == self.user_id))
 
     def check_removal_integrity(self):
         """Taraf çıkarma bütünlüğünü kontrol et"""
@@ -464,26 +680,57 @@ class ContractParty(models.Model):
 
     def save(self, *args, **kwargs):
         # Davet durumu değiştiğinde bildirim oluştur
+        old_status = old_user_id = None
         if self.pk:  # Update işlemi
             old_instance = ContractParty.objects.get(pk=self.pk)
+            old_status = old_instance.invitation_status
+            old_user_id = old_instance.user_id
             if old_instance.invitation_status != self.invitation_status:
                 self._create_status_change_notification(old_instance.invitation_status)
         
         super().save(*args, **kwargs)
 
+        # Sözleşmenin taraf ve red sayaçları
+        is_declined = self.invitation_status == 'declined'
+        self._adjust_contract_counters(
+            party_count=0 if old_status else 1,
+            declined_count=int(is_declined) - int(old_status == 'declined'),
+        )
+
+        # Davet ve red sayaçları sadece kullanıcı veya davet durumu değişince etkilenir
+        if old_status != self.invitation_status or old_user_id != self.user_id:
+            UserContractStats.refresh_for([self.user_id, old_user_id, self.contract.creator_id])
+
+    def delete(self, *args, **kwargs):
+        affected_users = [self.user_id, self.contract.creator_id]
+        # Tarafın imzaları da cascade ile silinir
+        signed = self.signatures.filter(is_signed=True).count()
+        result = super().delete(*args, **kwargs)
+        self._adjust_contract_counters(
+            party_count=-1,
+            declined_count=-int(self.invitation_status == 'declined'),
+            signed_count=-signed,
+        )
+        UserContractStats.refresh_for(affected_users)
+        return result
+
+    def _adjust_contract_counters(self, **deltas):
+        instance = self.contract if ContractParty.contract.is_cached(self) else None
+        Contract.adjust_counters(self.contract_id, instance=instance, **deltas)
+
     def _create_status_change_notification(self, old_status):
         """Davet durumu değiştiğinde bildirim oluştur"""
+        dispatcher = NotificationDispatcher(sender=self.user, contract=self.contract)
+
         if self.invitation_status == 'declined' and old_status != 'declined':
             # Sözleşme reddedildiğinde oluşturucuya bildirim
-            if self.user != self.contract.creator:
-                Notification.objects.create(
-                    recipient=self.contract.creator,
-                    sender=self.user,
+            if self.user_id != self.contract.creator_id:
+                dispatcher.add(
+                    self.contract.creator_id,
                     notification_type='contract_declined',
                     title=f'Sözleşme Reddedildi: {self.contract.title}',
                     message=f'{self.display_name} "{self.contract.title}" sözleşmenizi reddetti.' + 
                             (f' Red nedeni: {self.decline_reason}' if self.decline_reason else ''),
-                    contract=self.contract,
                     priority='high',
                     metadata={
                         'declined_by': self.user.username if self.user else self.name,
@@ -492,20 +739,20 @@ class ContractParty(models.Model):
                 )
         elif self.invitation_status == 'accepted' and old_status == 'pending':
             # Davet kabul edildiğinde oluşturucuya bildirim
-            if self.user != self.contract.creator:
-                Notification.objects.create(
-                    recipient=self.contract.creator,
-                    sender=self.user,
+            if self.user_id != self.contract.creator_id:
+                dispatcher.add(
+                    self.contract.creator_id,
                     notification_type='party_added',
                     title=f'Sözleşme Daveti Kabul Edildi: {self.contract.title}',
                     message=f'{self.display_name} "{self.contract.title}" sözleşmenize katıldı.',
-                    contract=self.contract,
                     priority='normal',
                     metadata={
                         'accepted_by': self.user.username if self.user else self.name,
                     }
                 )
 
+        dispatcher.dispatch()
+
 
 class ContractSignature(models.Model):
     """İmza bilgileri"""
@@ -531,22 +778,40 @@ class ContractSignature(models.Model):
 
     def save(self, *args, **kwargs):
         # İmza atıldığında bildirim oluştur
-        if self.is_signed and not ContractSignature.objects.filter(pk=self.pk, is_signed=True).exists():
+        was_signed = ContractSignature.objects.filter(pk=self.pk, is_signed=True).exists()
+        if self.is_signed and not was_signed:
             self._create_signature_notification()
         
         super().save(*args, **kwargs)
 
+        # İmza durumu değiştiyse imza ve davet sayaçlarını güncelle
+        if self.is_signed != was_signed:
+            self._adjust_contract_counters(signed_count=1 if self.is_signed else -1)
+            UserContractStats.refresh_for([self.user_id])
+
+    def delete(self, *args, **kwargs):
+        was_signed = self.is_signed
+        result = super().delete(*args, **kwargs)
+        if was_signed:
+            self._adjust_contract_counters(signed_count=-1)
+            UserContractStats.refresh_for([self.user_id])
+        return result
+
+    def _adjust_contract_counters(self, **deltas):
+        instance = self.contract if ContractSignature.contract.is_cached(self) else None
+        Contract.adjust_counters(self.contract_id, instance=instance, **deltas)
+
     def _create_signature_notification(self):
         """İmza atıldığında bildirim oluştur"""
+        dispatcher = NotificationDispatcher(sender=self.user, contract=self.contract)
+
         # Sözleşme oluşturucusuna bildirim (kendi imzası değilse)
-        if self.user != self.contract.creator:
-            Notification.objects.create(
-                recipient=self.contract.creator,
-                sender=self.user,
+        if self.user_id != self.contract.creator_id:
+            dispatcher.add(
+                self.contract.creator_id,
                 notification_type='contract_signed',
                 title=f'Sözleşme İmzalandı: {self.contract.title}',
                 message=f'{self.user.get_full_name() or self.user.username} "{self.contract.title}" sözleşmenizi imzaladı.',
-                contract=self.contract,
                 priority='high',
                 metadata={
                     'signed_by': self.user.username,
@@ -556,21 +821,18 @@ class ContractSignature(models.Model):
         
         # Diğer taraflara da bildirim (sözleşme tamamlandıysa)
         if self.contract.is_fully_signed:
-            other_parties = self.contract.parties.exclude(user=self.user)
-            for party in other_parties:
-                if party.user:
-                    Notification.objects.create(
-                        recipient=party.user,
-                        sender=self.user,
-                        notification_type='contract_completed',
-                        title=f'Sözleşme Tamamlandı: {self.contract.title}',
-                        message=f'"{self.contract.title}" sözleşmesi tüm taraflar tarafından imzalandı ve tamamlandı.',
-                        contract=self.contract,
-                        priority='normal',
-                        metadata={
-                            'completed_by': self.user.username,
-                        }
-                    )
+            dispatcher.add_many(
+                contract_party_user_ids(self.contract, exclude_user_id=self.user_id),
+                notification_type='contract_completed',
+                title=f'Sözleşme Tamamlandı: {self.contract.title}',
+                message=f'"{self.contract.title}" sözleşmesi tüm taraflar tarafından imzalandı ve tamamlandı.',
+                priority='normal',
+                metadata={
+                    'completed_by': self.user.username,
+                }
+            )
+
+        dispatcher.dispatch()
 
 
 class ContractApproval(models.Model):
@@ -622,21 +884,16 @@ class ContractComment(models.Model):
     def _create_comment_notification(self):
         """Yorum eklendiğinde bildirim oluştur"""
         # Sözleşmenin diğer taraflarına bildirim gönder
-        other_parties = self.contract.parties.exclude(user=self.user)
-        for party in other_parties:
-            if party.user:
-                Notification.objects.create(
-                    recipient=party.user,
-                    sender=self.user,
-                    notification_type='comment_added',
-                    title=f'Yeni Yorum: {self.contract.title}',
-                    message=f'{self.user.get_full_name() or self.user.username} "{self.contract.title}" sözleşmesine yorum ekledi.',
-                    contract=self.contract,
-                    priority='low',
-                    metadata={
-                        'comment_preview': self.content[:100] + ('...' if len(self.content) > 100 else ''),
-                    }
-                )
+        NotificationDispatcher(sender=self.user, contract=self.contract).add_many(
+            contract_party_user_ids(self.contract, exclude_user_id=self.user_id),
+            notification_type='comment_added',
+            title=f'Yeni Yorum: {self.contract.title}',
+            message=f'{self.user.get_full_name() or self.user.username} "{self.contract.title}" sözleşmesine yorum ekledi.',
+            priority='low',
+            metadata={
+                'comment_preview': self.content[:100] + ('...' if len(self.content) > 100 else ''),
+            }
+        ).dispatch()
 
 
 class UserProfile(models.Model):
@@ -686,6 +943,340 @@ class UserProfile(models.Model):
         }
 
 
+class UserContractStats(models.Model):
+    """Kullanıcı başına sözleşme sayaçları (context processor ve profil için önbellek)"""
+    COUNTER_FIELDS = ['created_count', 'signed_count', 'invited_count', 'declined_count']
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='contract_stats', verbose_name="Kullanıcı")
+
+    created_count = models.PositiveIntegerField(default=0, verbose_name="Oluşturulan Sözleşme")
+    signed_count = models.PositiveIntegerField(default=0, verbose_name="İmzalanan Sözleşme")
+    invited_count = models.PositiveIntegerField(default=0, verbose_name="Bekleyen Davet")
+    declined_count = models.PositiveIntegerField(default=0, verbose_name="Red Edilen Sözleşme")
+
+    # Bildirim API'lerinin ETag'i; kullanıcıyı etkileyen her değişiklikte artar
+    notification_version = models.PositiveBigIntegerField(default=0, verbose_name="Bildirim Versiyonu")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Kullanıcı Sözleşme İstatistiği"
+        verbose_name_plural = "Kullanıcı Sözleşme İstatistikleri"
+
+    def __str__(self):
+        return f"{self.user.username} - İstatistikler"
+
+    @classmethod
+    def compute(cls, user_ids=None):
+        """
+        Sayaçları kaynak tablolardan hesapla.
+        Her sayaç tek bir GROUP BY sorgusu ile hesaplanır; user_ids verilirse sadece o kullanıcılar.
+        """
+        contracts = Contract.objects.all()
+        signatures = ContractSignature.objects.filter(is_signed=True)
+        parties = ContractParty.objects.filter(
+            user__isnull=False,
+            invitation_status__in=['pending', 'accepted']
+        )
+        if user_ids is not None:
+            contracts = contracts.filter(creator_id__in=user_ids)
+            signatures = signatures.filter(user_id__in=user_ids)
+            parties = parties.filter(user_id__in=user_ids)
+
+        counters = {}
+
+        def put(rows, key, field):
+            for row in rows:
+                counters.setdefault(row[key], {})[field] = row['count']
+
+        put(contracts.values('creator_id').annotate(count=models.Count('id')),
+            'creator_id', 'created_count')
+        put(signatures.values('user_id').annotate(count=models.Count('id')),
+            'user_id', 'signed_count')
+
+        # Davet edilen, henüz imzalamadığı ve reddetmediği sözleşmeler
+        user_signed = ContractSignature.objects.filter(
+            contract=models.OuterRef('contract'),
+            user=models.OuterRef('user'),
+            is_signed=True
+        )
+        put(parties.exclude(models.Exists(user_signed))
+            .values('user_id').annotate(count=models.Count('contract', distinct=True)),
+            'user_id', 'invited_count')
+
+        # Kullanıcının oluşturduğu ve başka biri tarafından red edilen sözleşmeler
+        declined_by_other = ContractParty.objects.filter(
+            contract=models.OuterRef('pk'),
+            invitation_status='declined'
+        ).exclude(user=models.OuterRef('creator'))
+        put(contracts.filter(models.Exists(declined_by_other))
+            .values('creator_id').annotate(count=models.Count('id')),
+            'creator_id', 'declined_count')
+
+        return counters
+
+    @classmethod
+    def refresh_for(cls, user_ids):
+        """Verilen kullanıcıların sayaçlarını yeniden hesapla ve kaydet"""
+        user_ids = {uid for uid in user_ids if uid}
+        if not user_ids:
+            return
+        counters = cls.compute(user_ids)
+
+        # Sadece sayaçları değişen kullanıcılar yazılır ve bildirim akışına yayınlanır
+        previous = {
+            stats.user_id: stats
+            for stats in cls.objects.filter(user_id__in=user_ids).only('user_id', *cls.COUNTER_FIELDS)
+        }
+
+        rows = []
+        for uid in user_ids:
+            values = counters.get(uid, {})
+            row = cls(user_id=uid, **{f: values.get(f, 0) for f in cls.COUNTER_FIELDS})
+            if row.changed_counts(previous.get(uid)):
+                rows.append(row)
+
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=cls.COUNTER_FIELDS + ['updated_at'],
+            )
+            # Profil sayaçları tek UPDATE ile
+            UserProfile.objects.filter(user_id__in=[row.user_id for row in rows]).update(
+                total_contracts_created=models.Case(
+                    *[models.When(user_id=row.user_id, then=row.created_count) for row in rows]
+                ),
+                total_contracts_signed=models.Case(
+                    *[models.When(user_id=row.user_id, then=row.signed_count) for row in rows]
+                ),
+            )
+            for row in rows:
+                if broker.has_subscribers(row.user_id):
+                    changes = row.changed_counts(previous.get(row.user_id))
+                    publish_on_commit(row.user_id, 'counts', lambda changes=changes: changes)
+
+        # Taraf/imza değişiklikleri bildirim API'lerinin içeriğini etkiler
+        cls.bump_notification_version(user_ids)
+
+    @classmethod
+    def bump_notification_version(cls, user_ids):
+        """Kullanıcıların bildirim versiyonunu artır (ETag geçersizleşir)"""
+        user_ids = {uid for uid in user_ids if uid}
+        if user_ids:
+            cls.objects.filter(user_id__in=user_ids).update(
+                notification_version=models.F('notification_version') + 1
+            )
+
+    def changed_counts(self, previous=None):
+        """Önceki kayda göre değişen sayaçları API isimleriyle döndür"""
+        api_names = {
+            'created_count': 'created_contracts_count',
+            'signed_count': 'signed_contracts_count',
+            'invited_count': 'invited_contracts_count',
+            'declined_count': 'declined_contracts_count',
+        }
+        return {
+            api_name: getattr(self, field)
+            for field, api_name in api_names.items()
+            if previous is None or getattr(previous, field) != getattr(self, field)
+        }
+
+    @classmethod
+    def for_user(cls, user):
+        """Kullanıcının sayaçlarını döndür, kayıt yoksa oluştur"""
+        try:
+            return cls.objects.get(user=user)
+        except cls.DoesNotExist:
+            cls.refresh_for([user.pk])
+            return cls.objects.get(user=user)
+
+
+class UserSearchKey(models.Model):
+    """
+    Kullanıcı arama anahtarları (taraf seçici otomatik tamamlama).
+    Ad, soyad, kullanıcı adı ve e-posta yerel kısmı Türkçe katlanmış
+    olarak saklanır; arama indeksli aralık (önek) sorgusuyla yapılır.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_keys', verbose_name="Kullanıcı")
+    key = models.CharField(max_length=254, db_index=True, verbose_name="Anahtar")
+
+    class Meta:
+        verbose_name = "Kullanıcı Arama Anahtarı"
+        verbose_name_plural = "Kullanıcı Arama Anahtarları"
+        unique_together = ['user', 'key']
+
+    def __str__(self):
+        return f"{self.user.username}: {self.key}"
+
+    @classmethod
+    def refresh_for(cls, users):
+        """Anahtarları değişen kullanıcıların anahtarlarını yeniden yaz"""
+        wanted = {user.pk: user_search_keys(user) for user in users}
+        if not wanted:
+            return
+        existing = {}
+        for user_id, key in cls.objects.filter(user_id__in=wanted).values_list('user_id', 'key'):
+            existing.setdefault(user_id, set()).add(key)
+
+        changed = [user_id for user_id, keys in wanted.items() if existing.get(user_id, set()) != keys]
+        if not changed:
+            return
+        cls.objects.filter(user_id__in=changed).delete()
+        cls.objects.bulk_create(
+            [cls(user_id=user_id, key=key) for user_id in changed for key in wanted[user_id]],
+            ignore_conflicts=True,
+        )
+        # Diğer worker'lar da eski arama sonuçlarını kullanmasın
+        transaction.on_commit(invalidate_user_search)
+
+
+class NumberSequence(models.Model):
+    """
+    Sıralı numara sayaçları (örn. sözleşme numarası).
+    Numara ayırma tek bir UPDATE ile yapılır; eşzamanlı istekler aynı
+    numarayı alamaz ve MAX/ORDER BY taraması gerekmez. Ayrılan numara
+    kullanılmadan transaction geri alınırsa numarada boşluk oluşabilir.
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name="Sayaç")
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name="Son Değer")
+
+    class Meta:
+        verbose_name = "Numara Sayacı"
+        verbose_name_plural = "Numara Sayaçları"
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+    @classmethod
+    def initial_value(cls, name):
+        """Sayaç ilk kez kullanıldığında başlangıç değeri (son verilen numara)"""
+        if name == Contract.NUMBER_SEQUENCE:
+            last_number = Contract.objects.aggregate(
+                last=models.Max('contract_number')
+            )['last']
+            return last_number or Contract.FIRST_CONTRACT_NUMBER - 1
+        return 0
+
+    @classmethod
+    def reserve(cls, name, count=1):
+        """count adet ardışık numara ayır ve range olarak döndür"""
+        if count < 1:
+            return range(0)
+
+        with transaction.atomic():
+            # Önce UPDATE: satır (SQLite'ta veritabanı) yazma kilidi alınır,
+            # ardından okunan değer bu transaction'a aittir
+            updated = cls.objects.filter(name=name).update(
+                last_value=models.F('last_value') + count
+            )
+            if not updated:
+                cls._create(name)
+                cls.objects.filter(name=name).update(
+                    last_value=models.F('last_value') + count
+                )
+            last_value = cls.objects.filter(name=name).values_list('last_value', flat=True).get()
+
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def next_value(cls, name):
+        return cls.reserve(name, 1)[0]
+
+    @classmethod
+    def _create(cls, name):
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, last_value=cls.initial_value(name))
+        except IntegrityError:
+            # Başka bir istek aynı anda oluşturdu
+            pass
+
+
+class EmailOutbox(models.Model):
+    """
+    Gönderilecek e-postalar (transactional outbox).
+    Kayıt, domain değişikliğiyle aynı transaction içinde yazılır;
+    process_outbox komutu kuyruğu toplu halde SMTP'ye iletir.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Bekliyor'),
+        ('sending', 'Gönderiliyor'),
+        ('sent', 'Gönderildi'),
+        ('dead', 'Başarısız (Vazgeçildi)'),
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name="Konu")
+    body = models.TextField(verbose_name="İçerik")
+    from_email = models.CharField(max_length=255, blank=True, verbose_name="Gönderen")
+    to = models.JSONField(default=list, verbose_name="Alıcılar")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Durum")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Deneme Sayısı")
+    last_error = models.TextField(blank=True, verbose_name="Son Hata")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Sonraki Deneme")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Kilitlenme Zamanı")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Gönderilme Tarihi")
+
+    class Meta:
+        verbose_name = "E-posta Kuyruğu"
+        verbose_name_plural = "E-posta Kuyruğu"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.get_status_display()})"
+
+    @classmethod
+    def enqueue(cls, subject, body, to, from_email=None):
+        """E-postayı kuyruğa ekle (gönderimi process_outbox yapar)"""
+        from django.conf import settings
+        return cls.objects.create(
+            subject=subject,
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=[addr for addr in to if addr],
+        )
+
+    def claim(self):
+        """Kaydı gönderim için kilitle; başka bir worker aldıysa False"""
+        now = timezone.now()
+        claimed = EmailOutbox.objects.filter(pk=self.pk, status='pending').update(
+            status='sending',
+            locked_at=now,
+        )
+        if claimed:
+            self.status = 'sending'
+            self.locked_at = now
+        return bool(claimed)
+
+    def mark_sent(self):
+        self.status = 'sent'
+        self.sent_at = timezone.now()
+        self.attempts += 1
+        self.locked_at = None
+        self.save(update_fields=['status', 'sent_at', 'attempts', 'locked_at'])
+
+    def mark_failed(self, error, max_attempts, backoff_seconds):
+        """Başarısız denemeyi kaydet; deneme hakkı bittiyse dead-letter'a taşı"""
+        self.attempts += 1
+        self.last_error = str(error)
+        self.locked_at = None
+        if self.attempts >= max_attempts:
+            self.status = 'dead'
+        else:
+            self.status = 'pending'
+            # Üstel geri çekilme: 1x, 2x, 4x ... (en fazla 1 saat)
+            delay = min(backoff_seconds * 2 ** (self.attempts - 1), 3600)
+            self.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'next_attempt_at'])
+
+
 # ==================== ÜCRETLENDİRME SİSTEMİ ====================
 
 class SubscriptionPlan(models.Model):
@@ -751,6 +1342,15 @@ class UserSubscription(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.plan.name}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_widgets('usersubscription')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_widgets('usersubscription')
+        return result
+    
     @property
     def can_create_contract(self):
         """Kullanıcı sözleşme oluşturabilir mi"""
@@ -827,6 +1427,15 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.amount} TL - {self.get_status_display()}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_widgets('payment')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_widgets('payment')
+        return result
+    
     def mark_as_completed(self):
         """Ödemeyi tamamlandı olarak işaretle"""
         self.status = 'completed'
@@ -852,6 +1461,18 @@ class PdfDownloadAccess(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.contract.title}"
     
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        # Dashboard sadece erişim sayısını gösterir; increment_access etkilemez
+        if is_new:
+            invalidate_widgets('pdfdownloadaccess')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_widgets('pdfdownloadaccess')
+        return result
+    
     @property
     def is_valid(self):
         """Erişim hâlâ geçerli mi"""
@@ -862,4 +1483,31 @@ class PdfDownloadAccess(models.Model):
     def increment_access(self):
         """Erişim sayısını artır"""
         self.accessed_count += 1
-        self.save(update_fields=['accessed_count'])
\ No newline at end of file
+        self.save(update_fields=['accessed_count'])
+
+# ==================== METRİKLER ====================
+
+class DailyMetrics(models.Model):
+    """
+    Admin dashboard için günlük özet (rollup_metrics komutu ile doldurulur).
+    Tamamlanan sözleşmeler ve gelir completed_at gününe yazılır; güncel
+    durum dağılımları özette tutulmaz, dashboard'da anlık sayılır.
+    """
+    date = models.DateField(unique=True, verbose_name="Tarih")
+
+    new_users = models.PositiveIntegerField(default=0, verbose_name="Yeni Kullanıcı")
+    contracts_created = models.PositiveIntegerField(default=0, verbose_name="Oluşturulan Sözleşme")
+    contracts_completed = models.PositiveIntegerField(default=0, verbose_name="Tamamlanan Sözleşme")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Gelir (TL)")
+    payments_by_type = models.JSONField(default=dict, verbose_name="Türlere Göre Tamamlanan Ödemeler")
+    notifications_by_type = models.JSONField(default=dict, verbose_name="Türlere Göre Bildirimler")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Günlük Metrik"
+        verbose_name_plural = "Günlük Metrikler"
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date:%d.%m.%Y}"
@@ -0,0 +1,87 @@
+"""
+Toplu bildirim gönderimi.
+
+Model kancaları ve view'lar bildirimleri tek tek INSERT etmek yerine
+NotificationDispatcher'a ekler; dispatcher transaction commit edildikten
+sonra hepsini tek bir bulk_create ile yazar, alıcıların bildirim
+versiyonunu tek UPDATE ile artırır, bildirim widget'larını bir kez
+geçersiz kılar ve açık akışlara olayları iletir.
+"""
+from django.db import transaction
+
+from .events import broker, serialize_notification, unread_count_payload
+
+
+def contract_party_user_ids(contract, exclude_user_id=None):
+    """Sözleşmenin sistem kullanıcısı olan taraflarını tek sorguda döndür"""
+    parties = contract.parties.filter(user__isnull=False)
+    if exclude_user_id:
+        parties = parties.exclude(user_id=exclude_user_id)
+    return list(parties.values_list('user_id', flat=True))
+
+
+class NotificationDispatcher:
+    """Bildirimleri toplar ve commit sonrası tek seferde yazar"""
+
+    def __init__(self, sender=None, contract=None):
+        self.sender = sender
+        self.contract = contract
+        self._pending = []
+
+    def add(self, recipient, notification_type, title, message, priority='normal', metadata=None):
+        """Tek alıcı ekle (User veya kullanıcı id'si)"""
+        recipient_id = getattr(recipient, 'pk', recipient)
+        if recipient_id:
+            self._pending.append({
+                'recipient_id': recipient_id,
+                'notification_type': notification_type,
+                'title': title,
+                'message': message,
+                'priority': priority,
+                'metadata': metadata or {},
+            })
+        return self
+
+    def add_many(self, recipients, notification_type, title, message, priority='normal', metadata=None):
+        """Aynı bildirimi birden fazla alıcıya ekle"""
+        for recipient in recipients:
+            self.add(recipient, notification_type, title, message, priority, metadata)
+        return self
+
+    def dispatch(self):
+        """Bekleyen bildirimleri commit sonrası yaz"""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            transaction.on_commit(lambda: self._flush(pending))
+
+    def _flush(self, pending):
+        from .models import Notification, UserContractStats
+        from .widgets import invalidate_widgets
+
+        # Aynı alıcıya aynı bildirim iki kez gitmesin
+        seen = set()
+        notifications = []
+        for item in pending:
+            key = (item['recipient_id'], item['notification_type'], item['title'])
+            if key in seen:
+                continue
+            seen.add(key)
+            notifications.append(Notification(
+                sender=self.sender,
+                contract=self.contract,
+                **item
+            ))
+
+        Notification.objects.bulk_create(notifications)
+
+        recipient_ids = {n.recipient_id for n in notifications}
+        UserContractStats.bump_notification_version(recipient_ids)
+        invalidate_widgets('notification')
+
+        # bulk_create save() çağırmaz; akış olaylarını burada yayınla
+        for notification in notifications:
+            if broker.has_subscribers(notification.recipient_id):
+                broker.publish(notification.recipient_id, 'notification', {
+                    'notification': serialize_notification(notification),
+                    **unread_count_payload(notification.recipient_id),
+                })
@@ -0,0 +1,168 @@
+"""
+Anonim ziyaretçiler için tam sayfa önbelleği (ana sayfa, sözleşme havuzu).
+
+Giriş yapmamış kullanıcıların GET isteklerine verilen yanıtlar view adı ve
+sorgu dizesine göre PUBLIC_PAGE_CACHE_TTL saniye saklanır. Anahtarlar bir
+sürüm numarası içerir: bir sözleşme halka açık tamamlanmış sözleşmeler
+arasına girdiğinde veya çıktığında (apps.ready içinde bağlanan sinyaller)
+sürüm artırılır ve tüm sayfalar birlikte geçersiz olur. Sürümün kalıcı
+değeri veritabanında (NumberSequence) tutulur ve değişiklikle aynı
+transaction'da artırılır. İsteklerde ise önbellekteki kopyası okunur: commit
+sonrasında cache.incr ile artırılır ve PUBLIC_PAGE_VERSION_TTL saniyede bir
+veritabanından tazelenir; böylece önbellek isabetleri sorgu çalıştırmaz,
+süreç içi önbellek kullanan worker'lar da en geç bu süre sonunda yeni sürümü
+görür. Yanıtlar Cache-Control/Vary başlıklarıyla döner;
+ters vekil sunucular sayfayı en fazla PUBLIC_PAGE_CACHE_MAX_AGE saniye
+saklar (onlara geçersiz kılma ulaşmaz). İsabet oranı süreç içi tutulur.
+"""
+import hashlib
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .search import is_searchable
+
+CACHE_PREFIX = 'page:'
+VERSION_SEQUENCE = 'public_pages'
+VERSION_KEY = f'{CACHE_PREFIX}version'
+
+
+def page_cache_ttl():
+    return getattr(settings, 'PUBLIC_PAGE_CACHE_TTL', 300)
+
+
+def page_cache_max_age():
+    return getattr(settings, 'PUBLIC_PAGE_CACHE_MAX_AGE', 60)
+
+
+def page_version_ttl():
+    return getattr(settings, 'PUBLIC_PAGE_VERSION_TTL', 5)
+
+
+class PageCacheStats:
+    """View başına önbellek isabet/ıska sayıları"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, hit):
+        with self._lock:
+            counts = self._counts.setdefault(view_name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: tuple(counts) for name, counts in self._counts.items()}
+
+        rows = []
+        for view_name, (hits, misses) in sorted(snapshot.items()):
+            rows.append({
+                'view': view_name,
+                'requests': hits + misses,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3),
+            })
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+page_cache_stats = PageCacheStats()
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        from .models import NumberSequence
+        version = NumberSequence.objects.filter(name=VERSION_SEQUENCE).values_list('last_value', flat=True).first() or 0
+        cache.add(VERSION_KEY, version, page_version_ttl())
+    return version
+
+
+def page_key(view_name, request):
+    query = hashlib.sha256(request.META.get('QUERY_STRING', '').encode()).hexdigest()
+    return f'{CACHE_PREFIX}{current_version()}:{view_name}:{query}'
+
+
+def _bump_cached_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Önbellekte yoksa bir sonraki istek veritabanından okur
+        pass
+
+
+def invalidate_public_pages():
+    """Önbellekteki tüm anonim sayfaları geçersiz kıl"""
+    from .models import NumberSequence
+    # Açık transaction içindeyse artış değişiklikle birlikte commit edilir (ya da geri alınır);
+    # önbellekteki kopya yalnızca commit sonrasında artırılır
+    NumberSequence.next_value(VERSION_SEQUENCE)
+    transaction.on_commit(_bump_cached_version)
+
+
+def invalidate_for_contract_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    searchable = is_searchable(instance)
+    # Yüklenirken kaydedilen durum (Contract.from_db); bilinmiyorsa değişmiş sayılır
+    was_searchable = False if created else getattr(instance, '_was_searchable', None)
+    instance._was_searchable = searchable
+    if searchable != was_searchable:
+        invalidate_public_pages()
+
+
+def invalidate_for_contract_delete(sender, instance, **kwargs):
+    if getattr(instance, '_was_searchable', is_searchable(instance)):
+        invalidate_public_pages()
+
+
+def cache_public_page(view_func):
+    """Anonim GET isteklerinde yanıtı önbellekten ver, yoksa üretip sakla"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            response = view_func(request, *args, **kwargs)
+            patch_vary_headers(response, ['Cookie'])
+            patch_cache_control(response, private=True)
+            return response
+
+        view_name = request.resolver_match.view_name if request.resolver_match else view_func.__name__
+        key = page_key(view_name, request)
+        cached = cache.get(key)
+        page_cache_stats.record(view_name, hit=cached is not None)
+
+        if cached is not None:
+            content_type, content = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = view_func(request, *args, **kwargs)
+
+        # Çerez yazan yanıt kişiye özeldir; CSRF ve oturum çerezleri middleware'de
+        # sonradan eklendiği için istek üzerindeki işaretlere de bakılır
+        shareable = (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            and not getattr(getattr(request, 'session', None), 'modified', False)
+        )
+        if cached is None and shareable:
+            cache.set(key, (response['Content-Type'], response.content), page_cache_ttl())
+
+        patch_vary_headers(response, ['Cookie'])
+        if shareable:
+            patch_cache_control(response, public=True, max_age=page_cache_max_age())
+        else:
+            patch_cache_control(response, private=True)
+        return response
+    return wrapper
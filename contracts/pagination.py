@@ -0,0 +1,288 @@
+"""
+İmleç (cursor / keyset) tabanlı sayfalama.
+
+OFFSET yerine son görülen kaydın sıralama değerlerinden devam edilir:
+derin sayfalar da ilk sayfa kadar hızlıdır ve toplam sayı sadece
+istendiğinde hesaplanır. İmleçler imzalı ve opak token'lardır; istemci
+içeriğini çözemez veya değiştiremez.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_SALT = 'contracts.pagination.cursor'
+
+
+def encode_cursor(data):
+    return signing.dumps(data, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    """Geçersiz veya değiştirilmiş token ilk sayfa olarak yorumlanır"""
+    if not token:
+        return None
+    try:
+        return signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def get_page_size(request, default=None):
+    """?page_size= ile istenen sayfa boyutu (ayarlardaki üst sınırla)"""
+    default = default or getattr(settings, 'CONTRACT_LIST_PAGE_SIZE', 20)
+    max_size = getattr(settings, 'CONTRACT_LIST_MAX_PAGE_SIZE', 100)
+    try:
+        size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, max_size))
+
+
+def wants_count(request):
+    """Toplam sayı sadece ?count=1 ile istenirse hesaplanır"""
+    return request.GET.get('count') in ('1', 'true', 'yes')
+
+
+def resolve_sort(request, allowed, default):
+    """?sort= değerini izin verilen sıralamalarla sınırla"""
+    sort_by = request.GET.get('sort', default)
+    return sort_by if sort_by in allowed else default
+
+
+class CountEstimate:
+    """
+    Şablonda gösterilecek toplam. approximate: tablo istatistiğinden tahmin,
+    more: sayım üst sınırda kesildi ("1000+").
+    """
+
+    def __init__(self, value, approximate=False, more=False):
+        self.value = value
+        self.approximate = approximate
+        self.more = more
+
+    def __str__(self):
+        if self.more:
+            return f'{self.value}+'
+        if self.approximate:
+            return f'~{self.value}'
+        return str(self.value)
+
+
+def table_row_estimate(model, using='default'):
+    """
+    Tablonun satır sayısı için COUNT(*) taraması yapmayan tahmin.
+    SQLite'ta max(rowid) (B-ağacının son kaydı), PostgreSQL'de planlayıcı
+    istatistiği kullanılır; diğer veritabanlarında None döner.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'SELECT max(rowid) FROM {table}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return 0
+    return row[0]
+
+
+def estimated_count(queryset, limit=1000):
+    """
+    Ucuz toplam: filtresiz sorgularda tablo tahmini, filtreli sorgularda en
+    fazla limit+1 satır okuyan sınırlı sayım.
+    """
+    query = queryset.query
+    if not query.where and not query.distinct:
+        value = table_row_estimate(queryset.model, queryset.db)
+        if value is not None:
+            return CountEstimate(value, approximate=True)
+
+    value = queryset.order_by()[:limit + 1].count()
+    if value > limit:
+        return CountEstimate(limit, more=True)
+    return CountEstimate(value)
+
+
+class CursorPage:
+    """Tek bir sayfa; şablonlarda liste gibi kullanılabilir"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def as_dict(self, serialize):
+        """JSON yanıtı için standart sayfa yapısı"""
+        data = {
+            'results': [serialize(obj) for obj in self.object_list],
+            'next_cursor': self.next_cursor,
+            'previous_cursor': self.previous_cursor,
+        }
+        if self.count is not None:
+            data['count'] = self.count
+        return data
+
+
+class CursorPaginator:
+    """
+    Keyset sayfalama. ordering alanları ('-created_at' gibi) sırayla
+    karşılaştırılır; benzersizlik için sona her zaman birincil anahtar eklenir.
+    Sıralama alanları NULL içermemelidir.
+    """
+
+    def __init__(self, queryset, ordering=('-created_at',), page_size=20):
+        pk_name = queryset.model._meta.pk.name
+        ordering = [field for field in ordering if field.lstrip('-') not in ('pk', pk_name)]
+        # Eşit değerlerde kararlı sıra için son alanın yönünde birincil anahtar
+        last_desc = ordering[-1].startswith('-') if ordering else True
+        ordering.append(f'-{pk_name}' if last_desc else pk_name)
+
+        self.queryset = queryset
+        self.ordering = ordering
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.page_size = page_size
+
+    def _field(self, path):
+        """'creator__username' gibi yolları model alanına çöz"""
+        model = self.queryset.model
+        field = None
+        for part in path.split('__'):
+            if part in self.queryset.query.annotations:
+                return self.queryset.query.annotations[part].output_field
+            field = model._meta.get_field(part)
+            model = field.related_model or model
+        return field
+
+    def _value(self, obj, path):
+        value = obj
+        for part in path.split('__'):
+            value = getattr(value, part)
+        return value
+
+    def _encode_values(self, obj):
+        values = []
+        for path in self.fields:
+            value = self._value(obj, path)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return values
+
+    def _decode_values(self, values):
+        return [self._field(path).to_python(value) for path, value in zip(self.fields, values)]
+
+    def _after(self, values, reverse=False):
+        """
+        (a, b, c) > (x, y, z) karşılaştırmasını Q olarak kur:
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        """
+        condition = Q()
+        equal = {}
+        for field, order, value in zip(self.fields, self.ordering, values):
+            descending = order.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def page(self, cursor=None, with_count=False):
+        data = decode_cursor(cursor)
+        queryset = self.queryset
+        backwards = False
+
+        if data and len(data.get('v', [])) == len(self.fields):
+            try:
+                values = self._decode_values(data['v'])
+            except Exception:
+                # Çözülemeyen değerler de ilk sayfa (önceki sayfa bağlantısı olmadan)
+                data = None
+            else:
+                backwards = data.get('d') == 'prev'
+                queryset = queryset.filter(self._after(values, reverse=backwards))
+        else:
+            data = None
+
+        ordering = self._reversed_ordering() if backwards else self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = encode_cursor({'v': self._encode_values(rows[-1]), 'd': 'next'})
+            if data is not None and (has_more or not backwards):
+                previous_cursor = encode_cursor({'v': self._encode_values(rows[0]), 'd': 'prev'})
+
+        count = self.queryset.count() if with_count else None
+        return CursorPage(rows, next_cursor, previous_cursor, count)
+
+
+class SequenceCursorPaginator:
+    """
+    Önceden sıralanmış, dilimlenebilir sonuçlar (örn. BM25 sıralı arama)
+    için aynı imleç arayüzü; token içinde konum saklanır.
+    """
+
+    def __init__(self, sequence, page_size=20):
+        self.sequence = sequence
+        self.page_size = page_size
+
+    def page(self, cursor=None, with_count=False):
+        data = decode_cursor(cursor) or {}
+        offset = data.get('o', 0) if isinstance(data.get('o'), int) else 0
+        offset = max(offset, 0)
+
+        rows = list(self.sequence[offset:offset + self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        next_cursor = encode_cursor({'o': offset + self.page_size}) if has_more else None
+        previous_cursor = None
+        if offset > 0:
+            previous_cursor = encode_cursor({'o': max(offset - self.page_size, 0)})
+
+        count = len(self.sequence) if with_count else None
+        return CursorPage(rows, next_cursor, previous_cursor, count)
+
+
+def paginate(request, queryset_or_sequence, ordering=None, **kwargs):
+    """View'lar için kısayol: istekteki cursor, page_size ve count parametrelerini uygula"""
+    page_size = get_page_size(request)
+    if ordering is None:
+        paginator = SequenceCursorPaginator(queryset_or_sequence, page_size=page_size)
+    else:
+        paginator = CursorPaginator(queryset_or_sequence, ordering=ordering, page_size=page_size)
+    return paginator.page(request.GET.get('cursor'), with_count=wants_count(request), **kwargs)
@@ -0,0 +1,245 @@
+"""
+Sözleşme PDF çıktısı.
+
+Fontlar ve paragraf stilleri her istekte değil, süreç başına bir kez
+hazırlanır. contract_pdf view'ı, admin, PDF önbelleği ve yönetim komutları
+aynı çıktıyı üretmek için render_contract fonksiyonunu kullanır.
+"""
+import os
+import re
+import threading
+import unicodedata
+from io import BytesIO
+
+from reportlab.lib.colors import black
+from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+
+class PdfRenderError(Exception):
+    """Sözleşme PDF'i üretilemedi"""
+
+
+def safe_text(text):
+    """Türkçe karakterleri güvenli hale getirir"""
+    if not text:
+        return ""
+
+    text = str(text)
+    # Çoğu metin zaten NFC; normalize sadece gerektiğinde çalışır
+    if not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+    # Eşleşmemiş surrogate karakterleri ReportLab'i bozmasın
+    return text.encode('utf-8', 'ignore').decode('utf-8')
+
+
+FONTS_DIR = os.path.join(os.path.dirname(__file__), 'fonts')
+
+# (normal, kalın) font dosyası adayları, öncelik sırasıyla
+SYSTEM_FONTS = [
+    ('/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+     '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf'),  # Linux
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+     '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),  # Linux
+    ('/System/Library/Fonts/Arial.ttf',
+     '/System/Library/Fonts/Arial Bold.ttf'),  # macOS
+    ('C:/Windows/Fonts/arial.ttf',
+     'C:/Windows/Fonts/arialbd.ttf'),  # Windows
+]
+
+
+class PdfEngine:
+    """
+    Süreç başına bir kez hazırlanan PDF üreticisi.
+    Fontlar ve stiller ilk kullanımda yüklenir, sonraki tüm belgeler
+    aynı nesneleri kullanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self.font_name = 'Helvetica'
+        self.bold_font_name = 'Helvetica-Bold'
+        self.styles = {}
+
+    def _font_candidates(self):
+        # Önce proje ile gelen fontlar (contracts/fonts)
+        for regular in ('arial.ttf', 'arial_unicode.ttf'):
+            path = os.path.join(FONTS_DIR, regular)
+            yield path, os.path.join(FONTS_DIR, 'arialbd.ttf')
+        yield from SYSTEM_FONTS
+
+    def _register_fonts(self):
+        for regular, bold in self._font_candidates():
+            if not os.path.exists(regular):
+                continue
+            try:
+                pdfmetrics.registerFont(TTFont('TurkishFont', regular))
+                bold_name = 'TurkishFont'
+                if os.path.exists(bold):
+                    pdfmetrics.registerFont(TTFont('TurkishFont-Bold', bold))
+                    bold_name = 'TurkishFont-Bold'
+                # <b> etiketlerinin TTF ailesine eşlenebilmesi için
+                registerFontFamily(
+                    'TurkishFont',
+                    normal='TurkishFont', bold=bold_name,
+                    italic='TurkishFont', boldItalic=bold_name,
+                )
+            except Exception as e:
+                print(f"Font yükleme hatası: {e}")
+                continue
+            self.font_name = 'TurkishFont'
+            self.bold_font_name = bold_name
+            print(f"Türkçe font yüklendi: {regular}")
+            return
+
+    def _build_styles(self):
+        sample = getSampleStyleSheet()
+        common = {
+            'fontName': self.font_name,
+            'textColor': black,
+            'encoding': 'utf-8',
+            'allowOrphans': 1,
+            'allowWidows': 1,
+        }
+        self.styles = {
+            'title': ParagraphStyle(
+                'CustomTitle', parent=sample['Heading1'],
+                fontSize=18, spaceAfter=20, alignment=TA_CENTER, **common
+            ),
+            'content': ParagraphStyle(
+                'CustomContent', parent=sample['Normal'],
+                fontSize=12, spaceAfter=12, alignment=TA_LEFT, **common
+            ),
+            # Sözleşme metni satır satır yazılır; satırlar arası boşluk yok
+            'body': ParagraphStyle(
+                'CustomBody', parent=sample['Normal'],
+                fontSize=12, spaceAfter=0, alignment=TA_LEFT, **common
+            ),
+            'heading': ParagraphStyle(
+                'CustomHeading', parent=sample['Heading2'],
+                fontSize=14, spaceAfter=10, alignment=TA_LEFT, **common
+            ),
+            'error': sample['Normal'],
+        }
+
+    def setup(self):
+        """Fontları ve stilleri hazırla (sadece ilk çağrıda çalışır)"""
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                self._register_fonts()
+                self._build_styles()
+                self._ready = True
+
+    def reset(self):
+        """Bir sonraki belgede kurulumu tekrarla (benchmark için)"""
+        with self._lock:
+            self._ready = False
+
+    def build_story(self, contract):
+        styles = self.styles
+        story = []
+
+        # Başlık
+        story.append(Paragraph(safe_text(contract.title), styles['title']))
+        story.append(Spacer(1, 12))
+
+        # İçerik: tek dev paragraf yerine satır başına bir paragraf,
+        # ReportLab'in sayfa bölme maliyeti metin uzunluğuyla katlanarak artmasın
+        line_height = styles['body'].leading
+        for line in safe_text(contract.content).splitlines():
+            if line.strip():
+                story.append(Paragraph(line, styles['body']))
+            else:
+                story.append(Spacer(1, line_height))
+        story.append(Spacer(1, styles['content'].spaceAfter + 12))
+
+        # Taraflar
+        story.append(Paragraph("Taraflar:", styles['heading']))
+
+        party_names = []
+        for party in contract.parties.all():
+            if party.user:
+                party_name = party.user.get_full_name() or party.user.username
+                party_email = party.user.email
+            else:
+                party_name = party.name or "İsimsiz"
+                party_email = party.email or ""
+            party_names.append(party_name)
+            story.append(Paragraph(safe_text(f"- {party_name} ({party_email})"), styles['content']))
+
+        # İmzalar
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("İmzalar:", styles['heading']))
+
+        for party_name in party_names:
+            signature_text = safe_text(f"_______________________________<br/><b>{party_name}</b>")
+            story.append(Paragraph(signature_text, styles['content']))
+            story.append(Spacer(1, 30))
+
+        return story
+
+    def render(self, contract, stream=None, fallback=True):
+        """
+        Sözleşmeyi PDF olarak üret.
+        stream verilirse PDF oraya yazılır ve stream döner, verilmezse bytes döner.
+        fallback=False ise hata durumunda hata belgesi yerine PdfRenderError fırlatılır.
+        """
+        self.setup()
+        output = stream if stream is not None else BytesIO()
+        start = output.tell() if output.seekable() else None
+
+        try:
+            SimpleDocTemplate(output, pagesize=letter).build(self.build_story(contract))
+        except Exception as pdf_error:
+            print(f"PDF oluşturma hatası: {pdf_error}")
+            if start is not None:
+                output.seek(start)
+                output.truncate()
+            if not fallback:
+                raise PdfRenderError(str(pdf_error)) from pdf_error
+            self.render_error(output)
+
+        if stream is not None:
+            return stream
+        return output.getvalue()
+
+    def render_error(self, stream=None):
+        """Sözleşme üretilemediğinde kullanıcıya gösterilen basit hata belgesi"""
+        self.setup()
+        output = stream if stream is not None else BytesIO()
+        error_msg = "PDF oluşturulurken bir hata oluştu. Lütfen sayfayı yenileyip tekrar deneyin."
+        SimpleDocTemplate(output, pagesize=letter).build([Paragraph(error_msg, self.styles['error'])])
+        if stream is not None:
+            return stream
+        return output.getvalue()
+
+
+engine = PdfEngine()
+
+
+def render_contract(contract, stream=None, fallback=True):
+    """Sözleşmenin PDF çıktısını üret (bkz. PdfEngine.render)"""
+    return engine.render(contract, stream, fallback)
+
+
+def render_error_pdf():
+    """Üretim hatasında dönülecek hata belgesi (önbelleğe alınmaz)"""
+    return engine.render_error()
+
+
+def pdf_filename(contract):
+    """İndirme için güvenli dosya adı"""
+    # Dosya adını Türkçe karakter sorunu olmadan ayarla
+    safe_filename = safe_text(contract.title)
+    # Dosya adı için güvenli karakterlere dönüştür
+    safe_filename = re.sub(r'[^\w\-_\.]', '_', safe_filename)
+    safe_filename = safe_filename[:100]  # Dosya adı çok uzun olmasın
+    return f'{safe_filename}.pdf'
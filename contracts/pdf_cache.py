@@ -0,0 +1,166 @@
+"""
+İçerik adresli PDF önbelleği.
+
+Üretilen PDF'ler diskte, sözleşmenin PDF'e yansıyan tüm bilgilerinin
+(başlık, içerik, taraflar, imza durumu) özetinden türetilen anahtarla
+saklanır. Sözleşme değiştiğinde anahtar da değiştiği için geçersiz kılma
+gerekmez; eski dosyalar boyut sınırı aşıldığında en az kullanılandan
+başlanarak (LRU) silinir. Toplam boyut süreç içinde izlenir, dizin sadece
+sınır aşıldığında (veya pdf_cache evict komutuyla) taranır. Üretim hatası
+durumunda dönen hata belgesi önbelleğe yazılmaz.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .pdf import render_contract
+
+# Çıktı formatı değiştiğinde artırılır; eski önbellek dosyaları kullanılmaz
+RENDER_VERSION = 2
+
+
+def contract_pdf_key(contract):
+    """PDF'i etkileyen tüm alanların SHA-256 özeti"""
+    parties = []
+    for party in contract.parties.all():
+        if party.user:
+            name = party.user.get_full_name() or party.user.username
+            email = party.user.email
+        else:
+            name = party.name
+            email = party.email
+        parties.append([party.pk, name, email, party.role, party.invitation_status])
+
+    signatures = sorted(
+        [signature.party_id, signature.is_signed, signature.signed_at.isoformat() if signature.signed_at else None]
+        for signature in contract.signatures.all()
+    )
+
+    payload = json.dumps({
+        'version': RENDER_VERSION,
+        'id': str(contract.pk),
+        'title': contract.title,
+        'content': contract.content,
+        'parties': sorted(parties),
+        'signatures': signatures,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    """Boyut sınırlı, disk üzerinde PDF önbelleği"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        # Dizindeki toplam boyutun süreç içi tahmini (ilk yazmada taranır)
+        self._size = None
+        self._size_lock = threading.Lock()
+
+    @property
+    def directory(self):
+        return Path(self._directory or getattr(
+            settings, 'CONTRACT_PDF_CACHE_DIR', settings.BASE_DIR / 'cache' / 'pdf'
+        ))
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, 'CONTRACT_PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+
+    def path_for(self, key):
+        return self.directory / key[:2] / f'{key}.pdf'
+
+    def get(self, contract):
+        """
+        Önbellekteki dosyanın yolunu döndür, yoksa PDF'i üretip kaydet.
+        Üretim başarısız olursa PdfRenderError fırlatılır, hiçbir şey saklanmaz.
+        """
+        key = contract_pdf_key(contract)
+        path = self.path_for(key)
+        if path.exists():
+            self._touch(path)
+            return path
+        return self._store(path, render_contract(contract, fallback=False))
+
+    def warm(self, contract):
+        """Sözleşmenin PDF'ini önceden üret (varsa dokunmadan geç)"""
+        return self.get(contract)
+
+    def _touch(self, path):
+        # LRU sıralaması dosyanın değiştirilme zamanına göre yapılır
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _store(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._size_lock:
+            if self._size is None:
+                self._size = self.total_size()
+            else:
+                self._size += len(data)
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+        return path
+
+    def entries(self):
+        """(yol, boyut, son kullanım) listesi"""
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def total_size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Toplam boyut sınırın altına inene kadar en eski dosyaları sil"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._size_lock:
+            self._size = total
+        return removed
+
+    def purge(self):
+        """Önbelleği tamamen temizle"""
+        return self.evict(max_bytes=0)
+
+
+pdf_cache = PdfCache()
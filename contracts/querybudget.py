@@ -0,0 +1,118 @@
+"""
+Sorgu bütçesi ölçümü (QueryBudgetMiddleware).
+
+Örneklenen isteklerde SQL sorgu sayısı ve veritabanında geçen süre
+connection.execute_wrapper ile ölçülür. URL adına göre bütçeyi aşan
+istekler loglanır; her view için son QUERY_BUDGET_WINDOW isteğin kayan
+özeti (p50/p95) süreç içinde tutulur ve staff sayfasında gösterilir.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger('contracts.querybudget')
+
+
+class QueryCounter:
+    """execute_wrapper: sorgu sayısı ve toplam veritabanı süresi"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+def percentile(values, percent):
+    """En yakın sıra yöntemiyle yüzdelik (values sıralı olmalı)"""
+    if not values:
+        return 0
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[index]
+
+
+def get_budget(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', 30))
+
+
+class QueryStats:
+    """View başına son N isteğin (sorgu sayısı, veritabanı ms) kayan penceresi"""
+
+    def __init__(self, window=None):
+        self.window = window
+        self._samples = {}
+        self._over_budget = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, queries, db_ms):
+        window = self.window or getattr(settings, 'QUERY_BUDGET_WINDOW', 500)
+        with self._lock:
+            samples = self._samples.get(view_name)
+            if samples is None:
+                samples = self._samples[view_name] = deque(maxlen=window)
+            samples.append((queries, db_ms))
+            if queries > get_budget(view_name):
+                self._over_budget[view_name] = self._over_budget.get(view_name, 0) + 1
+
+    def summary(self):
+        """Her view için özet; en çok sorgu çalıştıranlar önce"""
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            over_budget = dict(self._over_budget)
+
+        rows = []
+        for view_name, samples in snapshot.items():
+            queries = sorted(sample[0] for sample in samples)
+            db_ms = sorted(sample[1] for sample in samples)
+            rows.append({
+                'view': view_name,
+                'requests': len(samples),
+                'budget': get_budget(view_name),
+                'over_budget': over_budget.get(view_name, 0),
+                'queries_p50': percentile(queries, 50),
+                'queries_p95': percentile(queries, 95),
+                'queries_max': queries[-1],
+                'db_ms_p50': round(percentile(db_ms, 50), 2),
+                'db_ms_p95': round(percentile(db_ms, 95), 2),
+            })
+        rows.sort(key=lambda row: (row['queries_p95'], row['db_ms_p95']), reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._over_budget.clear()
+
+
+query_stats = QueryStats()
+
+
+def report(request, counter):
+    """İstek sonucunu özete ekle ve bütçe aşıldıysa logla"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.view_name:
+        return
+    view_name = match.view_name
+    query_stats.record(view_name, counter.count, counter.duration_ms)
+
+    budget = get_budget(view_name)
+    if counter.count > budget:
+        logger.warning(
+            'Sorgu butcesi asildi: %s %s -> %d sorgu (butce %d), %.1f ms veritabani',
+            view_name, request.path, counter.count, budget, counter.duration_ms,
+        )
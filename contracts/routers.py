@@ -0,0 +1,57 @@
+"""
+Okuma bağlantısı yönlendirmesi (DATABASE_ROUTERS).
+
+@read_only_db ile işaretlenen view'lar çalışırken yapılan okumalar
+READONLY_DB_ALIAS bağlantısına gider (aynı SQLite dosyası, query_only).
+Yazmalar ve transaction içindeki okumalar her zaman default'ta kalır;
+böylece aynı transaction'da yazılan ama henüz commit edilmemiş veri de
+okunur (testlerde TestCase transaction'ı nedeniyle hep default kullanılır).
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READONLY_DB_ALIAS = 'readonly'
+
+_read_only = ContextVar('contracts_read_only_db', default=False)
+
+
+def read_only_db(view_func):
+    """View süresince okumaları READONLY_DB_ALIAS bağlantısına yönlendir"""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return view_func(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+class ReadOnlyRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _read_only.get()
+            and READONLY_DB_ALIAS in settings.DATABASES
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return READONLY_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Okuma bağlantısından yüklenen nesneler de default'a kaydedilir
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # İki alias aynı veritabanını gösterir
+        aliases = {DEFAULT_DB_ALIAS, READONLY_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == READONLY_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,375 @@
+"""
+Arama altyapısı: sözleşme havuzu için SQLite FTS5 tam metin indeksi ve
+taraf seçici için önek indeksli kullanıcı arama anahtarları.
+
+İndekste sadece herkese açık ve tamamlanmış sözleşmeler bulunur. Metin
+Türkçe karakterleri katlayarak (ı/İ -> i, ş -> s, ğ -> g, ç -> c, ö -> o,
+ü -> u) ve karakter sayısını koruyarak indekslenir; böylece FTS5'in
+highlight() çıktısındaki konumlar orijinal metne birebir eşlenir ve
+parçacıklar (snippet) orijinal yazımla gösterilir.
+
+Veritabanı SQLite değilse veya FTS5 tablosu yoksa arama icontains ile
+yapılmaya devam eder.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils.html import escape
+
+SEARCH_TABLE = 'contracts_contract_search'
+
+# Tek karakteri tek karaktere eşler; metin uzunluğu değişmez
+TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ç': 'c', 'ç': 'c',
+    'Ö': 'o', 'ö': 'o',
+    'Ü': 'u', 'ü': 'u',
+})
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# highlight() işaretleri (metinde geçmesi beklenmeyen kontrol karakterleri)
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+def fold_text(text):
+    """Türkçe karakterleri katla ve küçük harfe çevir (uzunluk korunur)"""
+    folded = []
+    for char in (text or '').translate(TURKISH_FOLD):
+        lower = char.lower()
+        folded.append(lower if len(lower) == 1 else char)
+    return ''.join(folded)
+
+
+def is_searchable(contract):
+    return contract.visibility == 'public' and contract.status == 'completed'
+
+
+_available = {}
+
+
+def search_available():
+    """FTS5 indeksi bu veritabanında kullanılabilir mi (veritabanı başına bir kez kontrol edilir)"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _available:
+        _available[name] = SEARCH_TABLE in connection.introspection.table_names()
+    return _available[name]
+
+
+def _row(contract):
+    return (contract.contract_number, fold_text(contract.title), fold_text(contract.content))
+
+
+def index_contract(contract):
+    """Sözleşmenin indeks kaydını güncelle (uygun değilse kaldır)"""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [contract.contract_number])
+        if is_searchable(contract):
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, content) VALUES (%s, %s, %s)',
+                _row(contract)
+            )
+
+
+def unindex_contract_number(contract_number):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [contract_number])
+
+
+def rebuild_index(batch_size=1000):
+    """İndeksi sıfırdan oluştur; indekslenen sözleşme sayısını döndür"""
+    from .models import Contract
+
+    contracts = Contract.objects.filter(
+        visibility='public', status='completed'
+    ).values_list('contract_number', 'title', 'content')
+
+    total = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        batch = []
+        for contract_number, title, content in contracts.iterator(chunk_size=batch_size):
+            batch.append((contract_number, fold_text(title), fold_text(content)))
+            if len(batch) >= batch_size:
+                cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, title, content) VALUES (%s, %s, %s)', batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, title, content) VALUES (%s, %s, %s)', batch)
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def build_match_query(query):
+    """Kullanıcı girdisini güvenli bir FTS5 sorgusuna çevir (tüm kelimeler, önek eşleşmeli)"""
+    tokens = TOKEN_RE.findall(fold_text(query))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def build_snippet(original, highlighted, before=80, after=160):
+    """
+    highlight() çıktısındaki işaretleri orijinal metne taşı ve ilk eşleşmenin
+    çevresinden kısa, HTML-güvenli bir parça üret.
+    """
+    spans = []
+    position = 0
+    start = None
+    for char in highlighted:
+        if char == MATCH_START:
+            start = position
+        elif char == MATCH_END:
+            if start is not None:
+                spans.append((start, position))
+            start = None
+        else:
+            position += 1
+
+    if not spans:
+        return escape(original[:200]) + ('…' if len(original) > 200 else '')
+
+    # İlk eşleşmenin etrafında kelime sınırına hizalı bir pencere
+    first = spans[0][0]
+    window_start = 0
+    if first > before:
+        window_start = original.rfind(' ', 0, first - before) + 1
+    window_end = original.find(' ', first + after)
+    if window_end == -1:
+        window_end = len(original)
+
+    parts = ['…' if window_start > 0 else '']
+    cursor = window_start
+    for span_start, span_end in spans:
+        if span_end <= window_start or span_start >= window_end:
+            continue
+        span_start = max(span_start, window_start)
+        span_end = min(span_end, window_end)
+        parts.append(escape(original[cursor:span_start]))
+        parts.append(f'<mark>{escape(original[span_start:span_end])}</mark>')
+        cursor = span_end
+    parts.append(escape(original[cursor:window_end]))
+    if window_end < len(original):
+        parts.append('…')
+    return ''.join(parts)
+
+
+class ContractSearchResults:
+    """
+    Paginator ile kullanılabilen, BM25 sırasına göre arama sonuçları.
+    Sadece istenen sayfa için Contract nesneleri yüklenir.
+    """
+
+    # Başlıkta geçen eşleşme içerikten daha değerlidir
+    TITLE_WEIGHT = 10.0
+    CONTENT_WEIGHT = 1.0
+
+    def __init__(self, query, queryset):
+        self.match = build_match_query(query)
+        self.queryset = queryset
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connections[self.queryset.db].cursor() as cursor:
+                    cursor.execute(
+                        f'SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+                        [self.match]
+                    )
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.match:
+            return []
+
+        offset = key.start or 0
+        limit = (key.stop - offset) if key.stop is not None else -1
+        with connections[self.queryset.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT rowid, highlight({SEARCH_TABLE}, 1, %s, %s)
+                FROM {SEARCH_TABLE}
+                WHERE {SEARCH_TABLE} MATCH %s
+                ORDER BY bm25({SEARCH_TABLE}, {self.TITLE_WEIGHT}, {self.CONTENT_WEIGHT})
+                LIMIT %s OFFSET %s
+                """,
+                [MATCH_START, MATCH_END, self.match, limit, offset]
+            )
+            rows = cursor.fetchall()
+
+        highlights = dict(rows)
+        contracts = {
+            contract.contract_number: contract
+            for contract in self.queryset.filter(contract_number__in=highlights)
+        }
+        results = []
+        for contract_number, _ in rows:
+            contract = contracts.get(contract_number)
+            if contract is None:
+                # İndeks ile tablo arasında henüz senkronize olmamış kayıt
+                continue
+            contract.search_snippet = build_snippet(contract.content, highlights[contract_number])
+            results.append(contract)
+        return results
+
+
+def search_contracts(query, queryset):
+    """Havuz araması: FTS5 varsa sıralı sonuçlar, yoksa icontains filtresi"""
+    if search_available():
+        return ContractSearchResults(query, queryset)
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(content__icontains=query)
+    )
+
+
+# ==================== KULLANICI ARAMA ====================
+
+KEY_SPLIT_RE = re.compile(r'[\s._\-+]+')
+
+
+def user_search_keys(user):
+    """Kullanıcının önek aramasında eşleşeceği katlanmış anahtarlar"""
+    email = fold_text(user.email or '')
+    local_part = email.split('@', 1)[0]
+
+    keys = set()
+    for value in (user.first_name, user.last_name):
+        keys.update(KEY_SPLIT_RE.split(fold_text(value)))
+    keys.add(fold_text(user.username))
+    keys.add(local_part)
+    keys.update(KEY_SPLIT_RE.split(local_part))
+    # "ali@ornek" gibi @ içeren sorgular için tam adres
+    keys.add(email)
+    return {key[:254] for key in keys if key}
+
+
+def prefix_range(prefix):
+    """startswith yerine indeks dostu aralık: prefix <= key < üst sınır"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PrefixCache:
+    """Süreç içi, boyut ve süre sınırlı LRU önbellek (sorgu -> kullanıcı id'leri)"""
+
+    def __init__(self, maxsize=512, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_prefix_cache = PrefixCache()
+
+# Anahtarlar değişince artırılan sürüm; paylaşılan önbellekte tüm worker'lar
+# yeni sürümü görür, süreç içi önbellekte eski sonuçlar en geç TTL sonunda düşer
+USER_SEARCH_VERSION_KEY = 'user_search:version'
+
+
+def user_search_version():
+    version = cache.get(USER_SEARCH_VERSION_KEY)
+    if version is None:
+        # Önbellekten düşmüşse eski sürümlerle çakışmayacak bir başlangıç değeri
+        cache.add(USER_SEARCH_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(USER_SEARCH_VERSION_KEY)
+    return version
+
+
+def invalidate_user_search():
+    """Önceki sürümle önbelleğe alınmış kullanıcı arama sonuçlarını geçersiz kıl"""
+    try:
+        cache.incr(USER_SEARCH_VERSION_KEY)
+    except ValueError:
+        # Sürüm önbellekte yoksa bir sonraki arama yeni bir değerle başlar
+        pass
+
+
+def search_user_ids(query, limit=10):
+    """
+    Her kelimesi kullanıcının bir anahtarının öneki olan kullanıcıların id'leri.
+    Sonuçlar kullanıcı tablosu büyüse de sadece indeks aralığı kadar okur.
+    """
+    from .models import UserSearchKey
+
+    tokens = [token for token in KEY_SPLIT_RE.split(fold_text(query)) if token]
+    if '@' in query:
+        # E-posta aranıyorsa tam adres anahtarında önek ara
+        tokens = [fold_text(query.strip())]
+    if not tokens:
+        return []
+
+    cache_key = (user_search_version(), ' '.join(tokens), limit)
+    cached = user_prefix_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # İlk kelime indeks sırasıyla taranır, diğer kelimeler alt sorgu ile süzülür
+    first, *rest = tokens
+    start, end = prefix_range(first)
+    keys = UserSearchKey.objects.filter(key__gte=start, key__lt=end)
+    for token in rest:
+        start, end = prefix_range(token)
+        keys = keys.filter(
+            user_id__in=UserSearchKey.objects.filter(key__gte=start, key__lt=end).values('user_id')
+        )
+
+    # Aynı kullanıcı birden fazla anahtarla eşleşebilir; DISTINCT tüm aralığı
+    # okurdu, bunun yerine indeks sırasında parça parça okunur ve limit kadar
+    # farklı kullanıcı bulununca durulur
+    result = []
+    seen = set()
+    rows = keys.order_by('key').values_list('user_id', flat=True).iterator(chunk_size=limit * 4)
+    for user_id in rows:
+        if user_id not in seen:
+            seen.add(user_id)
+            result.append(user_id)
+            if len(result) == limit:
+                break
+
+    user_prefix_cache.set(cache_key, result)
+    return result
@@ -0,0 +1,40 @@
+"""
+Üretim SQLite profili (ENGINE: 'contracts.sqlite').
+
+django.db.backends.sqlite3 ile aynıdır; her yeni bağlantıda PRAGMA ayarları
+uygulanır. DATABASES[...]['OPTIONS'] içinde:
+
+    'pragmas': {'busy_timeout': 10000}   varsayılanları değiştirir (None: uygulanmaz)
+    'read_only': True                    bağlantı query_only açılır (okuma alias'ı)
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    DEFAULT_PRAGMAS = {
+        # WAL: okuyucular yazarı, yazar okuyucuları bekletmez (ayar dosyada kalıcıdır)
+        'journal_mode': 'WAL',
+        # WAL ile NORMAL güvenlidir; fsync sadece checkpoint'te yapılır
+        'synchronous': 'NORMAL',
+        # Kilitli veritabanında hemen hata vermek yerine bekle (ms)
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Negatif değer KiB cinsindendir: bağlantı başına 64 MB sayfa önbelleği
+        'cache_size': -64 * 1024,
+    }
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        pragmas = {**self.DEFAULT_PRAGMAS, **kwargs.pop('pragmas', {})}
+        self.pragmas = {name: value for name, value in pragmas.items() if value is not None}
+        self.read_only = kwargs.pop('read_only', False)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        if self.read_only:
+            # Yazma denemeleri "attempt to write a readonly database" hatası verir
+            conn.execute('PRAGMA query_only = ON')
+        return conn
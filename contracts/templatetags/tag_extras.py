@@ -12,3 +12,20 @@ def signature_of(user, contract):
     except ContractSignature.DoesNotExist:
         return None
 
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Mevcut sorgu parametrelerini koruyarak imleç sayfası linki"""
+    params = context['request'].GET.copy()
+    params.pop('page', None)
+    params['cursor'] = cursor
+    return f'?{params.urlencode()}'
+
+
+@register.simple_tag(takes_context=True)
+def count_url(context):
+    """Aynı sayfayı kesin toplam sayı ile (?count=1) gösteren link"""
+    params = context['request'].GET.copy()
+    params['count'] = '1'
+    return f'?{params.urlencode()}'
@@ -1,3 +1,1021 @@
-from django.test import TestCase
+import itertools
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Contract, ContractComment, ContractParty, ContractSignature, ContractTemplate,
+    EmailOutbox, Notification, NumberSequence, Payment, PdfDownloadAccess, SubscriptionPlan,
+    UserContractStats, UserProfile, UserSearchKey, UserSubscription,
+)
+from .pagination import CursorPaginator, SequenceCursorPaginator, encode_cursor
+from .search import SEARCH_TABLE, search_available, search_contracts, search_user_ids, user_search_version
+
+
+class ContractNumberTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('creator', 'creator@example.com', 'pass')
+
+    def test_first_contract_starts_at_1000(self):
+        contract = Contract.objects.create(title='Ilk', content='icerik', creator=self.user)
+        self.assertEqual(contract.contract_number, 1000)
+
+    def test_sequence_continues_after_existing_numbers(self):
+        NumberSequence.objects.all().delete()
+        Contract.objects.create(title='Eski', content='icerik', creator=self.user, contract_number=2500)
+        contract = Contract.objects.create(title='Yeni', content='icerik', creator=self.user)
+        self.assertEqual(contract.contract_number, 2501)
+
+    def test_reserve_block_for_bulk_create(self):
+        first = Contract.objects.create(title='Ilk', content='icerik', creator=self.user)
+        contracts = Contract.assign_numbers([
+            Contract(title=f'Toplu {i}', content='icerik', creator=self.user)
+            for i in range(5)
+        ])
+        Contract.objects.bulk_create(contracts)
+        numbers = [contract.contract_number for contract in contracts]
+        self.assertEqual(numbers, list(range(first.contract_number + 1, first.contract_number + 6)))
+
+        after = Contract.objects.create(title='Sonra', content='icerik', creator=self.user)
+        self.assertEqual(after.contract_number, first.contract_number + 6)
+
+    def test_numbering_does_not_scan_contracts(self):
+        Contract.objects.create(title='Ilk', content='icerik', creator=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            NumberSequence.next_value(Contract.NUMBER_SEQUENCE)
+        self.assertFalse(any('contracts_contract' in query['sql'] for query in queries))
+
+
+class ConcurrentContractNumberTests(TransactionTestCase):
+    THREADS = 8
+    CONTRACTS_PER_THREAD = 5
+
+    def setUp(self):
+        self.user = User.objects.create_user('creator', 'creator@example.com', 'pass')
+
+    def test_concurrent_creates_get_unique_numbers(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Bellek ici SQLite thread\'ler arasinda paylasilamaz')
+
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def create_contracts():
+            try:
+                barrier.wait()
+                for i in range(self.CONTRACTS_PER_THREAD):
+                    Contract.objects.create(title=f'Eszamanli {i}', content='icerik', creator=self.user)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create_contracts) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        numbers = list(Contract.objects.values_list('contract_number', flat=True))
+        self.assertEqual(len(numbers), self.THREADS * self.CONTRACTS_PER_THREAD)
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+
+# ==================== SORGU BÜTÇELERİ ====================
+
+_signature_codes = itertools.count(100000)
+
+
+def make_contract(creator, parties=(), signed=(), declined=(), **fields):
+    """Oluşturan + verilen kullanıcılar taraf; her taraf için imza kaydı"""
+    fields.setdefault('title', f'Sozlesme {next(_signature_codes)}')
+    fields.setdefault('content', 'Sozlesme maddeleri\n' * 20)
+    contract = Contract.objects.create(creator=creator, **fields)
+    for user in (creator, *parties):
+        party = ContractParty.objects.create(
+            contract=contract, user=user,
+            invitation_status='declined' if user in declined else 'accepted',
+        )
+        ContractSignature.objects.create(
+            contract=contract, party=party, user=user,
+            signature_code=str(next(_signature_codes)),
+            is_signed=user in signed,
+            signed_at=timezone.now() if user in signed else None,
+        )
+    return contract
+
+
+def make_user(username, plan, **fields):
+    user = User.objects.create_user(username, f'{username}@example.com', 'pass', **fields)
+    UserSubscription.objects.create(user=user, plan=plan)
+    return user
+
+
+def make_notifications(user, count, contract=None):
+    Notification.objects.bulk_create([
+        Notification(
+            recipient=user, notification_type='system', contract=contract,
+            title=f'Bildirim {i}', message='mesaj', is_read=i % 2 == 0,
+        )
+        for i in range(count)
+    ])
+
+
+def make_payment(user, contract=None, payment_type='subscription', status='completed'):
+    return Payment.objects.create(
+        user=user, payment_type=payment_type, status=status, amount=Decimal('49.90'),
+        description='odeme', transaction_id=f'tx-{next(_signature_codes)}', contract=contract,
+        subscription=getattr(user, 'subscription', None),
+        completed_at=timezone.now() if status == 'completed' else None,
+    )
+
+
+@override_settings(SEND_ACTUAL_EMAILS=False)
+class ViewQueryBudgetTests(TestCase):
+    """
+    contracts/urls.py'deki her URL için sorgu sayısı ve süre üst sınırları.
+    Listelerde sorgu sayısının kayıt sayısıyla artmadığı ayrıca kontrol edilir;
+    satır başına sorgu ekleyen bir değişiklik bu testleri kırar.
+    """
+    # Yavaş CI makinelerinde de geçecek kadar geniş; kaba gerilemeleri yakalar
+    WALL_TIME_BUDGET = 2.0
+
+    @classmethod
+    def setUpClass(cls):
+        pdf_cache_dir = tempfile.mkdtemp(prefix='pdf-cache-test-')
+        cls.addClassCleanup(shutil.rmtree, pdf_cache_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(CONTRACT_PDF_CACHE_DIR=pdf_cache_dir))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.free_plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.paid_plan = SubscriptionPlan.objects.create(
+            name='Aylik 100', plan_type='monthly_100', contract_limit=100, price=Decimal('49.90'),
+        )
+        cls.staff = make_user('yonetici', cls.paid_plan, is_staff=True, is_superuser=True)
+        cls.owner = make_user('ayse', cls.paid_plan, first_name='Ayse', last_name='Yilmaz')
+        cls.others = [
+            make_user(name, cls.free_plan, first_name=name.title())
+            for name in ('mehmet', 'zeynep', 'can', 'elif')
+        ]
+        cls.invitee = cls.others[0]
+
+        # Çok taraflı, kısmen imzalı sözleşmeler
+        cls.contracts = [
+            make_contract(cls.owner, parties=cls.others, signed=[cls.owner, cls.others[1]],
+                          status='pending_signatures')
+            for _ in range(8)
+        ]
+        cls.contract = cls.contracts[0]
+        cls.declined = make_contract(cls.owner, parties=cls.others[:2], declined=[cls.invitee])
+        ContractParty.objects.filter(contract=cls.declined, user=cls.invitee).update(decline_reason='uygun degil')
+        cls.public = [
+            make_contract(cls.owner, parties=cls.others[:2], signed=[cls.owner, *cls.others[:2]],
+                          status='completed', visibility='public', completed_at=timezone.now())
+            for _ in range(4)
+        ]
+        # Davet edilenin imzaladığı sözleşmeler
+        for other in cls.others[1:]:
+            make_contract(other, parties=[cls.invitee], signed=[other, cls.invitee])
+        for contract in cls.contracts[:3]:
+            ContractComment.objects.create(contract=contract, user=cls.others[1], content='yorum')
+
+        make_notifications(cls.owner, 30, contract=cls.contract)
+        make_notifications(cls.invitee, 30, contract=cls.contract)
+        cls.notification = Notification.objects.filter(recipient=cls.owner).first()
+
+        cls.template = ContractTemplate.objects.create(
+            title='Kira', content='Kira sozlesmesi', creator=cls.owner,
+            is_shareable=True, share_code='paylasim-kodu',
+        )
+        ContractTemplate.objects.create(title='Sistem', content='Genel sablon', is_public=True)
+
+        for user in (cls.owner, *cls.others):
+            make_payment(user)
+        pdf_payment = make_payment(cls.owner, contract=cls.public[0], payment_type='pdf_download')
+        PdfDownloadAccess.objects.create(user=cls.owner, contract=cls.public[0], payment=pdf_payment)
+        make_payment(cls.owner, status='pending')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def login(self, user):
+        self.client.force_login(user)
+
+    def measure(self, url, method='get', data=None, **extra):
+        """İstek ve (akış yanıtlarında) gövde okunurken çalışan sorgular ve süre"""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, data, **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        return response, queries, elapsed
+
+    def assertWithinBudget(self, max_queries, url, method='get', data=None, status=200, **extra):
+        response, queries, elapsed = self.measure(url, method, data, **extra)
+        self.assertEqual(response.status_code, status, url)
+        self.assertLessEqual(
+            len(queries), max_queries,
+            f'{method.upper()} {url}: {len(queries)} sorgu (butce {max_queries})\n' +
+            '\n'.join(query['sql'] for query in queries.captured_queries)
+        )
+        self.assertLess(elapsed, self.WALL_TIME_BUDGET, f'{method.upper()} {url}: {elapsed:.2f} sn')
+        return response
+
+    def query_count(self, url, **extra):
+        # İlk istekte oluşturulan kayıtlar (istatistik satırı, önbellek) sayıma girmesin
+        self.measure(url, **extra)
+        return len(self.measure(url, **extra)[1])
+
+    def assertConstantQueries(self, urls, add_rows, **extra):
+        """add_rows() listelere kayıt ekler; sayfadaki kayıt sayısı artınca sorgu sayısı değişmemeli"""
+        before = {url: self.query_count(url, **extra) for url in urls}
+        add_rows()
+        cache.clear()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.query_count(url, **extra), before[url], url)
+
+    # ---------- Genel sayfalar ----------
+
+    def test_home(self):
+        self.assertWithinBudget(7, reverse('contracts:home'))
+
+    def test_home_anonymous(self):
+        self.client.logout()
+        self.assertWithinBudget(3, reverse('contracts:home'))
+
+    def test_contract_templates(self):
+        self.assertWithinBudget(6, reverse('contracts:contract_templates'))
+
+    def test_contract_pool(self):
+        self.assertWithinBudget(6, reverse('contracts:contract_pool'))
+
+    def test_contract_pool_search(self):
+        self.assertWithinBudget(7, reverse('contracts:contract_pool'), data={'q': 'maddeleri'})
+
+    def test_profile(self):
+        self.assertWithinBudget(6, reverse('contracts:profile'))
+
+    # ---------- Sözleşme işlemleri ----------
+
+    def test_contract_create_form(self):
+        self.assertWithinBudget(12, reverse('contracts:contract_create'))
+
+    def test_contract_create(self):
+        self.assertWithinBudget(settings.QUERY_BUDGETS['contracts:contract_create'],
+                                reverse('contracts:contract_create'), method='post', data={
+            'title': 'Yeni', 'content': 'icerik', 'visibility': 'private', 'second_party': self.invitee.pk,
+            'start_date': timezone.localdate().isoformat(), 'duration_months': 12,
+        }, status=302)
+
+    def test_contract_detail(self):
+        self.assertWithinBudget(15, reverse('contracts:contract_detail', args=[self.contract.pk]))
+
+    def test_contract_detail_as_party(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(15, reverse('contracts:contract_detail', args=[self.contract.pk]))
+
+    def test_contract_detail_public_anonymous(self):
+        self.client.logout()
+        self.assertWithinBudget(8, reverse('contracts:contract_detail', args=[self.public[0].pk]))
+
+    def test_contract_edit(self):
+        self.assertWithinBudget(7, reverse('contracts:contract_edit', args=[self.contract.pk]), status=302)
+        draft = make_contract(self.owner)
+        self.assertWithinBudget(7, reverse('contracts:contract_edit', args=[draft.pk]))
+
+    def test_contract_delete_form(self):
+        draft = make_contract(self.owner)
+        self.assertWithinBudget(9, reverse('contracts:contract_delete', args=[draft.pk]))
+
+    def test_contract_delete(self):
+        draft = make_contract(self.owner, parties=self.others)
+        self.assertWithinBudget(28, reverse('contracts:contract_delete', args=[draft.pk]), method='post', status=302)
+
+    def test_contract_sign_form(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(16, reverse('contracts:contract_sign', args=[self.contract.pk]))
+
+    def test_contract_sign(self):
+        self.login(self.invitee)
+        signature = ContractSignature.objects.get(contract=self.contract, user=self.invitee)
+        self.assertWithinBudget(23, reverse('contracts:contract_sign', args=[self.contract.pk]), method='post',
+                                data={'signature_code': signature.signature_code}, status=302)
+
+    def test_contract_decline_form(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(10, reverse('contracts:contract_decline', args=[self.contract.pk]))
+
+    def test_contract_decline(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(22, reverse('contracts:contract_decline', args=[self.contract.pk]), method='post',
+                                data={'decline_reason': 'uygun degil'}, status=302)
+
+    def test_contract_pdf(self):
+        url = reverse('contracts:contract_pdf', args=[self.public[0].pk])
+        self.assertWithinBudget(6, url)
+        # Önbellekten
+        self.assertWithinBudget(6, url)
+
+    def test_contract_image(self):
+        self.assertWithinBudget(7, reverse('contracts:contract_image', args=[self.contract.pk]))
+
+    def test_remove_contract_party(self):
+        party = ContractParty.objects.get(contract=self.contract, user=self.others[3])
+        self.assertWithinBudget(7, reverse('contracts:remove_contract_party', args=[self.contract.pk, party.pk]),
+                                method='post', status=302)
+
+    def test_declined_contract_recreate_form(self):
+        self.assertWithinBudget(12, reverse('contracts:declined_contract_recreate', args=[self.declined.pk]))
+
+    def test_declined_contract_recreate(self):
+        self.assertWithinBudget(settings.QUERY_BUDGETS['contracts:declined_contract_recreate'],
+                                reverse('contracts:declined_contract_recreate', args=[self.declined.pk]),
+                                method='post', data={'title': 'Tekrar', 'second_party_id': self.others[2].pk},
+                                status=302)
+
+    # ---------- Kullanıcı listeleri ----------
+
+    def test_my_contracts(self):
+        self.assertWithinBudget(6, reverse('contracts:my_contracts'))
+
+    def test_signed_contracts(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(7, reverse('contracts:signed_contracts'))
+
+    def test_invited_contracts(self):
+        self.login(self.invitee)
+        self.assertWithinBudget(9, reverse('contracts:invited_contracts'))
+
+    def test_declined_contracts(self):
+        self.assertWithinBudget(8, reverse('contracts:declined_contracts'))
+
+    def test_notifications_list(self):
+        self.assertWithinBudget(9, reverse('contracts:notifications_list'))
+
+    def test_my_templates(self):
+        self.assertWithinBudget(6, reverse('contracts:my_templates'))
+
+    # ---------- API ----------
+
+    def test_verify_signature_code(self):
+        self.login(self.invitee)
+        signature = ContractSignature.objects.get(contract=self.contract, user=self.invitee)
+        self.assertWithinBudget(19, reverse('contracts:verify_signature_code', args=[self.contract.pk]),
+                                method='post', data={'code': signature.signature_code})
+
+    def test_add_contract_party(self):
+        newcomer = make_user('yeni', self.free_plan)
+        self.assertWithinBudget(settings.QUERY_BUDGETS['contracts:add_contract_party'],
+                                reverse('contracts:add_contract_party', args=[self.contract.pk]),
+                                method='post', data={'user_id': newcomer.pk})
+
+    def test_add_contract_party_by_email(self):
+        self.assertWithinBudget(18, reverse('contracts:add_contract_party', args=[self.contract.pk]),
+                                method='post', data={'name': 'Misafir', 'email': 'misafir@example.com'})
+
+    def test_add_contract_comment(self):
+        self.assertWithinBudget(8, reverse('contracts:add_contract_comment', args=[self.contract.pk]),
+                                method='post', data={'content': 'yorum'})
+
+    def test_search_users(self):
+        self.assertWithinBudget(6, reverse('contracts:search_users'), data={'q': 'me'})
+
+    def test_notification_counts(self):
+        self.assertWithinBudget(6, reverse('contracts:get_notification_counts'))
+
+    def test_recent_notifications(self):
+        self.assertWithinBudget(12, reverse('contracts:get_recent_notifications'))
+
+    def test_notification_stream_requires_asgi(self):
+        self.assertWithinBudget(4, reverse('contracts:notification_stream'), status=503)
+
+    def test_notification_poll(self):
+        # WSGI altında olay beklenmez; varsayılan zaman aşımıyla da hemen döner
+        self.assertWithinBudget(6, reverse('contracts:notification_poll'))
+
+    def test_notification_mark_read(self):
+        self.assertWithinBudget(7, reverse('contracts:notification_mark_read', args=[self.notification.pk]),
+                                method='post')
+
+    def test_notification_mark_all_read(self):
+        self.assertWithinBudget(6, reverse('contracts:notification_mark_all_read'), method='post')
+
+    def test_notification_delete(self):
+        self.assertWithinBudget(7, reverse('contracts:notification_delete', args=[self.notification.pk]),
+                                method='post')
+
+    # ---------- Şablonlar ----------
+
+    def test_template_create(self):
+        self.assertWithinBudget(5, reverse('contracts:template_create'))
+        self.assertWithinBudget(5, reverse('contracts:template_create'), method='post', data={
+            'title': 'Yeni sablon', 'content': 'icerik', 'category': 'genel', 'is_active': 'on',
+        }, status=302)
+
+    def test_template_detail(self):
+        self.assertWithinBudget(7, reverse('contracts:template_detail', args=[self.template.pk]))
+
+    def test_template_edit(self):
+        self.assertWithinBudget(7, reverse('contracts:template_edit', args=[self.template.pk]))
+
+    def test_template_delete(self):
+        url = reverse('contracts:template_delete', args=[self.template.pk])
+        self.assertWithinBudget(7, url)
+        self.assertWithinBudget(8, url, method='post', status=302)
+
+    def test_template_share(self):
+        url = reverse('contracts:template_share', args=[self.template.pk])
+        self.assertWithinBudget(7, url)
+        self.assertWithinBudget(7, url, method='post', data={'visibility': 'public'}, status=302)
+
+    def test_template_share_view(self):
+        self.client.logout()
+        self.assertWithinBudget(4, reverse('contracts:template_share_view', args=[self.template.share_code]))
+
+    def test_template_use(self):
+        self.assertWithinBudget(29, reverse('contracts:template_use', args=[self.template.pk]), status=302)
+
+    # ---------- Admin ----------
+
+    def test_admin_dashboard(self):
+        self.login(self.staff)
+        self.assertWithinBudget(13, reverse('contracts:admin_dashboard'))
+
+    def test_admin_dashboard_widgets(self):
+        from .widgets import DASHBOARD_WIDGETS
+
+        self.login(self.staff)
+        for name in DASHBOARD_WIDGETS:
+            with self.subTest(widget=name):
+                self.assertWithinBudget(16, reverse('contracts:admin_dashboard_widget', args=[name]))
+
+    def test_admin_query_stats(self):
+        self.login(self.staff)
+        self.assertWithinBudget(13, reverse('contracts:admin_query_stats'))
+
+    def test_admin_contracts_list(self):
+        self.login(self.staff)
+        self.assertWithinBudget(16, reverse('contracts:admin_contracts_list'))
+
+    def test_admin_contracts_export(self):
+        self.login(self.staff)
+        self.assertWithinBudget(8, reverse('contracts:admin_contracts_export'))
+
+    def test_admin_contracts_export_invalid_user(self):
+        self.login(self.staff)
+        url = reverse('contracts:admin_contracts_export')
+        self.assertWithinBudget(8, url + '?user=abc', status=400)
+        self.assertWithinBudget(8, url + '?creator=999999', status=404)
+
+    def test_admin_contract_detail(self):
+        self.login(self.staff)
+        self.assertWithinBudget(24, reverse('contracts:admin_contract_detail', args=[self.public[0].pk]))
+
+    def test_admin_users_list(self):
+        self.login(self.staff)
+        self.assertWithinBudget(15, reverse('contracts:admin_users_list'))
+
+    def test_admin_user_detail(self):
+        self.login(self.staff)
+        self.assertWithinBudget(22, reverse('contracts:admin_user_detail', args=[self.owner.pk]))
+
+    def test_admin_subscriptions_list(self):
+        self.login(self.staff)
+        self.assertWithinBudget(16, reverse('contracts:admin_subscriptions_list'))
+
+    def test_admin_payments_list(self):
+        self.login(self.staff)
+        self.assertWithinBudget(16, reverse('contracts:admin_payments_list'))
+
+    # ---------- Sorgu sayısı kayıt sayısından bağımsız ----------
+
+    def test_contract_lists_do_not_grow_with_rows(self):
+        fresh = make_user('yeni', self.free_plan)
+        make_contract(fresh, parties=[self.invitee])
+        make_contract(self.invitee, parties=[fresh], signed=[fresh])
+        make_contract(fresh, parties=[self.invitee], declined=[self.invitee])
+        make_contract(self.invitee, parties=[fresh])
+        self.login(fresh)
+
+        def add_contracts():
+            for _ in range(5):
+                make_contract(fresh, parties=self.others, signed=[fresh])
+                make_contract(self.invitee, parties=[fresh, self.others[1]], signed=[fresh])
+                make_contract(fresh, parties=self.others[:2], declined=[self.others[0]])
+                make_contract(self.others[2], parties=[fresh, self.invitee])
+
+        urls = ['my_contracts', 'signed_contracts', 'invited_contracts', 'declined_contracts', 'home']
+        self.assertConstantQueries([reverse(f'contracts:{name}') for name in urls], add_contracts)
+
+    def test_contract_pool_does_not_grow_with_rows(self):
+        def add_public():
+            for _ in range(5):
+                make_contract(self.others[1], parties=self.others[2:], status='completed', visibility='public')
+
+        self.assertConstantQueries([reverse('contracts:contract_pool'), reverse('contracts:home')], add_public)
+
+    def test_contract_detail_does_not_grow_with_parties(self):
+        contract = make_contract(self.owner, parties=[self.invitee])
+
+        def add_parties_and_comments():
+            for i in range(5):
+                user = make_user(f'taraf{i}', self.free_plan)
+                party = ContractParty.objects.create(contract=contract, user=user)
+                ContractSignature.objects.create(contract=contract, party=party, user=user,
+                                                 signature_code=str(next(_signature_codes)))
+                ContractComment.objects.create(contract=contract, user=user, content='yorum')
+
+        self.assertConstantQueries([reverse('contracts:contract_detail', args=[contract.pk])], add_parties_and_comments)
+
+    def test_notifications_do_not_grow_with_rows(self):
+        fresh = make_user('yeni', self.free_plan)
+        make_notifications(fresh, 2, contract=self.contract)
+        self.login(fresh)
+
+        self.assertConstantQueries(
+            [reverse('contracts:notifications_list'), reverse('contracts:get_recent_notifications')],
+            lambda: make_notifications(fresh, 3, contract=self.contract),
+        )
+
+    def test_templates_do_not_grow_with_rows(self):
+        def add_templates():
+            for i in range(5):
+                ContractTemplate.objects.create(title=f'Sablon {i}', content='icerik', creator=self.owner)
+
+        self.assertConstantQueries([reverse('contracts:my_templates'), reverse('contracts:contract_templates')], add_templates)
+
+    def test_search_users_does_not_grow_with_rows(self):
+        def add_users():
+            for i in range(5):
+                make_user(f'mert{i}', self.free_plan)
+
+        self.assertConstantQueries([reverse('contracts:search_users')], add_users, data={'q': 'me'})
+
+    def test_admin_lists_do_not_grow_with_rows(self):
+        self.login(self.staff)
+
+        def add_rows():
+            for i in range(5):
+                user = make_user(f'musteri{i}', self.free_plan)
+                make_payment(user, contract=make_contract(user, parties=[self.owner]))
+
+        urls = [
+            reverse('contracts:admin_contracts_list'),
+            reverse('contracts:admin_users_list'),
+            reverse('contracts:admin_subscriptions_list'),
+            reverse('contracts:admin_payments_list'),
+            reverse('contracts:admin_user_detail', args=[self.owner.pk]),
+        ]
+        self.assertConstantQueries(urls, add_rows)
+
+    def test_admin_contract_detail_does_not_grow_with_rows(self):
+        self.login(self.staff)
+        contract = make_contract(self.owner, parties=[self.invitee])
+
+        def add_rows():
+            for i in range(5):
+                user = make_user(f'taraf{i}', self.free_plan)
+                party = ContractParty.objects.create(contract=contract, user=user)
+                ContractSignature.objects.create(contract=contract, party=party, user=user,
+                                                 signature_code=str(next(_signature_codes)))
+                ContractComment.objects.create(contract=contract, user=user, content='yorum')
+                payment = make_payment(user, contract=contract, payment_type='pdf_download')
+                PdfDownloadAccess.objects.create(user=user, contract=contract, payment=payment)
+
+        self.assertConstantQueries([reverse('contracts:admin_contract_detail', args=[contract.pk])], add_rows)
+
+
+@override_settings(
+    SEND_ACTUAL_EMAILS=True,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class EmailOutboxTests(TestCase):
+    """View'lar e-postaları kendi transaction'larında kuyruğa yazar, process_outbox gönderir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+        cls.invitee = make_user('mehmet', plan)
+        cls.contract = make_contract(cls.owner, status='pending_signatures')
+
+    def setUp(self):
+        self.client.force_login(self.owner)
+        self.url = reverse('contracts:add_contract_party', args=[self.contract.pk])
+
+    def test_view_enqueues_and_process_outbox_sends(self):
+        response = self.client.post(self.url, {'user_id': self.invitee.pk})
+        self.assertEqual(response.status_code, 200)
+        # İstek sırasında SMTP'ye gidilmez, sadece kuyruğa yazılır
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(EmailOutbox.objects.filter(status='pending').count(), 2)
+
+        call_command('process_outbox', stdout=StringIO())
+
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertTrue(all(message.to == [self.invitee.email] for message in mail.outbox))
+
+    def test_enqueue_error_rolls_back_view(self):
+        with mock.patch.object(EmailOutbox, 'enqueue', side_effect=DatabaseError('kuyruk yazilamadi')):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.url, {'user_id': self.invitee.pk})
+
+        self.assertFalse(ContractParty.objects.filter(contract=self.contract, user=self.invitee).exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+class ContractSearchIndexTests(TestCase):
+    """Havuz arama indeksi sadece aranan alanlar veya havuz üyeliği değişince yazılır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+
+    def setUp(self):
+        if not search_available():
+            self.skipTest('FTS5 kullanılamıyor')
+        contract = make_contract(self.owner, title='Kira', status='completed', visibility='public',
+                                 completed_at=timezone.now())
+        self.contract = Contract.objects.get(pk=contract.pk)
+
+    def search(self, query):
+        return [contract.pk for contract in search_contracts(query, Contract.objects.all())[:10]]
+
+    def index_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        return [query['sql'] for query in queries.captured_queries if SEARCH_TABLE in query['sql']]
+
+    def test_unchanged_save_does_not_touch_index(self):
+        self.assertEqual(self.index_queries(self.contract.save), [])
+        self.contract.duration_months = 24
+        self.assertEqual(self.index_queries(self.contract.save), [])
+
+    def test_title_change_reindexes(self):
+        self.contract.title = 'Satis'
+        self.contract.save()
+        self.assertEqual(self.search('satis'), [self.contract.pk])
+        self.assertEqual(self.search('kira'), [])
+
+    def test_leaving_and_reentering_pool(self):
+        self.contract.visibility = 'private'
+        self.contract.save()
+        self.assertEqual(self.search('kira'), [])
+        # Havuz dışındayken yapılan kayıtlar indekse dokunmaz
+        self.assertEqual(self.index_queries(self.contract.save), [])
+
+        self.contract.visibility = 'public'
+        self.contract.save()
+        self.assertEqual(self.search('kira'), [self.contract.pk])
+
+
+class ContractWidgetInvalidationTests(TestCase):
+    """Dashboard widget önbelleği sadece sözleşme durumu değişince düşer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+        cls.contract_id = make_contract(cls.owner, status='pending_signatures').pk
+
+    def setUp(self):
+        from .widgets import CACHE_PREFIX, METRICS_KEY
+        self.keys = [METRICS_KEY, CACHE_PREFIX + 'contracts']
+        cache.set_many({key: 'eski' for key in self.keys})
+        self.contract = Contract.objects.get(pk=self.contract_id)
+
+    def save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contract.save()
+        return cache.get_many(self.keys)
+
+    def test_full_save_without_status_change_keeps_widgets(self):
+        self.contract.title = 'Yeni baslik'
+        self.assertEqual(len(self.save()), 2)
+
+    def test_status_change_drops_widgets(self):
+        self.contract.status = 'completed'
+        self.assertEqual(self.save(), {})
+
+
+class PublicPageCacheTests(TestCase):
+    """Anonim sayfa önbelleği: isabetler sorgusuz, havuz değişince commit sonrası düşer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+        cls.contract_id = make_contract(cls.owner, title='Kira', status='completed', visibility='public',
+                                        completed_at=timezone.now()).pk
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('contracts:contract_pool')
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_cache_hit_runs_no_queries(self):
+        self.assertGreater(self.get()[1], 0)
+        self.assertEqual(self.get()[1], 0)
+
+    def test_leaving_pool_invalidates_after_commit(self):
+        self.assertContains(self.get()[0], 'Kira')
+
+        contract = Contract.objects.get(pk=self.contract_id)
+        contract.visibility = 'private'
+        with self.captureOnCommitCallbacks(execute=True):
+            contract.save()
+
+        response, queries = self.get()
+        self.assertGreater(queries, 0)
+        self.assertNotContains(response, 'Kira')
+
+    def test_version_reloaded_from_database_when_evicted(self):
+        from .page_cache import VERSION_KEY
+        self.get()
+        contract = Contract.objects.get(pk=self.contract_id)
+        contract.visibility = 'private'
+        contract.save()
+        # Commit geri çağrısı çalışmadan önbellekteki sürüm silinirse veritabanındaki değer okunur
+        cache.delete(VERSION_KEY)
+        self.assertNotContains(self.get()[0], 'Kira')
+
+
+class ContractCounterTests(TestCase):
+    """Taraf/imza sayaçları kayıtlarla birlikte güncellenir; check_contract_counters sapmaları düzeltir"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+        cls.others = [make_user(f'kullanici{i}', plan) for i in range(3)]
+
+    def counters(self, contract):
+        contract = Contract.objects.get(pk=contract.pk)
+        return {field: getattr(contract, field) for field in Contract.COUNTER_FIELDS}
+
+    def assertCounters(self, contract, party_count, signed_count, declined_count):
+        self.assertEqual(self.counters(contract), {
+            'party_count': party_count, 'signed_count': signed_count, 'declined_count': declined_count,
+        })
+
+    def run_check(self, *args):
+        out = StringIO()
+        call_command('check_contract_counters', *args, stdout=out)
+        return out.getvalue()
+
+    def test_counters_follow_parties_and_signatures(self):
+        first, second, third = self.others
+        contract = make_contract(self.owner, parties=[first, second], signed=[self.owner], declined=[second])
+        self.assertCounters(contract, 3, 1, 1)
+
+        signature = ContractSignature.objects.get(contract=contract, user=first)
+        signature.is_signed = True
+        signature.save()
+        self.assertCounters(contract, 3, 2, 1)
+
+        party = ContractParty.objects.get(contract=contract, user=second)
+        party.invitation_status = 'accepted'
+        party.save()
+        self.assertCounters(contract, 3, 2, 0)
+
+        ContractParty.objects.create(contract=contract, user=third, invitation_status='declined')
+        self.assertCounters(contract, 4, 2, 1)
+
+        # Taraf silinince imzası da silinir
+        ContractParty.objects.get(contract=contract, user=first).delete()
+        self.assertCounters(contract, 3, 1, 1)
+
+        self.assertIn('Tum sayaclar tutarli', self.run_check())
+
+    def test_check_repairs_drift(self):
+        contract = make_contract(self.owner, parties=self.others[:2], signed=[self.owner], declined=self.others[1:2])
+        untouched = make_contract(self.owner, parties=self.others[2:])
+        Contract.objects.filter(pk=contract.pk).update(party_count=9, signed_count=0, declined_count=4)
+
+        output = self.run_check()
+        self.assertIn(f'#{contract.contract_number}', output)
+        self.assertNotIn(f'#{untouched.contract_number}', output)
+        self.assertIn('Duzeltilen sozlesme: 1', output)
+        self.assertCounters(contract, 3, 1, 1)
+        self.assertCounters(untouched, 2, 0, 0)
+
+    def test_dry_run_leaves_drift(self):
+        contract = make_contract(self.owner, parties=self.others[:1])
+        Contract.objects.filter(pk=contract.pk).update(party_count=5)
+
+        output = self.run_check('--dry-run')
+        self.assertIn('party_count: 5 -> 2', output)
+        self.assertIn('(duzeltilmedi)', output)
+        self.assertCounters(contract, 5, 0, 0)
+
+
+class CursorPaginationTests(TestCase):
+    """İmleç sayfalaması: ileri/geri gezinti, eşit sıralama değerleri ve bozuk imleçler"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        owner = make_user('ayse', plan)
+        # Aynı created_at değerleri sayfa sınırlarına denk gelir
+        base = timezone.now().replace(microsecond=0)
+        offsets = [0, 0, 0, 1, 1, 2, 2]
+        for offset in offsets:
+            contract = Contract.objects.create(creator=owner, title='Sozlesme', content='maddeler')
+            Contract.objects.filter(pk=contract.pk).update(created_at=base - timedelta(minutes=offset))
+        cls.expected = list(Contract.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def paginator(self):
+        return CursorPaginator(Contract.objects.all(), ordering=('-created_at',), page_size=2)
+
+    def walk_forward(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def ids(self, page):
+        return [contract.pk for contract in page]
+
+    def test_forward_walk_visits_every_row_once(self):
+        pages = self.walk_forward(self.paginator())
+        self.assertEqual([pk for page in pages for pk in self.ids(page)], self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertFalse(pages[0].has_previous)
+        self.assertTrue(all(page.has_previous for page in pages[1:]))
+
+    def test_backward_walk_over_ties_returns_same_pages(self):
+        paginator = self.paginator()
+        forward = self.walk_forward(paginator)
+
+        page = forward[-1]
+        backward = [page]
+        while page.has_previous:
+            page = paginator.page(page.previous_cursor)
+            backward.append(page)
+
+        self.assertEqual([self.ids(page) for page in reversed(backward)], [self.ids(page) for page in forward])
+        # Geri dönülen sayfadan tekrar ileri gidilebilir
+        self.assertEqual(self.ids(paginator.page(backward[-2].next_cursor)), self.ids(forward[2]))
+
+    def test_tampered_and_invalid_cursors_return_first_page(self):
+        paginator = self.paginator()
+        first = self.ids(paginator.page())
+        token = paginator.page().next_cursor
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        invalid_values = encode_cursor({'v': ['tarih-degil', 'uuid-degil'], 'd': 'next'})
+        wrong_length = encode_cursor({'v': ['2024-01-01T00:00:00+00:00'], 'd': 'next'})
+
+        for cursor in (tampered, 'bozuk', invalid_values, wrong_length):
+            with self.subTest(cursor=cursor):
+                page = paginator.page(cursor)
+                self.assertEqual(self.ids(page), first)
+                self.assertFalse(page.has_previous)
+
+    def test_with_count(self):
+        self.assertEqual(self.paginator().page(with_count=True).count, len(self.expected))
+
+    def test_sequence_round_trip(self):
+        sequence = list(range(5))
+        paginator = SequenceCursorPaginator(sequence, page_size=2)
+        pages = self.walk_forward(paginator)
+        self.assertEqual([list(page) for page in pages], [[0, 1], [2, 3], [4]])
+
+        previous = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), [2, 3])
+        self.assertEqual(list(paginator.page(previous.previous_cursor)), [0, 1])
+        self.assertFalse(paginator.page(previous.previous_cursor).has_previous)
+
+    def test_sequence_invalid_cursors_return_first_page(self):
+        paginator = SequenceCursorPaginator(list(range(5)), page_size=2)
+        token = paginator.page().next_cursor
+        for cursor in (token[:-2] + 'xx', encode_cursor({'o': -4}), encode_cursor({'o': '2'})):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(list(paginator.page(cursor)), [0, 1])
+
+
+class UserContractStatsTests(TestCase):
+    """Kullanıcı sayaçları taraf/imza değişikliklerinden sonra kaynak tablolarla aynı kalır"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Ucretsiz', plan_type='free', contract_limit=5)
+        cls.owner = make_user('ayse', plan)
+        cls.others = [make_user(f'kullanici{i}', plan) for i in range(2)]
+        cls.users = [cls.owner, *cls.others]
+        for user in cls.users:
+            UserProfile.objects.create(user=user)
+
+    def assertStatsMatch(self):
+        expected = UserContractStats.compute()
+        for user in self.users:
+            values = expected.get(user.pk, {})
+            stats = UserContractStats.objects.get(user=user)
+            with self.subTest(user=user.username):
+                self.assertEqual(
+                    {field: getattr(stats, field) for field in UserContractStats.COUNTER_FIELDS},
+                    {field: values.get(field, 0) for field in UserContractStats.COUNTER_FIELDS},
+                )
+                profile = UserProfile.objects.get(user=user)
+                self.assertEqual(profile.total_contracts_created, stats.created_count)
+                self.assertEqual(profile.total_contracts_signed, stats.signed_count)
+
+    def test_counters_follow_create_decline_sign_delete(self):
+        first, second = self.others
+        contract = make_contract(self.owner, parties=self.others)
+        make_contract(first, parties=[self.owner], signed=[first])
+        self.assertStatsMatch()
+
+        party = ContractParty.objects.get(contract=contract, user=first)
+        party.invitation_status = 'declined'
+        party.save()
+        self.assertStatsMatch()
+
+        signature = ContractSignature.objects.get(contract=contract, user=second)
+        signature.is_signed = True
+        signature.save()
+        self.assertStatsMatch()
+
+        ContractParty.objects.get(contract=contract, user=second).delete()
+        self.assertStatsMatch()
+
+        Contract.objects.get(pk=contract.pk).delete()
+        self.assertStatsMatch()
+
+    def test_party_save_without_status_change_skips_refresh(self):
+        contract = make_contract(self.owner, parties=self.others[:1])
+        party = ContractParty.objects.get(contract=contract, user=self.others[0])
+        party.role = 'witness'
+        with CaptureQueriesContext(connection) as queries:
+            party.save()
+        stats_table = UserContractStats._meta.db_table
+        self.assertFalse([query['sql'] for query in queries.captured_queries if stats_table in query['sql']])
+
+    def test_unchanged_counters_are_not_rewritten(self):
+        make_contract(self.owner, parties=self.others[:1])
+        with CaptureQueriesContext(connection) as queries:
+            UserContractStats.refresh_for([self.owner.pk, self.others[0].pk])
+        profile_table = UserProfile._meta.db_table
+        self.assertFalse([query['sql'] for query in queries.captured_queries if profile_table in query['sql']])
+
+
+class UserSearchTests(TestCase):
+    """Kullanıcı arama önbelleği anahtarlar değişince tüm süreçlerde sürümle geçersiz olur"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ayse', 'ayse@example.com', 'pass', first_name='Ayşe', last_name='Yılmaz')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_renamed_user_found_under_new_name(self):
+        self.assertEqual(search_user_ids('yilmaz'), [self.user.pk])
+        self.assertEqual(search_user_ids('demir'), [])
+
+        self.user.last_name = 'Demir'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertEqual(search_user_ids('demir'), [self.user.pk])
+        self.assertEqual(search_user_ids('yilmaz'), [])
+
+    def test_unchanged_keys_keep_cached_results(self):
+        search_user_ids('ayse')
+        version = user_search_version()
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        key_table = UserSearchKey._meta.db_table
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if key_table in query['sql'] and not query['sql'].startswith('SELECT')
+        ])
+        self.assertEqual(user_search_version(), version)
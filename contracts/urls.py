@@ -6,7 +6,10 @@ app_name = 'contracts'
 urlpatterns = [
     # Admin Dashboard
     path('dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('dashboard/widgets/<slug:name>/', views.admin_dashboard_widget, name='admin_dashboard_widget'),
+    path('dashboard/queries/', views.admin_query_stats, name='admin_query_stats'),
     path('dashboard/contracts/', views.admin_contracts_list, name='admin_contracts_list'),
+    path('dashboard/contracts/export/', views.admin_contracts_export, name='admin_contracts_export'),
     path('dashboard/contracts/<uuid:pk>/', views.admin_contract_detail, name='admin_contract_detail'),
     path('dashboard/users/', views.admin_users_list, name='admin_users_list'),
     path('dashboard/users/<int:user_id>/', views.admin_user_detail, name='admin_user_detail'),
@@ -45,6 +48,8 @@ urlpatterns = [
     path('api/search-users/', views.search_users, name='search_users'),
     path('api/notifications/', views.get_notification_counts, name='get_notification_counts'),
     path('api/notifications/recent/', views.get_recent_notifications, name='get_recent_notifications'),
+    path('api/notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('api/notifications/poll/', views.notification_poll, name='notification_poll'),
     
     # Bildirim endpoints
     path('notifications/', views.notifications_list, name='notifications_list'),
@@ -2,53 +2,183 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse, Http404
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+import json
 import random
 import string
 from datetime import datetime
 from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from django.contrib.admin.views.decorators import staff_member_required
 from django.db.models import Count, Sum
-from datetime import timedelta
 
 from .models import (
     Contract, ContractTemplate, ContractParty,
     ContractSignature, ContractApproval, ContractComment, Notification,
-    UserSubscription, Payment, PdfDownloadAccess
+    UserSubscription, Payment, PdfDownloadAccess, UserContractStats,
+    EmailOutbox
 )
 from .forms import ContractTemplateForm
+from .inbox import InboxSummary, get_inbox
+from .events import broker, publish_unread_count, serialize_notification
+from .notifications import NotificationDispatcher
+from .pdf import PdfRenderError, pdf_filename, render_contract, render_error_pdf
+from .pdf_cache import pdf_cache
+from .search import ContractSearchResults, search_contracts, search_user_ids
+from .pagination import CountEstimate, estimated_count, paginate, resolve_sort
+from .widgets import DASHBOARD_WIDGETS, get_widget
+from .querybudget import query_stats
+from .routers import read_only_db
+from .page_cache import cache_public_page, page_cache_stats
+from .fragment_cache import contract_fragment_version, fragment_cache_ttl
+
+
+# Kullanıcıya gösterilen sözleşme listelerinin ortak sırası (keyset sayfalama)
+CONTRACT_LIST_ORDERING = ('-created_at',)
+
+
+def wants_json(request):
+    """Liste view'ları ?format=json ile aynı sayfayı JSON olarak döndürür"""
+    return request.GET.get('format') == 'json'
+
+
+def contract_list_item(contract):
+    """Sözleşme listelerinin JSON gösterimi"""
+    return {
+        'id': str(contract.pk),
+        'contract_number': contract.contract_number,
+        'title': contract.title,
+        'status': contract.status,
+        'visibility': contract.visibility,
+        'created_at': contract.created_at.isoformat(),
+        'url': contract.get_absolute_url(),
+    }
+
+
+def notification_etag(request, *args, **kwargs):
+    """Kullanıcının bildirim versiyonundan ETag üret (Notification tablosuna gitmez)"""
+    stats = get_inbox(request).stats
+    return f'{request.user.pk}-{stats.notification_version}'
+
+
+def revalidate_each_time(view_func):
+    """Tarayıcı yanıtı saklasın ama her istekte ETag ile doğrulasın"""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return _wrapped
 
 
 @login_required
+@revalidate_each_time
+@condition(etag_func=notification_etag)
 def get_notification_counts(request):
     """Bildirim sayılarını JSON olarak döndür"""
     if request.method != 'GET':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
-    # Context processor'daki aynı mantığı kullan
-    from .context_processors import contract_counts
-    counts = contract_counts(request)
-    
-    # Okunmamış bildirim sayısını ekle
-    unread_notifications = Notification.objects.filter(
-        recipient=request.user,
-        is_read=False
-    ).count()
-    
-    counts['unread_notifications_count'] = unread_notifications
+    # Context processor ile aynı request özetini kullan
+    counts = get_inbox(request).as_dict()
 
     return JsonResponse(counts)
 
 
+def _sse_message(event_type, data):
+    """Server-Sent Events formatında mesaj"""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@login_required
+async def notification_stream(request):
+    """Bildirim ve sayaç değişikliklerini SSE ile akıt (ASGI gerektirir)"""
+    if not isinstance(request, ASGIRequest):
+        # WSGI altında sonsuz akış worker'ı kilitler; istemci ETag ile doğrulanan
+        # sayaç uç noktasını aralıklı yoklamaya düşer
+        return JsonResponse({
+            'error': 'Bildirim akışı sadece ASGI sunucusunda kullanılabilir.',
+            'fallback_url': reverse('contracts:get_notification_counts'),
+        }, status=503, json_dumps_params={'ensure_ascii': False})
+
+    user = await request.auser()
+    keepalive = getattr(settings, 'NOTIFICATION_STREAM_KEEPALIVE', 15)
+
+    async def event_stream():
+        subscription = broker.subscribe(user.pk)
+        try:
+            # Bağlantı açılınca güncel sayaçları gönder
+            counts = await sync_to_async(InboxSummary(user).as_dict)()
+            yield _sse_message('counts', counts)
+            while True:
+                event = await subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield _sse_message(event['type'], event['data'])
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+async def notification_poll(request):
+    """
+    SSE desteklemeyen istemciler için long-polling: yeni olay gelene kadar bekle.
+    WSGI altında bekleme bir worker'ı tutar ve olaylar başka süreçlere ulaşmaz;
+    bu durumda güncel sayaçlar hemen döner.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    user = await request.auser()
+    if not isinstance(request, ASGIRequest):
+        counts = await sync_to_async(InboxSummary(user).as_dict)()
+        return JsonResponse({
+            'counts': counts,
+            'notifications': [],
+        }, json_dumps_params={'ensure_ascii': False})
+
+    max_timeout = getattr(settings, 'NOTIFICATION_LONG_POLL_TIMEOUT', 25)
+    try:
+        timeout = min(float(request.GET.get('timeout', max_timeout)), max_timeout)
+    except ValueError:
+        timeout = max_timeout
+
+    subscription = broker.subscribe(user.pk)
+    try:
+        first = await subscription.get(timeout=timeout)
+        events = ([first] if first else []) + subscription.drain()
+    finally:
+        broker.unsubscribe(subscription)
+
+    # Aradaki kaçırılmış olaylar için her yanıtta güncel sayaçlar döner
+    counts = await sync_to_async(InboxSummary(user).as_dict)()
+    notifications = [e['data']['notification'] for e in events if e['type'] == 'notification']
+
+    return JsonResponse({
+        'counts': counts,
+        'notifications': notifications,
+    }, json_dumps_params={'ensure_ascii': False})
+
+
 @login_required
+@revalidate_each_time
+@condition(etag_func=notification_etag)
 def get_recent_notifications(request):
     """Son bildirimleri JSON olarak döndür (dropdown için)"""
     if request.method != 'GET':
@@ -56,20 +186,9 @@ def get_recent_notifications(request):
 
     notifications = Notification.objects.filter(
         recipient=request.user
-    ).order_by('-created_at')[:5]  # Son 5 bildirim
-    
-    notifications_data = []
-    for notification in notifications:
-        notifications_data.append({
-            'id': str(notification.id),
-            'title': notification.title,
-            'message': notification.message,
-            'is_read': notification.is_read,
-            'time_since_created': notification.time_since_created,
-            'icon_class': notification.icon_class,
-            'color_class': notification.color_class,
-            'action_url': notification.get_action_url(),
-        })
+    ).select_related('contract').order_by('-created_at')[:5]  # Son 5 bildirim
+    
+    notifications_data = [serialize_notification(n) for n in notifications]
     
     return JsonResponse({
         'notifications': notifications_data,
@@ -82,7 +201,7 @@ def notifications_list(request):
     """Kullanıcının bildirimlerini listele"""
     notifications = Notification.objects.filter(
         recipient=request.user
-    ).order_by('-created_at')
+    ).select_related('contract').order_by('-created_at')
     
     # Sayfalama
     from django.core.paginator import Paginator
@@ -136,6 +255,8 @@ def notification_mark_all_read(request):
         is_read=True,
         read_at=timezone.now()
     )
+    UserContractStats.bump_notification_version([request.user.pk])
+    publish_unread_count(request.user.pk)
     
     return JsonResponse({
         'success': True,
@@ -251,6 +372,8 @@ Tarih: {datetime.now().strftime('%d/%m/%Y %H:%M')}
     return full_content
 
 
+@cache_public_page
+@read_only_db
 def home(request):
     """Ana sayfa"""
     if request.user.is_authenticated:
@@ -261,33 +384,22 @@ def home(request):
         public_contracts = Contract.objects.filter(
             visibility='public',
             status='completed'
-        ).order_by('-created_at')[:10]
-
-        # Davet edilen sözleşmeleri hesapla
-        invited_contracts_count = Contract.objects.filter(
-            parties__user=request.user,
-            parties__user__isnull=False,
-            parties__invitation_status__in=['pending', 'accepted']
-        ).exclude(
-            signatures__user=request.user,
-            signatures__is_signed=True
-        ).distinct().count()
+        ).select_related('creator').order_by('-created_at')[:10]
+
+        # Sayaçlar request özetinden okunur (context processor ile paylaşılır)
+        inbox = get_inbox(request)
 
         context = {
             'recent_contracts': recent_contracts,
             'public_contracts': public_contracts,
-            'total_contracts': Contract.objects.filter(creator=request.user).count(),
-            'signed_contracts': ContractSignature.objects.filter(
-                user=request.user,
-                is_signed=True
-            ).count(),
-            'invited_contracts_count': invited_contracts_count,
+            'total_contracts': inbox.created_contracts_count,
+            'signed_contracts': inbox.signed_contracts_count,
         }
     else:
         public_contracts = Contract.objects.filter(
             visibility='public',
             status='completed'
-        ).order_by('-created_at')[:10]
+        ).select_related('creator').order_by('-created_at')[:10]
 
         context = {
             'public_contracts': public_contracts,
@@ -317,163 +429,152 @@ def contract_create(request):
         return redirect('contracts:my_contracts')
     
     if request.method == 'POST':
-        title = request.POST.get('title')
-        content = request.POST.get('content')
-        template_id = request.POST.get('template')
-        visibility = request.POST.get('visibility', 'private')
-        second_party_id = request.POST.get('second_party')
-        contract_type = request.POST.get('contract_type', 'other')
-
-        # Sözleşme zamanlaması
-        start_date = request.POST.get('start_date')
-        duration_months = request.POST.get('duration_months')
-        is_indefinite = request.POST.get('is_indefinite') == 'on'
-
-        # Validasyon
-        from datetime import datetime
-        try:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            if start_date_obj < datetime.now().date():
-                messages.error(request, 'Sözleşme başlangıç tarihi geçmiş bir tarih olamaz.')
+        with transaction.atomic():
+            title = request.POST.get('title')
+            content = request.POST.get('content')
+            template_id = request.POST.get('template')
+            visibility = request.POST.get('visibility', 'private')
+            second_party_id = request.POST.get('second_party')
+            contract_type = request.POST.get('contract_type', 'other')
+
+            # Sözleşme zamanlaması
+            start_date = request.POST.get('start_date')
+            duration_months = request.POST.get('duration_months')
+            is_indefinite = request.POST.get('is_indefinite') == 'on'
+
+            # Validasyon
+            from datetime import datetime
+            try:
+                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+                if start_date_obj < datetime.now().date():
+                    messages.error(request, 'Sözleşme başlangıç tarihi geçmiş bir tarih olamaz.')
+                    return redirect('contracts:contract_create')
+            except ValueError:
+                messages.error(request, 'Geçersiz tarih formatı.')
                 return redirect('contracts:contract_create')
-        except ValueError:
-            messages.error(request, 'Geçersiz tarih formatı.')
-            return redirect('contracts:contract_create')
-
-        if not is_indefinite and not duration_months:
-            messages.error(request, 'Süresiz sözleşme değilse süre belirtmelisiniz.')
-            return redirect('contracts:contract_create')
 
-        if is_indefinite:
-            duration_months = None
-        else:
-            try:
-                duration_months = int(duration_months)
-                if duration_months <= 0 or duration_months > 1200:  # Max 100 yıl
-                    raise ValueError
-            except (ValueError, TypeError):
-                messages.error(request, 'Geçersiz sözleşme süresi (1-1200 ay arası olmalı).')
+            if not is_indefinite and not duration_months:
+                messages.error(request, 'Süresiz sözleşme değilse süre belirtmelisiniz.')
                 return redirect('contracts:contract_create')
 
-        # Vicdan sözleşmesi ise görünürlüğü private yap
-        is_self_contract = contract_type == 'self'
-        if is_self_contract:
-            visibility = 'private'
-
-        # Sözleşme içeriğini dinamikleştir (şimdilik basic)
-        enhanced_content = generate_contract_content(content, request.user, None)
-
-        contract = Contract.objects.create(
-            title=title,
-            content=enhanced_content,
-            creator=request.user,
-            visibility=visibility,
-            is_self_contract=is_self_contract,
-            start_date=start_date_obj,
-            duration_months=duration_months,
-            is_indefinite=is_indefinite
-        )
+            if is_indefinite:
+                duration_months = None
+            else:
+                try:
+                    duration_months = int(duration_months)
+                    if duration_months <= 0 or duration_months > 1200:  # Max 100 yıl
+                        raise ValueError
+                except (ValueError, TypeError):
+                    messages.error(request, 'Geçersiz sözleşme süresi (1-1200 ay arası olmalı).')
+                    return redirect('contracts:contract_create')
+
+            # Vicdan sözleşmesi ise görünürlüğü private yap
+            is_self_contract = contract_type == 'self'
+            if is_self_contract:
+                visibility = 'private'
+
+            # Sözleşme içeriğini dinamikleştir (şimdilik basic)
+            enhanced_content = generate_contract_content(content, request.user, None)
+
+            contract = Contract.objects.create(
+                title=title,
+                content=enhanced_content,
+                creator=request.user,
+                visibility=visibility,
+                is_self_contract=is_self_contract,
+                start_date=start_date_obj,
+                duration_months=duration_months,
+                is_indefinite=is_indefinite
+            )
 
-        # is_editable field'ını True olarak set et
-        contract.is_editable = True
-        contract.save()
+            # is_editable field'ını True olarak set et
+            contract.is_editable = True
+            contract.save()
 
-        if template_id:
-            try:
-                template = ContractTemplate.objects.get(id=template_id)
-                contract.template = template
-                contract.save()
-            except ContractTemplate.DoesNotExist:
-                pass
-
-        # Creator'ı otomatik olarak taraf olarak ekle
-        creator_party = ContractParty.objects.create(
-            contract=contract,
-            user=request.user,
-            role='party'
-        )
+            if template_id:
+                try:
+                    template = ContractTemplate.objects.get(id=template_id)
+                    contract.template = template
+                    contract.save()
+                except ContractTemplate.DoesNotExist:
+                    pass
 
-        # Creator için imza kaydı oluştur
-        creator_signature_code = generate_signature_code()
-        ContractSignature.objects.create(
-            contract=contract,
-            party=creator_party,
-            user=request.user,
-            signature_code=creator_signature_code
-        )
+            # Creator'ı otomatik olarak taraf olarak ekle
+            creator_party = ContractParty.objects.create(
+                contract=contract,
+                user=request.user,
+                role='party'
+            )
 
-        # İkinci tarafı ekle (sadece normal sözleşmeler için)
-        if not is_self_contract and second_party_id:
-            try:
-                second_party = User.objects.get(id=second_party_id)
-                party = ContractParty.objects.create(
-                    contract=contract,
-                    user=second_party,
-                    role='party'
-                )
+            # Creator için imza kaydı oluştur
+            creator_signature_code = generate_signature_code()
+            ContractSignature.objects.create(
+                contract=contract,
+                party=creator_party,
+                user=request.user,
+                signature_code=creator_signature_code
+            )
 
-                # İkinci taraf için imza kaydı oluştur
-                signature_code = generate_signature_code()
-                ContractSignature.objects.create(
-                    contract=contract,
-                    party=party,
-                    user=second_party,
-                    signature_code=signature_code
-                )
+            # İkinci tarafı ekle (sadece normal sözleşmeler için)
+            if not is_self_contract and second_party_id:
+                try:
+                    second_party = User.objects.get(id=second_party_id)
+                    party = ContractParty.objects.create(
+                        contract=contract,
+                        user=second_party,
+                        role='party'
+                    )
 
-                # Sözleşme daveti ve imza e-postası gönder
-                send_contract_invitation_email(second_party.email, contract, request.user)
-                send_signature_email(second_party.email, contract, signature_code)
-                
-                # Bildirim oluştur
-                Notification.objects.create(
-                    recipient=second_party,
-                    sender=request.user,
-                    notification_type='contract_invitation',
-                    title=f'Sözleşme Daveti: {contract.title}',
-                    message=f'{request.user.get_full_name() or request.user.username} sizi "{contract.title}" sözleşmesine davet etti.',
-                    contract=contract,
-                    priority='normal',
-                    metadata={
-                        'contract_id': str(contract.id),
-                        'inviter': request.user.username,
-                    }
-                )
-                
-                # Development modunda davet durumunu otomatik kabul et
-                from django.conf import settings
-                if not getattr(settings, 'SEND_ACTUAL_EMAILS', False):
-                    party.invitation_status = 'accepted'
-                    party.save()
-                    print(f"[AUTO] Development modunda {second_party.email} icin davet otomatik kabul edildi")
-            except User.DoesNotExist:
-                pass
+                    # İkinci taraf için imza kaydı oluştur
+                    signature_code = generate_signature_code()
+                    ContractSignature.objects.create(
+                        contract=contract,
+                        party=party,
+                        user=second_party,
+                        signature_code=signature_code
+                    )
 
-        # Sözleşme içeriğini taraflarla güncelle
-        updated_content = generate_contract_content(content, request.user, second_party_id if not is_self_contract else None)
-        contract.content = updated_content
-        contract.save()
+                    # Sözleşme daveti ve imza e-postası gönder
+                    send_contract_invitation_email(second_party.email, contract, request.user)
+                    send_signature_email(second_party.email, contract, signature_code)
+                    
+                    # Bildirim oluştur
+                    NotificationDispatcher(sender=request.user, contract=contract).add(
+                        second_party,
+                        notification_type='contract_invitation',
+                        title=f'Sözleşme Daveti: {contract.title}',
+                        message=f'{request.user.get_full_name() or request.user.username} sizi "{contract.title}" sözleşmesine davet etti.',
+                        priority='normal',
+                        metadata={
+                            'contract_id': str(contract.id),
+                            'inviter': request.user.username,
+                        }
+                    ).dispatch()
+                    
+                    # Development modunda davet durumunu otomatik kabul et
+                    from django.conf import settings
+                    if not getattr(settings, 'SEND_ACTUAL_EMAILS', False):
+                        party.invitation_status = 'accepted'
+                        party.save()
+                        print(f"[AUTO] Development modunda {second_party.email} icin davet otomatik kabul edildi")
+                except User.DoesNotExist:
+                    pass
 
-        # Abonelikte sözleşme sayacını artır
-        user_subscription.increment_created_contracts()
+            # Sözleşme içeriğini taraflarla güncelle
+            updated_content = generate_contract_content(content, request.user, second_party_id if not is_self_contract else None)
+            contract.content = updated_content
+            contract.save()
 
-        messages.success(request, 'Sözleşme başarıyla oluşturuldu!')
-        return redirect('contracts:contract_detail', pk=contract.pk)
+            # Abonelikte sözleşme sayacını artır
+            user_subscription.increment_created_contracts()
+
+            messages.success(request, 'Sözleşme başarıyla oluşturuldu!')
+            return redirect('contracts:contract_detail', pk=contract.pk)
 
     templates = ContractTemplate.objects.filter(is_active=True)
     # Sistemdeki diğer kullanıcıları al (creator hariç)
     other_users = User.objects.exclude(id=request.user.id)[:50]  # İlk 50 kullanıcı
 
-    # Davet edilen sözleşme sayısı
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
-
     # Kullanıcının kendi şablonlarını da ekle
     user_templates = ContractTemplate.objects.filter(
         Q(creator=request.user) |
@@ -484,7 +585,6 @@ def contract_create(request):
     return render(request, 'contracts/contract_create.html', {
         'templates': user_templates,
         'other_users': other_users,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -492,20 +592,8 @@ def contract_templates(request):
     """Sözleşme şablonları"""
     templates = ContractTemplate.objects.filter(is_active=True)
 
-    invited_contracts_count = 0
-    if request.user.is_authenticated:
-        invited_contracts_count = Contract.objects.filter(
-            parties__user=request.user,
-            parties__user__isnull=False,
-            parties__invitation_status__in=['pending', 'accepted']
-        ).exclude(
-            signatures__user=request.user,
-            signatures__is_signed=True
-        ).distinct().count()
-
     return render(request, 'contracts/contract_templates.html', {
         'templates': templates,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -514,7 +602,7 @@ def contract_detail(request, pk):
     from django.http import Http404
     
     try:
-        contract = get_object_or_404(Contract, pk=pk)
+        contract = get_object_or_404(Contract.objects.select_related('creator').with_fragment_state(), pk=pk)
     except Http404:
         # Sözleşme bulunamadı - muhtemelen red edilip silinmiş
         if request.user.is_authenticated:
@@ -524,51 +612,34 @@ def contract_detail(request, pk):
             messages.warning(request, 'Bu sözleşme artık mevcut değil.')
             return redirect('contracts:home')
 
+    # Kullanıcının bu sözleşmedeki rolünü belirle (bir kullanıcı en fazla bir kez taraftır)
+    user_party = None
+    if request.user.is_authenticated:
+        user_party = contract.parties.filter(user=request.user).prefetch_related('signatures').first()
+    is_creator = request.user.is_authenticated and contract.creator_id == request.user.id
+
     # Görünürlük kontrolü
     if contract.visibility == 'private':
         if not request.user.is_authenticated:
             messages.error(request, 'Bu sözleşmeyi görüntülemek için giriş yapmalısınız.')
             return redirect('account_login')
 
-        if (contract.creator != request.user and
-            not contract.parties.filter(user=request.user).exists()):
+        if not is_creator and user_party is None:
             messages.error(request, 'Bu sözleşmeye erişim yetkiniz yok.')
             return redirect('contracts:home')
         
         # Red eden kullanıcılar (creator hariç) sözleşmeyi göremez
-        if contract.creator != request.user:
-            user_party_check = contract.parties.filter(user=request.user, invitation_status='declined').first()
-            if user_party_check:
-                messages.warning(request, 'Bu sözleşmeyi reddettiğiniz için artık görüntüleyemezsiniz.')
-                return redirect('contracts:invited_contracts')
-
-    # Kullanıcının bu sözleşmedeki rolünü belirle
-    user_party = None
-    if request.user.is_authenticated:
-        try:
-            user_party = ContractParty.objects.get(
-                contract=contract,
-                user=request.user
-            )
-        except ContractParty.DoesNotExist:
-            pass
+        if not is_creator and user_party.invitation_status == 'declined':
+            messages.warning(request, 'Bu sözleşmeyi reddettiğiniz için artık görüntüleyemezsiniz.')
+            return redirect('contracts:invited_contracts')
 
-    # Davet edilen sözleşme sayısı
-    invited_contracts_count = 0
-    if request.user.is_authenticated:
-        invited_contracts_count = Contract.objects.filter(
-            parties__user=request.user,
-            parties__user__isnull=False,
-            parties__invitation_status__in=['pending', 'accepted']
-        ).exclude(
-            signatures__user=request.user,
-            signatures__is_signed=True
-        ).distinct().count()
+    if is_creator:
+        # Onaylar tarafların çıkarılabilirlik kontrolünde kullanılır
+        prefetch_related_objects([contract], 'approvals')
 
     # Free kullanıcılar için content sınırlaması
     user_subscription = getattr(request.user, 'subscription', None) if request.user.is_authenticated else None
     is_free_user = user_subscription and user_subscription.plan.plan_type == 'free'
-    is_creator = request.user.is_authenticated and contract.creator == request.user
     
     # Content gösterilecek mi?
     contract_content = contract.content
@@ -580,15 +651,18 @@ def contract_detail(request, pk):
             contract_content = contract.content[:500] + '\n\n[...]\n\n[Sözleşmeyi tam olarak görmek için Premium plan satın alın]'
             content_restricted = True
 
+    # Listeler şablonda sadece önbellekte olmayan parçalar için sorgulanır
     context = {
         'contract': contract,
         'contract_content': contract_content,
         'content_restricted': content_restricted,
         'user_party': user_party,
-        'parties': contract.parties.all(),
+        'is_creator': is_creator,
+        'parties': contract.parties.select_related('user').prefetch_related('signatures'),
         'signatures': contract.signatures.all(),
-        'comments': contract.comments.all(),
-        'invited_contracts_count': invited_contracts_count,
+        'comments': contract.comments.select_related('user'),
+        'fragment_version': contract_fragment_version(contract),
+        'fragment_ttl': fragment_cache_ttl(),
     }
 
     return render(request, 'contracts/contract_detail.html', context)
@@ -625,18 +699,8 @@ def contract_edit(request, pk):
         messages.success(request, 'Sözleşme başarıyla güncellendi!')
         return redirect('contracts:contract_detail', pk=pk)
 
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
-
     return render(request, 'contracts/contract_edit.html', {
         'contract': contract,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -657,87 +721,88 @@ def declined_contract_recreate(request, pk):
         return redirect('contracts:declined_contracts')
     
     if request.method == 'POST':
-        # Yeni sözleşme oluştur
-        title = request.POST.get('title', original_contract.title)
-        content = request.POST.get('content', original_contract.content)
-        visibility = request.POST.get('visibility', original_contract.visibility)
-        is_self_contract = request.POST.get('is_self_contract') == 'on'
-        
-        # Tarih bilgileri
-        start_date_str = request.POST.get('start_date')
-        duration_months = int(request.POST.get('duration_months', 12))
-        is_indefinite = request.POST.get('is_indefinite') == 'on'
-        
-        if start_date_str:
-            start_date_obj = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        else:
-            start_date_obj = timezone.now().date()
-        
-        # Sözleşme içeriğini dinamikleştir
-        enhanced_content = generate_contract_content(content, request.user, None)
-        
-        # Yeni sözleşme oluştur
-        new_contract = Contract.objects.create(
-            title=title,
-            content=enhanced_content,
-            creator=request.user,
-            visibility=visibility,
-            is_self_contract=is_self_contract,
-            start_date=start_date_obj,
-            duration_months=duration_months,
-            is_indefinite=is_indefinite
-        )
-        
-        new_contract.is_editable = True
-        new_contract.save()
-        
-        # Creator'ı otomatik olarak taraf olarak ekle
-        creator_party = ContractParty.objects.create(
-            contract=new_contract,
-            user=request.user,
-            role='party'
-        )
-        
-        # Creator için imza kaydı oluştur
-        creator_signature_code = generate_signature_code()
-        ContractSignature.objects.create(
-            contract=new_contract,
-            party=creator_party,
-            user=request.user,
-            signature_code=creator_signature_code
-        )
-        
-        # İkinci tarafı ekle (sadece normal sözleşmeler için)
-        if not is_self_contract:
-            second_party_id = request.POST.get('second_party_id')
-            if second_party_id:
-                try:
-                    second_party = User.objects.get(id=second_party_id)
-                    party = ContractParty.objects.create(
-                        contract=new_contract,
-                        user=second_party,
-                        role='party'
-                    )
-                    # İkinci taraf için imza kaydı oluştur
-                    signature_code = generate_signature_code()
-                    ContractSignature.objects.create(
-                        contract=new_contract,
-                        party=party,
-                        user=second_party,
-                        signature_code=signature_code
-                    )
-                    # Sözleşme daveti ve imza e-postası gönder
-                    send_contract_invitation_email(second_party.email, new_contract, request.user)
-                    send_signature_email(second_party.email, new_contract, signature_code)
-                except User.DoesNotExist:
-                    pass
-        
-        # Eski sözleşmeyi arşivle (status'u archived yap)
-        original_contract.status = 'archived'
-        original_contract.save()
-        
-        messages.success(request, f'Red edilen sözleşme "{original_contract.title}" yeni sözleşme olarak oluşturuldu!')
-        return redirect('contracts:contract_detail', pk=new_contract.pk)
+        with transaction.atomic():
+            # Yeni sözleşme oluştur
+            title = request.POST.get('title', original_contract.title)
+            content = request.POST.get('content', original_contract.content)
+            visibility = request.POST.get('visibility', original_contract.visibility)
+            is_self_contract = request.POST.get('is_self_contract') == 'on'
+            
+            # Tarih bilgileri
+            start_date_str = request.POST.get('start_date')
+            duration_months = int(request.POST.get('duration_months', 12))
+            is_indefinite = request.POST.get('is_indefinite') == 'on'
+            
+            if start_date_str:
+                start_date_obj = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            else:
+                start_date_obj = timezone.now().date()
+            
+            # Sözleşme içeriğini dinamikleştir
+            enhanced_content = generate_contract_content(content, request.user, None)
+            
+            # Yeni sözleşme oluştur
+            new_contract = Contract.objects.create(
+                title=title,
+                content=enhanced_content,
+                creator=request.user,
+                visibility=visibility,
+                is_self_contract=is_self_contract,
+                start_date=start_date_obj,
+                duration_months=duration_months,
+                is_indefinite=is_indefinite
+            )
+            
+            new_contract.is_editable = True
+            new_contract.save()
+            
+            # Creator'ı otomatik olarak taraf olarak ekle
+            creator_party = ContractParty.objects.create(
+                contract=new_contract,
+                user=request.user,
+                role='party'
+            )
+            
+            # Creator için imza kaydı oluştur
+            creator_signature_code = generate_signature_code()
+            ContractSignature.objects.create(
+                contract=new_contract,
+                party=creator_party,
+                user=request.user,
+                signature_code=creator_signature_code
+            )
+            
+            # İkinci tarafı ekle (sadece normal sözleşmeler için)
+            if not is_self_contract:
+                second_party_id = request.POST.get('second_party_id')
+                if second_party_id:
+                    try:
+                        second_party = User.objects.get(id=second_party_id)
+                        party = ContractParty.objects.create(
+                            contract=new_contract,
+                            user=second_party,
+                            role='party'
+                        )
+                        # İkinci taraf için imza kaydı oluştur
+                        signature_code = generate_signature_code()
+                        ContractSignature.objects.create(
+                            contract=new_contract,
+                            party=party,
+                            user=second_party,
+                            signature_code=signature_code
+                        )
+                        # Sözleşme daveti ve imza e-postası gönder
+                        send_contract_invitation_email(second_party.email, new_contract, request.user)
+                        send_signature_email(second_party.email, new_contract, signature_code)
+                    except User.DoesNotExist:
+                        pass
+            
+            # Eski sözleşmeyi arşivle (status'u archived yap)
+            original_contract.status = 'archived'
+            original_contract.save()
+            
+            messages.success(request, f'Red edilen sözleşme "{original_contract.title}" yeni sözleşme olarak oluşturuldu!')
+            return redirect('contracts:contract_detail', pk=new_contract.pk)
     
     # Red edilen tarafları al
     declined_parties = original_contract.parties.filter(invitation_status='declined')
@@ -745,20 +810,10 @@ def declined_contract_recreate(request, pk):
     # Kullanıcıları al (yeni taraf seçimi için)
     users = User.objects.exclude(id=request.user.id).order_by('first_name', 'last_name', 'username')
     
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
-    
     return render(request, 'contracts/declined_contract_recreate.html', {
         'original_contract': original_contract,
         'declined_parties': declined_parties,
         'users': users,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -788,18 +843,8 @@ def contract_delete(request, pk):
             messages.error(request, f'Sözleşme silinirken bir hata oluştu: {str(e)}')
             return redirect('contracts:contract_detail', pk=pk)
 
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
-
     return render(request, 'contracts/contract_confirm_delete.html', {
         'contract': contract,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -840,56 +885,47 @@ def contract_decline(request, pk):
         return redirect('contracts:invited_contracts')
 
     if request.method == 'POST':
-        # Red nedeni al
-        decline_reason = request.POST.get('decline_reason', '').strip()
-        
-        # Kullanıcı sözleşmeyi oluşturan mı yoksa davet edilen mi?
-        is_creator = (contract.creator == request.user)
-        
-        if is_creator:
-            # Sözleşme oluşturan kendi sözleşmesini red ediyor - bu normalde olmamalı
-            # Ama olursa, sadece durumu güncelleyelim
-            user_party.invitation_status = 'declined'
-            user_party.decline_reason = decline_reason
-            user_party.declined_at = timezone.now()
-            user_party.save()
+        with transaction.atomic():
+            # Red nedeni al
+            decline_reason = request.POST.get('decline_reason', '').strip()
             
-            messages.success(request, 'Sözleşme reddedildi.')
-            return redirect('contracts:my_contracts')
-        else:
-            # Davet edilen kullanıcı red ediyor - sözleşme SİLİNMEZ, sadece party durumu güncellenir
-            contract_title = contract.title
-            creator_email = contract.creator.email
+            # Kullanıcı sözleşmeyi oluşturan mı yoksa davet edilen mi?
+            is_creator = (contract.creator == request.user)
             
-            # Party durumunu güncelle
-            user_party.invitation_status = 'declined'
-            user_party.decline_reason = decline_reason
-            user_party.declined_at = timezone.now()
-            user_party.save()
-            
-            # Sözleşme oluşturucusuna e-posta gönder
-            send_contract_declined_email(creator_email, contract, request.user, decline_reason)
-            
-            if decline_reason:
-                messages.success(request, f'"{contract_title}" sözleşme daveti reddedildi. Red nedeni sözleşme oluşturucusuna iletildi.')
+            if is_creator:
+                # Sözleşme oluşturan kendi sözleşmesini red ediyor - bu normalde olmamalı
+                # Ama olursa, sadece durumu güncelleyelim
+                user_party.invitation_status = 'declined'
+                user_party.decline_reason = decline_reason
+                user_party.declined_at = timezone.now()
+                user_party.save()
+                
+                messages.success(request, 'Sözleşme reddedildi.')
+                return redirect('contracts:my_contracts')
             else:
-                messages.success(request, f'"{contract_title}" sözleşme daveti reddedildi.')
-            
-            return redirect('contracts:invited_contracts')
-
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
+                # Davet edilen kullanıcı red ediyor - sözleşme SİLİNMEZ, sadece party durumu güncellenir
+                contract_title = contract.title
+                creator_email = contract.creator.email
+                
+                # Party durumunu güncelle
+                user_party.invitation_status = 'declined'
+                user_party.decline_reason = decline_reason
+                user_party.declined_at = timezone.now()
+                user_party.save()
+                
+                # Sözleşme oluşturucusuna e-posta gönder
+                send_contract_declined_email(creator_email, contract, request.user, decline_reason)
+                
+                if decline_reason:
+                    messages.success(request, f'"{contract_title}" sözleşme daveti reddedildi. Red nedeni sözleşme oluşturucusuna iletildi.')
+                else:
+                    messages.success(request, f'"{contract_title}" sözleşme daveti reddedildi.')
+                
+                return redirect('contracts:invited_contracts')
 
     return render(request, 'contracts/contract_decline.html', {
         'contract': contract,
         'user_party': user_party,
-        'invited_contracts_count': invited_contracts_count,
     })
 
 
@@ -906,65 +942,59 @@ def contract_sign(request, pk):
         return redirect('contracts:invited_contracts')
 
     if request.method == 'POST':
-        signature_code = request.POST.get('signature_code')
+        with transaction.atomic():
+            signature_code = request.POST.get('signature_code')
 
-        try:
-            signature = ContractSignature.objects.get(
-                contract=contract,
-                party=user_party
-            )
-        except ContractSignature.DoesNotExist:
-            signature = ContractSignature.objects.create(
-                contract=contract,
-                party=user_party,
-                user=request.user
-            )
+            try:
+                signature = ContractSignature.objects.get(
+                    contract=contract,
+                    party=user_party
+                )
+                # Sayaçlar bu nesne üzerinde güncellensin (tamamlanma kontrolü aşağıda)
+                signature.contract = contract
+            except ContractSignature.DoesNotExist:
+                signature = ContractSignature.objects.create(
+                    contract=contract,
+                    party=user_party,
+                    user=request.user
+                )
 
-        if signature.signature_code == signature_code:
-            signature.is_signed = True
-            signature.signed_at = timezone.now()
-            signature.ip_address = get_client_ip(request)
-            signature.save()
+            if signature.signature_code == signature_code:
+                signature.is_signed = True
+                signature.signed_at = timezone.now()
+                signature.ip_address = get_client_ip(request)
+                signature.save()
 
-            messages.success(request, 'Sözleşme başarıyla imzalandı!')
+                messages.success(request, 'Sözleşme başarıyla imzalandı!')
 
-            # Sözleşmeyi tamamlama kontrolü
-            if contract.can_be_completed:
-                contract.mark_as_completed()
-                messages.success(request, 'Sözleşme tamamlandı ve artık değiştirilemez!')
+                # Sözleşmeyi tamamlama kontrolü
+                if contract.can_be_completed:
+                    contract.mark_as_completed()
+                    messages.success(request, 'Sözleşme tamamlandı ve artık değiştirilemez!')
 
-            return redirect('contracts:contract_detail', pk=pk)
-        else:
-            messages.error(request, 'Geçersiz imza kodu.')
+                return redirect('contracts:contract_detail', pk=pk)
+            else:
+                messages.error(request, 'Geçersiz imza kodu.')
 
     # İmza kodu oluştur/gönder
     if not hasattr(user_party, 'signature') or not user_party.signature.signature_code:
         signature_code = generate_signature_code()
-        signature, created = ContractSignature.objects.get_or_create(
-            contract=contract,
-            party=user_party,
-            defaults={'user': request.user, 'signature_code': signature_code}
-        )
-        if not created:
-            signature.signature_code = signature_code
-            signature.save()
+        with transaction.atomic():
+            signature, created = ContractSignature.objects.get_or_create(
+                contract=contract,
+                party=user_party,
+                defaults={'user': request.user, 'signature_code': signature_code}
+            )
+            if not created:
+                signature.signature_code = signature_code
+                signature.save()
 
         # E-posta gönder
         send_signature_email(request.user.email, contract, signature_code)
 
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
-
     return render(request, 'contracts/contract_sign.html', {
         'contract': contract,
         'user_party': user_party,
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -1008,104 +1038,87 @@ def contract_approve(request, pk):
 @login_required
 def my_contracts(request):
     """Kullanıcının oluşturduğu ve imzaladığı sözleşmeler"""
-    from django.db.models import Q
-    
     # Kullanıcının oluşturduğu VEYA imzaladığı sözleşmeler
-    contracts = Contract.objects.filter(
-        Q(creator=request.user) | 
-        Q(signatures__user=request.user, signatures__is_signed=True)
-    ).distinct().order_by('-created_at')
-    
-    # Davet edilen sözleşme sayısı
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
+    # (JOIN + DISTINCT yerine EXISTS: keyset sıralaması indeksten okunabilsin)
+    contracts = Contract.objects.created_by(request.user) | Contract.objects.signed_by(request.user)
 
+    page = paginate(request, contracts, ordering=CONTRACT_LIST_ORDERING)
+    if wants_json(request):
+        return JsonResponse(page.as_dict(contract_list_item), json_dumps_params={'ensure_ascii': False})
+
+    # Liste imleçle sayfalandığı için toplamlar sayfadan değil sayaçlardan gelir
+    inbox = get_inbox(request)
     return render(request, 'contracts/my_contracts.html', {
-        'contracts': contracts,
-        'invited_contracts_count': invited_contracts_count
+        'contracts': page,
+        'total_count': estimated_count(contracts),
+        'created_count': inbox.created_contracts_count,
+        'signed_count': inbox.signed_contracts_count,
+        'invited_count': inbox.invited_contracts_count,
     })
 
 
 @login_required
 def signed_contracts(request):
     """Kullanıcının imzaladığı sözleşmeler"""
-    signed_contracts = Contract.objects.filter(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().order_by('-created_at')
+    signed_contracts = Contract.objects.signed_by(request.user).select_related(
+        'creator'
+    ).with_user_signature(request.user)
+
+    page = paginate(request, signed_contracts, ordering=CONTRACT_LIST_ORDERING)
 
     # Her sözleşme için kullanıcının imza bilgisini ekle
-    contracts_with_signatures = []
-    for contract in signed_contracts:
-        user_signature = contract.signatures.filter(
-            user=request.user,
-            is_signed=True
-        ).first()
-        contract.user_signature = user_signature
-        contracts_with_signatures.append(contract)
-
-    # Davet edilen sözleşme sayısı
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
+    for contract in page:
+        contract.user_signature = contract.user_signatures[0] if contract.user_signatures else None
+
+    if wants_json(request):
+        return JsonResponse(page.as_dict(contract_list_item), json_dumps_params={'ensure_ascii': False})
 
     return render(request, 'contracts/signed_contracts.html', {
-        'contracts': contracts_with_signatures,
-        'invited_contracts_count': invited_contracts_count
+        'contracts': page,
     })
 
 
 @login_required
 def invited_contracts(request):
     """Kullanıcının davet edildiği sözleşmeler (henüz imzalamadığı ve reddetmediği)"""
-    # Kullanıcının davet edildiği ama henüz imzalamadığı ve reddetmediği sözleşmeleri al
-    invited_parties = ContractParty.objects.filter(
-        user=request.user,
-        invitation_status__in=['pending', 'accepted']  # 'declined' durumunu dahil etme
-    ).select_related('contract', 'contract__creator')
+    # Kullanıcının davet edildiği ama henüz imzalamadığı ve reddetmediği sözleşmeler
+    # ('declined' durumu ve imzalanmış olanlar dahil değil)
+    invited = Contract.objects.awaiting_signature_from(request.user).select_related(
+        'creator'
+    ).with_user_party(request.user).with_user_signature(request.user)
 
-    invited_contracts = []
-    for party in invited_parties:
-        contract = party.contract
-
-        # Kullanıcının bu sözleşmeyi imzalayıp imzalamadığını kontrol et
-        user_signature = contract.signatures.filter(user=request.user).first()
-        
-        # Eğer kullanıcı bu sözleşmeyi imzaladıysa, davet edilenler listesinde gösterme
-        if user_signature and user_signature.is_signed:
-            continue
+    page = paginate(request, invited, ordering=CONTRACT_LIST_ORDERING)
 
+    for contract in page:
+        party = contract.user_parties[0]
+        user_signature = contract.user_signatures[0] if contract.user_signatures else None
         contract.invitation_status = party.invitation_status
         contract.user_party_role = party.get_role_display()
         contract.user_signature = user_signature
         contract.can_sign = user_signature and not user_signature.is_signed
 
-        invited_contracts.append(contract)
-
-    # Oluşturulma tarihine göre sırala
-    invited_contracts.sort(key=lambda x: x.created_at, reverse=True)
+    if wants_json(request):
+        return JsonResponse(page.as_dict(lambda contract: {
+            **contract_list_item(contract),
+            'invitation_status': contract.invitation_status,
+            'can_sign': bool(contract.can_sign),
+        }), json_dumps_params={'ensure_ascii': False})
 
-    # invited_contracts_count'ı doğru hesapla (sadece pending ve accepted durumdaki sözleşmeler)
-    invited_contracts_count = len([c for c in invited_contracts if c.invitation_status in ['pending', 'accepted']])
+    # Kartlardaki sayılar tek bir sorgu ile
+    status_counts = ContractParty.objects.filter(
+        user=request.user,
+        contract__in=Contract.objects.awaiting_signature_from(request.user).values('pk')
+    ).aggregate(
+        pending=Count('contract', distinct=True, filter=Q(invitation_status='pending')),
+        accepted=Count('contract', distinct=True, filter=Q(invitation_status='accepted')),
+    )
 
     return render(request, 'contracts/invited_contracts.html', {
-        'contracts': invited_contracts,
-        'total_invited': len(invited_contracts),
-        'pending_count': len([c for c in invited_contracts if c.invitation_status == 'pending']),
-        'accepted_count': len([c for c in invited_contracts if c.invitation_status == 'accepted']),
+        'contracts': page,
+        'total_invited': status_counts['pending'] + status_counts['accepted'],
+        'pending_count': status_counts['pending'],
+        'accepted_count': status_counts['accepted'],
         'declined_count': 0,  # Red edilen sözleşmeler artık gösterilmiyor
-        'invited_contracts_count': invited_contracts_count
     })
 
 
@@ -1114,85 +1127,45 @@ def declined_contracts(request):
     """Red edilen sözleşmeler - Sadece kullanıcının oluşturduğu ve başkaları tarafından red edilen sözleşmeler"""
     # Kullanıcının oluşturduğu ve başka kullanıcılar tarafından red edilen sözleşmeler
     # Davet edilen kullanıcılar red ettiklerinde sözleşme otomatik silindiği için burada görünmezler
-    # Kullanıcının oluşturduğu sözleşmelerden başka birinin red ettiği sözleşmeleri bul
-    user_contracts = Contract.objects.filter(creator=request.user).prefetch_related('parties')
-    declined_contracts = []
-    
-    for contract in user_contracts:
-        # Bu sözleşmede başka birinin red ettiği party var mı?
-        other_declined_parties = contract.parties.filter(
-            invitation_status='declined'
-        ).exclude(user=request.user)
-        
-        if other_declined_parties.exists():
-            # Red eden tarafları da contract'a ekle
-            contract.declined_parties = other_declined_parties
-            declined_contracts.append(contract)
-
-    # Declined_at tarihine göre sırala
-    declined_contracts.sort(key=lambda x: x.declined_parties.first().declined_at if x.declined_parties.first().declined_at else timezone.now(), reverse=True)
-
-    # İstatistikleri hesapla
-    contracts_with_decliners = declined_contracts
-    total_declined_parties = 0
-    parties_with_reason = 0
-    parties_without_reason = 0
-    
-    for contract in declined_contracts:
-        # İstatistikleri hesapla
-        for party in contract.declined_parties:
-            total_declined_parties += 1
-            if party.decline_reason:
-                parties_with_reason += 1
-            else:
-                parties_without_reason += 1
-
-    # Davet edilen sözleşme sayısı
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
+    declined_parties = ContractParty.objects.filter(
+        contract__creator=request.user,
+        invitation_status='declined'
+    ).exclude(user=request.user)
+
+    declined = Contract.objects.declined_by_others(request.user)
+
+    page = paginate(request, declined, ordering=CONTRACT_LIST_ORDERING)
+    if wants_json(request):
+        return JsonResponse(page.as_dict(contract_list_item), json_dumps_params={'ensure_ascii': False})
+
+    # İstatistikleri tek sorguda hesapla
+    stats = declined_parties.aggregate(
+        total_declined_contracts=Count('contract', distinct=True),
+        total_declined_parties=Count('id'),
+        parties_without_reason=Count('id', filter=Q(decline_reason__isnull=True) | Q(decline_reason='')),
+    )
 
     return render(request, 'contracts/declined_contracts.html', {
-        'contracts': contracts_with_decliners,
-        'invited_contracts_count': invited_contracts_count,
-        'total_declined_contracts': len(contracts_with_decliners),
-        'total_declined_parties': total_declined_parties,
-        'parties_with_reason': parties_with_reason,
-        'parties_without_reason': parties_without_reason,
+        'contracts': page,
+        'total_declined_contracts': stats['total_declined_contracts'],
+        'total_declined_parties': stats['total_declined_parties'],
+        'parties_with_reason': stats['total_declined_parties'] - stats['parties_without_reason'],
+        'parties_without_reason': stats['parties_without_reason'],
     })
 
 
 @login_required
 def profile(request):
     """Kullanıcı profili"""
-    user_contracts = Contract.objects.filter(creator=request.user)
-    signed_contracts_count = ContractSignature.objects.filter(
-        user=request.user,
-        is_signed=True
-    ).count()
-
-    invited_contracts_count = Contract.objects.filter(
-        parties__user=request.user,
-        parties__user__isnull=False,
-        parties__invitation_status__in=['pending', 'accepted']
-    ).exclude(
-        signatures__user=request.user,
-        signatures__is_signed=True
-    ).distinct().count()
+    inbox = get_inbox(request)
 
     context = {
-        'user_contracts_count': user_contracts.count(),
-        'signed_contracts_count': signed_contracts_count,
+        'user_contracts_count': inbox.created_contracts_count,
+        'signed_contracts_count': inbox.signed_contracts_count,
         'total_approvals': ContractApproval.objects.filter(
             user=request.user,
             is_approved=True
         ).count(),
-        'invited_contracts_count': invited_contracts_count,
     }
 
     return render(request, 'contracts/profile.html', context)
@@ -1203,7 +1176,10 @@ def contract_pdf(request, pk):
     from django.http import Http404
     
     try:
-        contract = get_object_or_404(Contract, pk=pk)
+        contract = get_object_or_404(
+            Contract.objects.prefetch_related('parties__user', 'signatures'),
+            pk=pk
+        )
     except Http404:
         if request.user.is_authenticated:
             messages.warning(request, 'Bu sözleşme artık mevcut değil.')
@@ -1217,184 +1193,30 @@ def contract_pdf(request, pk):
             return HttpResponse('Unauthorized', status=401)
 
         if (contract.creator != request.user and
-            not contract.parties.filter(user=request.user).exists()):
+            not any(party.user_id == request.user.id for party in contract.parties.all())):
             return HttpResponse('Forbidden', status=403)
 
-    # PDF oluştur
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Türkçe karakter desteği için font ayarları
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER
-    from reportlab.lib.colors import black
-    import os
-
-    # Özel fontları yüklemeye çalış (varsa)
-    font_name = 'Helvetica'  # Default font
+    # PDF önbellekte yoksa üretilip diske yazılır, sonraki indirmeler dosyadan akar
+    filename = pdf_filename(contract)
     try:
-        # Arial Unicode MS veya benzer bir font varsa kullan
-        font_paths = [
-            os.path.join(os.path.dirname(__file__), 'fonts', 'arial.ttf'),
-            os.path.join(os.path.dirname(__file__), 'fonts', 'arial_unicode.ttf'),
-            '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',  # Linux
-            '/System/Library/Fonts/Arial.ttf',  # macOS
-            'C:/Windows/Fonts/arial.ttf',  # Windows
-        ]
-
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                pdfmetrics.registerFont(TTFont('TurkishFont', font_path))
-                font_name = 'TurkishFont'
-                print(f"Türkçe font yüklendi: {font_path}")
-                break
-    except Exception as e:
-        print(f"Font yükleme hatası: {e}")
-        font_name = 'Helvetica'
-
-    # Özel stiller oluştur (Türkçe karakter desteği için)
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=font_name,
-        fontSize=18,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        textColor=black,
-        encoding='utf-8',
-        allowOrphans=1,
-        allowWidows=1
-    )
-
-    content_style = ParagraphStyle(
-        'CustomContent',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=12,
-        spaceAfter=12,
-        alignment=TA_LEFT,
-        textColor=black,
-        encoding='utf-8',
-        allowOrphans=1,
-        allowWidows=1
-    )
-
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontName=font_name,
-        fontSize=14,
-        spaceAfter=10,
-        alignment=TA_LEFT,
-        textColor=black,
-        encoding='utf-8',
-        allowOrphans=1,
-        allowWidows=1
-    )
-
-    # Türkçe karakterleri güvenli hale getirme fonksiyonu
-    def safe_text(text):
-        """Türkçe karakterleri güvenli hale getirir"""
-        if not text:
-            return ""
-
-        # Önce string'e dönüştür
-        text = str(text)
-
-        # UTF-8 encoding/decoding ile temizle
-        try:
-            # Unicode normalize et
-            import unicodedata
-            text = unicodedata.normalize('NFC', text)
-            return text.encode('utf-8').decode('utf-8')
-        except (UnicodeDecodeError, UnicodeEncodeError, UnicodeError):
-            # Eğer UTF-8 hatası olursa alternatif yöntemler dene
-            try:
-                return text.encode('latin1').decode('utf-8')
-            except:
-                try:
-                    return text.encode('cp1254').decode('utf-8')
-                except:
-                    # Son çare: ASCII'ye dönüştür
-                    return text.encode('ascii', 'ignore').decode('ascii')
-
-    # Başlık - Türkçe karakter desteği ile
-    title_text = safe_text(contract.title)
-    title = Paragraph(title_text, title_style)
-    story.append(title)
-    story.append(Spacer(1, 12))
-
-    # İçerik - Türkçe karakter desteği ile
-    content_text = safe_text(contract.content.replace('\n', '<br/>'))
-    content = Paragraph(content_text, content_style)
-    story.append(content)
-    story.append(Spacer(1, 12))
-
-    # Taraflar başlığı
-    parties_title = Paragraph("Taraflar:", heading_style)
-    story.append(parties_title)
-
-    # Taraflar listesi
-    for party in contract.parties.all():
-        if party.user:
-            party_name = party.user.get_full_name() or party.user.username
-            party_email = party.user.email
-        else:
-            party_name = party.name or "İsimsiz"
-            party_email = party.email or ""
-
-        # Türkçe karakter desteği ile
-        party_text = safe_text(f"- {party_name} ({party_email})")
-        story.append(Paragraph(party_text, content_style))
-
-    # İmzalar bölümü
-    story.append(Spacer(1, 20))
-    signatures_title = Paragraph("İmzalar:", heading_style)
-    story.append(signatures_title)
-
-    for party in contract.parties.all():
-        if party.user:
-            party_name = party.user.get_full_name() or party.user.username
-        else:
-            party_name = party.name or "İsimsiz"
-
-        signature_text = safe_text(f"_______________________________<br/><b>{party_name}</b>")
-        story.append(Paragraph(signature_text, content_style))
-        story.append(Spacer(1, 30))
+        pdf_file = open(pdf_cache.get(contract), 'rb')
+    except PdfRenderError:
+        # Hata belgesi önbelleğe yazılmaz; sonraki istek yeniden üretmeyi dener
+        return HttpResponse(
+            render_error_pdf(),
+            content_type='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
+    except OSError as e:
+        # Dosya eviction ile silinmiş veya önbellek dizini yazılamıyor
+        print(f"PDF önbellek hatası: {e}")
+        return HttpResponse(
+            render_contract(contract),
+            content_type='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
 
-    # PDF oluşturma işlemi
-    try:
-        doc.build(story)
-    except Exception as pdf_error:
-        print(f"PDF oluşturma hatası: {pdf_error}")
-        # Hata durumunda basit bir PDF oluştur
-        from reportlab.platypus import SimpleDocTemplate as SimpleDocTemplateFallback
-        buffer = BytesIO()
-        doc = SimpleDocTemplateFallback(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Basit hata mesajı
-        error_msg = "PDF oluşturulurken bir hata oluştu. Lütfen sayfayı yenileyip tekrar deneyin."
-        story.append(Paragraph(error_msg, styles['Normal']))
-        doc.build(story)
-
-    buffer.seek(0)
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-
-    # Dosya adını Türkçe karakter sorunu olmadan ayarla
-    safe_filename = safe_text(contract.title)
-    # Dosya adı için güvenli karakterlere dönüştür
-    import re
-    safe_filename = re.sub(r'[^\w\-_\.]', '_', safe_filename)
-    safe_filename = safe_filename[:100]  # Dosya adı çok uzun olmasın
-
-    response['Content-Disposition'] = f'attachment; filename="{safe_filename}.pdf"'
-    return response
+    return FileResponse(pdf_file, as_attachment=True, filename=filename, content_type='application/pdf')
 
 
 def contract_image(request, pk):
@@ -1461,35 +1283,48 @@ def contract_image(request, pk):
         return HttpResponse('PIL library not available', status=500)
 
 
+POOL_STATS_KEY = 'contracts:pool_stats'
+POOL_STATS_TTL = 300
+
+
+def pool_stats():
+    """Havuz sayfasındaki platform istatistikleri (sınırlı/tahmini sayımlar)"""
+    return {
+        'public_contracts': estimated_count(Contract.objects.filter(visibility='public', status='completed')),
+        'active_users': estimated_count(User.objects.filter(is_active=True)),
+    }
+
+
+@cache_public_page
+@read_only_db
 def contract_pool(request):
     """Sözleşme havuzu"""
     contracts = Contract.objects.filter(
         visibility='public',
         status='completed'
-    ).order_by('-created_at')
+    ).select_related('creator')
 
     query = request.GET.get('q')
     if query:
-        contracts = contracts.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query)
-        )
+        # FTS5 indeksi varsa BM25 sıralı sonuçlar ve vurgulu parçacıklar döner
+        results = search_contracts(query, contracts)
+        if isinstance(results, ContractSearchResults):
+            page = paginate(request, results)
+        else:
+            page = paginate(request, results, ordering=CONTRACT_LIST_ORDERING)
+    else:
+        page = paginate(request, contracts, ordering=CONTRACT_LIST_ORDERING)
 
-    invited_contracts_count = 0
-    if request.user.is_authenticated:
-        invited_contracts_count = Contract.objects.filter(
-            parties__user=request.user,
-            parties__user__isnull=False,
-            parties__invitation_status__in=['pending', 'accepted']
-        ).exclude(
-            signatures__user=request.user,
-            signatures__is_signed=True
-        ).distinct().count()
+    if wants_json(request):
+        return JsonResponse(page.as_dict(lambda contract: {
+            **contract_list_item(contract),
+            'snippet': getattr(contract, 'search_snippet', None),
+        }), json_dumps_params={'ensure_ascii': False})
 
     return render(request, 'contracts/contract_pool.html', {
-        'contracts': contracts,
+        'contracts': page,
         'query': query,
-        'invited_contracts_count': invited_contracts_count
+        'pool_stats': cache.get_or_set(POOL_STATS_KEY, pool_stats, POOL_STATS_TTL),
     })
 
 
@@ -1523,25 +1358,20 @@ def send_signature_email(email, contract, code):
 
     sözümSöz Platformu
     """
-    try:
-        from django.core.mail import send_mail
-        from django.conf import settings
-        
-        print(f"[EMAIL] Imza kodu gonderiliyor:")
-        print(f"   Alici: {email}")
-        print(f"   Sozlesme: {contract.title}")
-        print(f"   Imza Kodu: {code}")
-        
-        if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-            print(f"   [OK] Email gonderildi!")
-        else:
-            print(f"   [DEV] Development modunda - email simule edildi")
-            
-    except Exception as e:
-        print(f"   [ERROR] Email gonderme hatasi: {e}")
-        import traceback
-        traceback.print_exc()
+    from django.conf import settings
+
+    print(f"[EMAIL] Imza kodu gonderiliyor:")
+    print(f"   Alici: {email}")
+    print(f"   Sozlesme: {contract.title}")
+    print(f"   Imza Kodu: {code}")
+    
+    if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
+        # Kuyruk kaydı view'ın transaction'ında yazılır; hata yutulursa transaction
+        # bozuk halde devam eder, bu yüzden yukarı iletilir ve işlem geri alınır
+        EmailOutbox.enqueue(subject, message, [email])
+        print(f"   [OK] Email kuyruga eklendi!")
+    else:
+        print(f"   [DEV] Development modunda - email simule edildi")
 
 
 def send_contract_invitation_email(email, contract, inviter):
@@ -1565,26 +1395,19 @@ def send_contract_invitation_email(email, contract, inviter):
 
     sözümSöz Platformu
     """
-    try:
-        from django.core.mail import send_mail
-        from django.conf import settings
-        
-        print(f"[EMAIL] Sozlesme daveti gonderiliyor:")
-        print(f"   Alici: {email}")
-        print(f"   Sozlesme: {contract.title}")
-        print(f"   Davet Eden: {inviter.get_full_name() or inviter.username}")
-        
-        if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-            print(f"   [OK] Email gonderildi!")
-        else:
-            print(f"   [DEV] Development modunda - email simule edildi")
-            print(f"   [INFO] Icerik: {message[:100]}...")
-            
-    except Exception as e:
-        print(f"   [ERROR] Email gonderme hatasi: {e}")
-        import traceback
-        traceback.print_exc()
+    from django.conf import settings
+
+    print(f"[EMAIL] Sozlesme daveti gonderiliyor:")
+    print(f"   Alici: {email}")
+    print(f"   Sozlesme: {contract.title}")
+    print(f"   Davet Eden: {inviter.get_full_name() or inviter.username}")
+    
+    if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
+        EmailOutbox.enqueue(subject, message, [email])
+        print(f"   [OK] Email kuyruga eklendi!")
+    else:
+        print(f"   [DEV] Development modunda - email simule edildi")
+        print(f"   [INFO] Icerik: {message[:100]}...")
 
 
 def send_contract_declined_email(email, contract, decliner, decline_reason=''):
@@ -1616,26 +1439,19 @@ def send_contract_declined_email(email, contract, decliner, decline_reason=''):
 
     sözümSöz Platformu
     """
-    try:
-        from django.core.mail import send_mail
-        from django.conf import settings
-        
-        print(f"[EMAIL] Sozlesme reddetme bildirimi gonderiliyor:")
-        print(f"   Alici: {email}")
-        print(f"   Sozlesme: {contract.title}")
-        print(f"   Reddeden: {decliner.get_full_name() or decliner.username}")
-        print(f"   Red Nedeni: {decline_reason[:50]}..." if decline_reason else "   Red Nedeni: Belirtilmedi")
-        
-        if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-            print(f"   [OK] Email gonderildi!")
-        else:
-            print(f"   [DEV] Development modunda - email simule edildi")
-            
-    except Exception as e:
-        print(f"   [ERROR] Email gonderme hatasi: {e}")
-        import traceback
-        traceback.print_exc()
+    from django.conf import settings
+
+    print(f"[EMAIL] Sozlesme reddetme bildirimi gonderiliyor:")
+    print(f"   Alici: {email}")
+    print(f"   Sozlesme: {contract.title}")
+    print(f"   Reddeden: {decliner.get_full_name() or decliner.username}")
+    print(f"   Red Nedeni: {decline_reason[:50]}..." if decline_reason else "   Red Nedeni: Belirtilmedi")
+    
+    if getattr(settings, 'SEND_ACTUAL_EMAILS', False):
+        EmailOutbox.enqueue(subject, message, [email])
+        print(f"   [OK] Email kuyruga eklendi!")
+    else:
+        print(f"   [DEV] Development modunda - email simule edildi")
 
 
 # API Views
@@ -1673,94 +1489,89 @@ def verify_signature_code(request, pk):
 def add_contract_party(request, pk):
     """Sözleşmeye taraf ekle"""
     if request.method == 'POST':
-        contract = get_object_or_404(Contract, pk=pk, creator=request.user)
-        name = request.POST.get('name')
-        email = request.POST.get('email')
-        role = request.POST.get('role', 'party')
-        user_id = request.POST.get('user_id')
-
-        # Kullanıcı varsa bağla
-        user = None
-        if user_id:
-            try:
-                user = User.objects.get(id=user_id)
-                # Seçilen kullanıcının bilgilerini kullan
-                name = user.get_full_name() or user.username
-                email = user.email
-            except User.DoesNotExist:
-                pass
-        else:
-            # Manuel giriş - e-posta ile kullanıcı ara
-            try:
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-                pass
-
-        # Bu sözleşmede bu kullanıcı zaten taraf mı kontrol et
-        if user and ContractParty.objects.filter(contract=contract, user=user).exists():
-            return JsonResponse({
-                'success': False,
-                'message': 'Bu kullanıcı zaten sözleşmenin tarafı.'
-            })
+        with transaction.atomic():
+            contract = get_object_or_404(Contract, pk=pk, creator=request.user)
+            name = request.POST.get('name')
+            email = request.POST.get('email')
+            role = request.POST.get('role', 'party')
+            user_id = request.POST.get('user_id')
+
+            # Kullanıcı varsa bağla
+            user = None
+            if user_id:
+                try:
+                    user = User.objects.get(id=user_id)
+                    # Seçilen kullanıcının bilgilerini kullan
+                    name = user.get_full_name() or user.username
+                    email = user.email
+                except User.DoesNotExist:
+                    pass
+            else:
+                # Manuel giriş - e-posta ile kullanıcı ara
+                try:
+                    user = User.objects.get(email=email)
+                except User.DoesNotExist:
+                    pass
 
-        # ContractParty oluşturma
-        if user:
-            # Sistem kullanıcısı varsa
-            party = ContractParty.objects.create(
-                contract=contract,
-                user=user,
-                role=role
-            )
+            # Bu sözleşmede bu kullanıcı zaten taraf mı kontrol et
+            if user and ContractParty.objects.filter(contract=contract, user=user).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Bu kullanıcı zaten sözleşmenin tarafı.'
+                })
 
-            # Sistem kullanıcısı için imza kaydı oluştur
-            signature_code = generate_signature_code()
-            ContractSignature.objects.create(
-                contract=contract,
-                party=party,
-                user=user,
-                signature_code=signature_code
-            )
+            # ContractParty oluşturma
+            if user:
+                # Sistem kullanıcısı varsa
+                party = ContractParty.objects.create(
+                    contract=contract,
+                    user=user,
+                    role=role
+                )
 
-            # İmza e-postası gönder
-            send_signature_email(user.email, contract, signature_code)
-            
-            # Bildirim oluştur
-            Notification.objects.create(
-                recipient=user,
-                sender=request.user,
-                notification_type='contract_invitation',
-                title=f'Sözleşmeye Eklendi: {contract.title}',
-                message=f'{request.user.get_full_name() or request.user.username} sizi "{contract.title}" sözleşmesine {role} olarak ekledi.',
-                contract=contract,
-                priority='normal',
-                metadata={
-                    'contract_id': str(contract.id),
-                    'added_by': request.user.username,
-                    'role': role,
-                }
-            )
-            
-            # Development modunda davet durumunu otomatik kabul et
-            from django.conf import settings
-            if not getattr(settings, 'SEND_ACTUAL_EMAILS', False):
-                party.invitation_status = 'accepted'
-                party.save()
-                print(f"[AUTO] Development modunda {user.email} icin davet otomatik kabul edildi")
-        else:
-            # Manuel giriş ise (sistem kullanıcısı değil)
-            party = ContractParty.objects.create(
-                contract=contract,
-                user=None,
-                name=name,
-                email=email,
-                role=role
-            )
+                # Sistem kullanıcısı için imza kaydı oluştur
+                signature_code = generate_signature_code()
+                ContractSignature.objects.create(
+                    contract=contract,
+                    party=party,
+                    user=user,
+                    signature_code=signature_code
+                )
 
-        # Bildirim gönder
-        try:
-            from django.core.mail import send_mail
-            from django.conf import settings
+                # İmza e-postası gönder
+                send_signature_email(user.email, contract, signature_code)
+                
+                # Bildirim oluştur
+                NotificationDispatcher(sender=request.user, contract=contract).add(
+                    user,
+                    notification_type='contract_invitation',
+                    title=f'Sözleşmeye Eklendi: {contract.title}',
+                    message=f'{request.user.get_full_name() or request.user.username} sizi "{contract.title}" sözleşmesine {role} olarak ekledi.',
+                    priority='normal',
+                    metadata={
+                        'contract_id': str(contract.id),
+                        'added_by': request.user.username,
+                        'role': role,
+                    }
+                ).dispatch()
+                
+                # Development modunda davet durumunu otomatik kabul et
+                from django.conf import settings
+                if not getattr(settings, 'SEND_ACTUAL_EMAILS', False):
+                    party.invitation_status = 'accepted'
+                    party.save()
+                    print(f"[AUTO] Development modunda {user.email} icin davet otomatik kabul edildi")
+            else:
+                # Manuel giriş ise (sistem kullanıcısı değil)
+                party = ContractParty.objects.create(
+                    contract=contract,
+                    user=None,
+                    name=name,
+                    email=email,
+                    role=role
+                )
 
+            # Bildirim gönder
             subject = f"SözümSöz - Sözleşmeye Davet Edildiniz: {contract.title}"
             contract_url = f"http://localhost:8002/contracts/{contract.pk}/"
 
@@ -1784,23 +1595,15 @@ def add_contract_party(request, pk):
             SözümSöz Platformu
             """
 
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=True
-            )
-        except Exception as e:
-            print(f"Bildirim gönderme hatası: {e}")
+            EmailOutbox.enqueue(subject, message, [email])
 
-        return JsonResponse({
-            'success': True,
-            'message': 'Taraf eklendi ve davet gönderildi!',
-            'invitation_sent': True
-        }, json_dumps_params={'ensure_ascii': False})
+            return JsonResponse({
+                'success': True,
+                'message': 'Taraf eklendi ve davet gönderildi!',
+                'invitation_sent': True
+            }, json_dumps_params={'ensure_ascii': False})
 
-        return JsonResponse({'success': False, 'message': 'Geçersiz istek.'}, json_dumps_params={'ensure_ascii': False})
+            return JsonResponse({'success': False, 'message': 'Geçersiz istek.'}, json_dumps_params={'ensure_ascii': False})
 
 
 @login_required
@@ -1812,13 +1615,14 @@ def search_users(request):
         if len(query) < 2:
             return JsonResponse({'success': False, 'message': 'Arama sorgusu çok kısa.'}, json_dumps_params={'ensure_ascii': False})
 
-        # Kullanıcıları ara (ad soyad veya e-posta ile)
-        users = User.objects.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(username__icontains=query)
-        ).exclude(id=request.user.id).distinct()[:10]  # Kendisini hariç tut, max 10 sonuç
+        # Kullanıcıları ara (ad, soyad, kullanıcı adı veya e-posta öneki ile)
+        # Kendisi sonuçlardan çıkarılacağı için bir fazla id al, max 10 sonuç
+        user_ids = [
+            user_id for user_id in search_user_ids(query, limit=11)
+            if user_id != request.user.id
+        ][:10]
+        users_by_id = User.objects.in_bulk(user_ids)
+        users = [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
 
         user_list = []
         for user in users:
@@ -2082,161 +1886,66 @@ def template_use(request, pk):
 # ==================== ADMIN DASHBOARD ====================
 
 @staff_member_required
+@read_only_db
 def admin_dashboard(request):
-    """Admin dashboard - Sistem istatistikleri ve izleme"""
-    from django.utils import timezone
-    from datetime import datetime, timedelta
-    
-    # Tarih aralıkları
-    today = timezone.now().date()
-    this_month_start = today.replace(day=1)
-    this_year_start = today.replace(month=1, day=1)
-    last_30_days = timezone.now() - timedelta(days=30)
-    
-    # ==================== KULLANICI STATİSTİKLERİ ====================
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    new_users_this_month = User.objects.filter(
-        date_joined__date__gte=this_month_start
-    ).count()
-    new_users_last_30_days = User.objects.filter(
-        date_joined__gte=last_30_days
-    ).count()
-    
-    # ==================== ABONELİK STATİSTİKLERİ ====================
-    active_subscriptions = UserSubscription.objects.filter(status='active').count()
-    
-    subscriptions_by_plan = UserSubscription.objects.values('plan__name').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    subscription_revenue = Payment.objects.filter(
-        payment_type='subscription',
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    monthly_revenue = Payment.objects.filter(
-        payment_type='subscription',
-        status='completed',
-        completed_at__date__gte=this_month_start
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # ==================== SÖZLEŞME STATİSTİKLERİ ====================
-    total_contracts = Contract.objects.count()
-    contracts_this_month = Contract.objects.filter(
-        created_at__date__gte=this_month_start
-    ).count()
-    
-    contracts_by_status = Contract.objects.values('status').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    signed_contracts = Contract.objects.filter(status='completed').count()
-    average_signers_per_contract = Contract.objects.annotate(
-        signer_count=Count('signatures', filter=Q(signatures__is_signed=True))
-    ).aggregate(avg=Count('id'))['avg'] or 0
-    
-    # ==================== ÖDEME STATİSTİKLERİ ====================
-    total_payments = Payment.objects.filter(status='completed').count()
-    pending_payments = Payment.objects.filter(status='pending').count()
-    failed_payments = Payment.objects.filter(status='failed').count()
-    
-    payments_by_type = Payment.objects.filter(
-        status='completed'
-    ).values('payment_type').annotate(
-        count=Count('id'),
-        total=Sum('amount')
-    ).order_by('-total')
-    
-    total_revenue = Payment.objects.filter(
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # ==================== PDF İNDİRME STATİSTİKLERİ ====================
-    total_pdf_accesses = PdfDownloadAccess.objects.count()
-    pdf_revenue = Payment.objects.filter(
-        payment_type='pdf_download',
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # ==================== BİLDİRİM STATİSTİKLERİ ====================
-    unread_notifications = Notification.objects.filter(is_read=False).count()
-    notifications_by_type = Notification.objects.values('notification_type').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
-    
-    # ==================== GRAFIK VERİLERİ ====================
-    # Son 30 günün gelir
-    daily_revenue = []
-    for i in range(29, -1, -1):
-        date = timezone.now() - timedelta(days=i)
-        day_revenue = Payment.objects.filter(
-            status='completed',
-            completed_at__date=date.date()
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        daily_revenue.append({
-            'date': date.strftime('%d.%m'),
-            'revenue': float(day_revenue)
-        })
-    
-    # Son 30 günün sözleşme
-    daily_contracts = []
-    for i in range(29, -1, -1):
-        date = timezone.now() - timedelta(days=i)
-        day_contracts = Contract.objects.filter(
-            created_at__date=date.date()
-        ).count()
-        daily_contracts.append({
-            'date': date.strftime('%d.%m'),
-            'contracts': day_contracts
-        })
-    
-    # ==================== CONTEXT ====================
+    """Admin dashboard - Sistem istatistikleri ve izleme (bölümler widget olarak ayrı yüklenir)"""
     context = {
         'page_title': 'Admin Dashboard',
-        
-        # Kullanıcı İstatistikleri
-        'total_users': total_users,
-        'active_users': active_users,
-        'new_users_this_month': new_users_this_month,
-        'new_users_last_30_days': new_users_last_30_days,
-        
-        # Abonelik
-        'active_subscriptions': active_subscriptions,
-        'subscriptions_by_plan': subscriptions_by_plan,
-        'subscription_revenue': subscription_revenue,
-        'monthly_revenue': monthly_revenue,
-        
-        # Sözleşme
-        'total_contracts': total_contracts,
-        'contracts_this_month': contracts_this_month,
-        'contracts_by_status': contracts_by_status,
-        'signed_contracts': signed_contracts,
-        'average_signers_per_contract': average_signers_per_contract,
-        
-        # Ödeme
-        'total_payments': total_payments,
-        'pending_payments': pending_payments,
-        'failed_payments': failed_payments,
-        'payments_by_type': payments_by_type,
-        'total_revenue': total_revenue,
-        
-        # PDF
-        'total_pdf_accesses': total_pdf_accesses,
-        'pdf_revenue': pdf_revenue,
-        
-        # Bildirim
-        'unread_notifications': unread_notifications,
-        'notifications_by_type': notifications_by_type,
-        
-        # Grafik Verileri
-        'daily_revenue': daily_revenue,
-        'daily_contracts': daily_contracts,
+        'widgets': list(DASHBOARD_WIDGETS),
     }
     
     return render(request, 'admin/dashboard.html', context)
 
 
+@staff_member_required
+@read_only_db
+def admin_dashboard_widget(request, name):
+    """Admin dashboard - tek bir bölümün verisi (önbellekli JSON)"""
+    if name not in DASHBOARD_WIDGETS:
+        raise Http404
+    return JsonResponse(get_widget(name))
+
+
+@staff_member_required
+def admin_query_stats(request):
+    """Admin - View başına sorgu sayısı, veritabanı süresi ve sayfa önbelleği isabet oranı"""
+    if request.method == 'POST':
+        query_stats.reset()
+        page_cache_stats.reset()
+        messages.success(request, 'Sorgu istatistikleri sifirlandi.')
+        return redirect('contracts:admin_query_stats')
+
+    rows = query_stats.summary()
+    page_cache_rows = page_cache_stats.summary()
+    if wants_json(request):
+        return JsonResponse({'views': rows, 'page_cache': page_cache_rows})
+
+    context = {
+        'page_title': 'Sorgu Butceleri',
+        'rows': rows,
+        'page_cache_rows': page_cache_rows,
+        'enabled': getattr(settings, 'QUERY_BUDGET_ENABLED', False),
+        'sample_rate': getattr(settings, 'QUERY_BUDGET_SAMPLE_RATE', 1.0),
+        'window': getattr(settings, 'QUERY_BUDGET_WINDOW', 500),
+    }
+    return render(request, 'admin/query_stats.html', context)
+
+
+# Admin listelerinde seçilebilen sıralamalar (imleç için NULL içermeyen alanlar)
+ADMIN_CONTRACT_SORTS = ('-created_at', 'created_at', 'title', '-title')
+ADMIN_USER_SORTS = ('-date_joined', 'date_joined', 'username', '-username')
+ADMIN_SUBSCRIPTION_SORTS = ('-start_date', 'start_date')
+ADMIN_PAYMENT_SORTS = ('-created_at', 'created_at')
+
+
+def admin_list_page(request, queryset, sort_by):
+    """Admin listeleri için imleç sayfası ve toplam (?count=1 ile kesin, aksi halde tahmini)"""
+    page_obj = paginate(request, queryset, ordering=(sort_by,))
+    if page_obj.count is not None:
+        return page_obj, CountEstimate(page_obj.count)
+    return page_obj, estimated_count(queryset)
+
+
 @staff_member_required
 def admin_contracts_list(request):
     """Admin - Tum sozlesmeler listesi"""
@@ -2244,10 +1953,10 @@ def admin_contracts_list(request):
     status_filter = request.GET.get('status', '')
     creator_filter = request.GET.get('creator', '')
     search = request.GET.get('search', '')
-    sort_by = request.GET.get('sort', '-created_at')
+    sort_by = resolve_sort(request, ADMIN_CONTRACT_SORTS, '-created_at')
     
     # Base queryset
-    contracts = Contract.objects.all()
+    contracts = Contract.objects.select_related('creator')
     
     # Filtreleme uygula
     if status_filter:
@@ -2263,14 +1972,8 @@ def admin_contracts_list(request):
             Q(creator__email__icontains=search)
         )
     
-    # Sirala
-    contracts = contracts.order_by(sort_by)
-    
-    # Sayfalama
-    from django.core.paginator import Paginator
-    paginator = Paginator(contracts, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sayfalama (sıralama imleç üzerinden uygulanır)
+    page_obj, total_count = admin_list_page(request, contracts, sort_by)
     
     # Filtreleme seçenekleri
     status_choices = [
@@ -2286,7 +1989,7 @@ def admin_contracts_list(request):
     
     context = {
         'page_obj': page_obj,
-        'total_count': contracts.count(),
+        'total_count': total_count,
         'status_choices': status_choices,
         'creators': creators,
         'status_filter': status_filter,
@@ -2298,25 +2001,58 @@ def admin_contracts_list(request):
     return render(request, 'admin/contracts_list.html', context)
 
 
+@staff_member_required
+def admin_contracts_export(request):
+    """Admin - Tamamlanan sozlesmelerin PDF'lerini ZIP olarak indir"""
+    from django.utils.dateparse import parse_date
+    from .export import contracts_for_export, stream_contract_pdfs_zip
+
+    try:
+        user_id = int(request.GET['user']) if request.GET.get('user') else None
+        creator_id = int(request.GET['creator']) if request.GET.get('creator') else None
+    except ValueError:
+        return HttpResponse('Gecersiz kullanici', status=400)
+    try:
+        date_from = parse_date(request.GET.get('date_from', ''))
+        date_to = parse_date(request.GET.get('date_to', ''))
+    except ValueError:
+        return HttpResponse('Gecersiz tarih', status=400)
+
+    contracts = contracts_for_export(
+        user=get_object_or_404(User, id=user_id) if user_id is not None else None,
+        creator=get_object_or_404(User, id=creator_id) if creator_id is not None else None,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+    response = StreamingHttpResponse(
+        stream_contract_pdfs_zip(contracts),
+        content_type='application/zip'
+    )
+    filename = f"sozlesmeler_{timezone.now().strftime('%Y%m%d_%H%M')}.zip"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @staff_member_required
 def admin_contract_detail(request, pk):
     """Admin - Sozlesme detaylari"""
-    contract = get_object_or_404(Contract, id=pk)
+    contract = get_object_or_404(Contract.objects.select_related('creator'), id=pk)
     
-    # Taraflar
-    parties = ContractParty.objects.filter(contract=contract)
+    # Taraflar (imzalarıyla birlikte)
+    parties = ContractParty.objects.filter(contract=contract).select_related('user').prefetch_related('signatures')
     
     # İmzalar
-    signatures = ContractSignature.objects.filter(contract=contract)
+    signatures = ContractSignature.objects.filter(contract=contract).select_related('user')
     
     # Yorumlar
-    comments = ContractComment.objects.filter(contract=contract).order_by('-created_at')
+    comments = ContractComment.objects.filter(contract=contract).select_related('user').order_by('-created_at')
     
     # Ödemeler
     payments = Payment.objects.filter(contract=contract)
     
     # PDF erişimi
-    pdf_accesses = PdfDownloadAccess.objects.filter(contract=contract)
+    pdf_accesses = PdfDownloadAccess.objects.filter(contract=contract).select_related('user')
     
     context = {
         'contract': contract,
@@ -2336,7 +2072,7 @@ def admin_users_list(request):
     # Filtreleme
     search = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
-    sort_by = request.GET.get('sort', '-date_joined')
+    sort_by = resolve_sort(request, ADMIN_USER_SORTS, '-date_joined')
     
     # Base queryset
     users = User.objects.all()
@@ -2357,18 +2093,12 @@ def admin_users_list(request):
     elif status_filter == 'staff':
         users = users.filter(is_staff=True)
     
-    # Sirala
-    users = users.order_by(sort_by)
-    
-    # Sayfalama
-    from django.core.paginator import Paginator
-    paginator = Paginator(users, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sayfalama (sıralama imleç üzerinden uygulanır)
+    page_obj, total_count = admin_list_page(request, users, sort_by)
     
     context = {
         'page_obj': page_obj,
-        'total_count': users.count(),
+        'total_count': total_count,
         'search': search,
         'status_filter': status_filter,
         'sort_by': sort_by,
@@ -2418,7 +2148,7 @@ def admin_subscriptions_list(request):
     plan_filter = request.GET.get('plan', '')
     status_filter = request.GET.get('status', '')
     search = request.GET.get('search', '')
-    sort_by = request.GET.get('sort', '-start_date')
+    sort_by = resolve_sort(request, ADMIN_SUBSCRIPTION_SORTS, '-start_date')
     
     # Base queryset
     subscriptions = UserSubscription.objects.select_related('user', 'plan')
@@ -2438,14 +2168,8 @@ def admin_subscriptions_list(request):
             Q(user__last_name__icontains=search)
         )
     
-    # Sirala
-    subscriptions = subscriptions.order_by(sort_by)
-    
-    # Sayfalama
-    from django.core.paginator import Paginator
-    paginator = Paginator(subscriptions, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sayfalama (sıralama imleç üzerinden uygulanır)
+    page_obj, total_count = admin_list_page(request, subscriptions, sort_by)
     
     # Plan seçenekleri
     from .models import SubscriptionPlan
@@ -2453,7 +2177,7 @@ def admin_subscriptions_list(request):
     
     context = {
         'page_obj': page_obj,
-        'total_count': subscriptions.count(),
+        'total_count': total_count,
         'plans': plans,
         'plan_filter': plan_filter,
         'status_filter': status_filter,
@@ -2471,7 +2195,7 @@ def admin_payments_list(request):
     payment_type_filter = request.GET.get('payment_type', '')
     status_filter = request.GET.get('status', '')
     search = request.GET.get('search', '')
-    sort_by = request.GET.get('sort', '-created_at')
+    sort_by = resolve_sort(request, ADMIN_PAYMENT_SORTS, '-created_at')
     
     # Tarih filtreleme
     date_from = request.GET.get('date_from', '')
@@ -2510,14 +2234,8 @@ def admin_payments_list(request):
         except:
             pass
     
-    # Sirala
-    payments = payments.order_by(sort_by)
-    
-    # Sayfalama
-    from django.core.paginator import Paginator
-    paginator = Paginator(payments, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sayfalama (sıralama imleç üzerinden uygulanır)
+    page_obj, total_count = admin_list_page(request, payments, sort_by)
     
     # İstatistikler
     total_amount = payments.filter(status='completed').aggregate(
@@ -2526,7 +2244,7 @@ def admin_payments_list(request):
     
     context = {
         'page_obj': page_obj,
-        'total_count': payments.count(),
+        'total_count': total_count,
         'total_amount': total_amount,
         'payment_type_filter': payment_type_filter,
         'status_filter': status_filter,
@@ -0,0 +1,160 @@
+"""
+Admin dashboard widget'ları.
+
+Her bölüm ayrı bir JSON uç noktasından yüklenir ve sonucu önbellekte
+DASHBOARD_WIDGET_TTL saniye tutulur. İlgili modellerden biri kaydedildiğinde
+veya silindiğinde o modele bağlı widget'lar önbellekten düşürülür
+(transaction commit edildikten sonra). Önbellek süreç içi (LocMemCache) ise
+diğer süreçlerdeki kopyalar en geç TTL sonunda yenilenir.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .metrics import dashboard_metrics
+
+CACHE_PREFIX = 'dashboard:widget:'
+METRICS_KEY = 'dashboard:metrics'
+# Ortak özetin (dashboard_metrics) anlık hesaplanan kısmını değiştiren modeller;
+# bildirim sayıları gibi diğerleri TTL sonunda yenilenir
+METRICS_DEPENDENCIES = {'user', 'contract', 'payment'}
+
+DASHBOARD_WIDGETS = {}
+# model adı (_meta.model_name) -> etkilenen widget adları
+WIDGET_DEPENDENCIES = {}
+
+
+def widget(name, depends_on):
+    """Widget kaydı; depends_on: verisini etkileyen modellerin adları"""
+    def register(func):
+        DASHBOARD_WIDGETS[name] = func
+        for model_name in depends_on:
+            WIDGET_DEPENDENCIES.setdefault(model_name, set()).add(name)
+        return func
+    return register
+
+
+def widget_ttl():
+    return getattr(settings, 'DASHBOARD_WIDGET_TTL', 300)
+
+
+def cached_metrics():
+    """Widget'ların paylaştığı günlük özetler (tek hesaplama)"""
+    return cache.get_or_set(METRICS_KEY, dashboard_metrics, widget_ttl())
+
+
+def get_widget(name):
+    """Widget verisi; bilinmeyen ad için KeyError"""
+    return cache.get_or_set(CACHE_PREFIX + name, DASHBOARD_WIDGETS[name], widget_ttl())
+
+
+def invalidate_widgets(*model_names):
+    """Modellere bağlı widget'ları (ve özeti besliyorlarsa ortak özetleri) önbellekten düşür"""
+    keys = set()
+    if METRICS_DEPENDENCIES & set(model_names):
+        keys.add(METRICS_KEY)
+    for model_name in model_names:
+        keys.update(CACHE_PREFIX + name for name in WIDGET_DEPENDENCIES.get(model_name, ()))
+    # Commit'ten önce silinirse eşzamanlı bir istek eski veriyi tekrar önbelleğe yazabilir
+    transaction.on_commit(lambda: cache.delete_many(list(keys)))
+
+
+def invalidate_all_widgets():
+    invalidate_widgets(*WIDGET_DEPENDENCIES)
+
+
+def _money(value):
+    return float(value or 0)
+
+
+# ==================== WIDGET'LAR ====================
+
+@widget('users', depends_on=['user'])
+def users_widget():
+    counts = User.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True))
+    )
+    metrics = cached_metrics()
+    return {
+        'total_users': counts['total'],
+        'active_users': counts['active'],
+        'new_users_this_month': metrics['new_users_this_month'],
+        'new_users_last_30_days': metrics['new_users_last_30_days'],
+    }
+
+
+@widget('subscriptions', depends_on=['usersubscription', 'payment'])
+def subscriptions_widget():
+    from .models import UserSubscription
+
+    subscriptions_by_plan = list(
+        UserSubscription.objects.values('plan__name').annotate(
+            count=Count('id'),
+            active=Count('id', filter=Q(status='active'))
+        ).order_by('-count')
+    )
+    return {
+        'active_subscriptions': sum(plan['active'] for plan in subscriptions_by_plan),
+        'subscription_revenue': _money(cached_metrics()['subscription_revenue']),
+        'subscriptions_by_plan': subscriptions_by_plan,
+    }
+
+
+@widget('contracts', depends_on=['contract'])
+def contracts_widget():
+    metrics = cached_metrics()
+    return {
+        'total_contracts': metrics['total_contracts'],
+        'contracts_this_month': metrics['contracts_this_month'],
+        'signed_contracts': metrics['signed_contracts'],
+        'contracts_completed_this_month': metrics['contracts_completed_this_month'],
+        'contracts_by_status': metrics['contracts_by_status'],
+    }
+
+
+@widget('payments', depends_on=['payment'])
+def payments_widget():
+    metrics = cached_metrics()
+    return {
+        'total_revenue': _money(metrics['total_revenue']),
+        'monthly_revenue': _money(metrics['monthly_revenue']),
+        'total_payments': metrics['total_payments'],
+        'pending_payments': metrics['pending_payments'],
+        'failed_payments': metrics['failed_payments'],
+        'payments_by_type': [
+            {**item, 'total': _money(item['total'])} for item in metrics['payments_by_type']
+        ],
+    }
+
+
+@widget('pdf', depends_on=['pdfdownloadaccess', 'payment'])
+def pdf_widget():
+    from .models import PdfDownloadAccess
+
+    return {
+        'total_pdf_accesses': PdfDownloadAccess.objects.count(),
+        'pdf_revenue': _money(cached_metrics()['pdf_revenue']),
+    }
+
+
+@widget('notifications', depends_on=['notification'])
+def notifications_widget():
+    from .models import Notification
+
+    return {
+        'unread_notifications': Notification.objects.filter(is_read=False).count(),
+        'notifications_by_type': cached_metrics()['notifications_by_type'],
+    }
+
+
+@widget('revenue_chart', depends_on=['payment'])
+def revenue_chart_widget():
+    return {'daily_revenue': cached_metrics()['daily_revenue']}
+
+
+@widget('contracts_chart', depends_on=['contract'])
+def contracts_chart_widget():
+    return {'daily_contracts': cached_metrics()['daily_contracts']}
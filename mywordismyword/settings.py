@@ -61,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'contracts.middleware.InboxSummaryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -95,11 +96,28 @@ WSGI_APPLICATION = 'mywordismyword.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'contracts.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Yazma transaction'ları kilidi baştan alır; okuma kilidinden yazmaya
+            # geçerken busy_timeout beklenmeden "database is locked" oluşmaz
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Sadece okuma bağlantısı (contracts.routers.ReadOnlyRouter, @read_only_db view'ları)
+    'readonly': {
+        'ENGINE': 'contracts.sqlite',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'read_only': True,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['contracts.routers.ReadOnlyRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
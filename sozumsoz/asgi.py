@@ -3,6 +3,17 @@ ASGI config for mywordismyword project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The notification stream (``/api/notifications/stream/``) keeps a long-lived
+Server-Sent Events connection open, so production should serve the project
+through this module with an ASGI server, e.g.::
+
+    uvicorn sozumsoz.asgi:application
+
+Events are distributed by the in-process broker in ``contracts.events``;
+run a single worker process per host or clients only see events raised in
+their own worker. Under WSGI the stream answers 503 and clients fall back
+to ``/api/notifications/poll/``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
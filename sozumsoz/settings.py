@@ -78,10 +78,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'contracts.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'contracts.middleware.InboxSummaryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -116,11 +118,32 @@ WSGI_APPLICATION = 'sozumsoz.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'contracts.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Yazma transaction'ları kilidi baştan alır; okuma kilidinden yazmaya
+            # geçerken busy_timeout beklenmeden "database is locked" oluşmaz
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Dosya tabanlı test veritabanı: eşzamanlılık testleri birden fazla bağlantı açabilsin
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # Sadece okuma bağlantısı (contracts.routers.ReadOnlyRouter, @read_only_db view'ları)
+    'readonly': {
+        'ENGINE': 'contracts.sqlite',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'read_only': True,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['contracts.routers.ReadOnlyRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -247,10 +270,62 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 
+# E-posta kuyruğu (process_outbox komutu)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_BACKOFF = config('EMAIL_OUTBOX_RETRY_BACKOFF', default=60, cast=int)
+
+# Bildirim akışı (SSE, sadece ASGI altında) ve long-polling yedeği
+NOTIFICATION_STREAM_KEEPALIVE = config('NOTIFICATION_STREAM_KEEPALIVE', default=15, cast=int)
+NOTIFICATION_LONG_POLL_TIMEOUT = config('NOTIFICATION_LONG_POLL_TIMEOUT', default=25, cast=int)
+
+# Sözleşme listeleri (imleç tabanlı sayfalama)
+CONTRACT_LIST_PAGE_SIZE = config('CONTRACT_LIST_PAGE_SIZE', default=20, cast=int)
+CONTRACT_LIST_MAX_PAGE_SIZE = config('CONTRACT_LIST_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Dashboard metrikleri (rollup_metrics komutu): her çalıştırmada yeniden hesaplanan son gün sayısı
+DAILY_METRICS_REFRESH_DAYS = config('DAILY_METRICS_REFRESH_DAYS', default=7, cast=int)
+# Dashboard widget'larının önbellek süresi (saniye); ilgili modeller değişince erken temizlenir
+DASHBOARD_WIDGET_TTL = config('DASHBOARD_WIDGET_TTL', default=300, cast=int)
+
+# Anonim sayfa önbelleği (ana sayfa, sözleşme havuzu); halka açık sözleşmeler değişince erken temizlenir
+PUBLIC_PAGE_CACHE_TTL = config('PUBLIC_PAGE_CACHE_TTL', default=300, cast=int)
+# Tarayıcı ve ters vekil önbellekleri için Cache-Control max-age (geçersiz kılma onlara ulaşmaz)
+PUBLIC_PAGE_CACHE_MAX_AGE = config('PUBLIC_PAGE_CACHE_MAX_AGE', default=60, cast=int)
+# Sayfa önbelleği sürümünün veritabanından yeniden okunma aralığı (saniye); diğer worker'ların gecikme üst sınırı
+PUBLIC_PAGE_VERSION_TTL = config('PUBLIC_PAGE_VERSION_TTL', default=5, cast=int)
+# contract_detail şablon parçaları; sözleşme, taraf, imza veya yorum değişince erken temizlenir
+CONTRACT_FRAGMENT_CACHE_TTL = config('CONTRACT_FRAGMENT_CACHE_TTL', default=3600, cast=int)
+
+# Sorgu bütçesi ölçümü (QueryBudgetMiddleware); üretimde örnekleme ile açılır
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=DEBUG, cast=bool)
+QUERY_BUDGET_SAMPLE_RATE = config('QUERY_BUDGET_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float)
+QUERY_BUDGET_WINDOW = config('QUERY_BUDGET_WINDOW', default=500, cast=int)
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=30, cast=int)
+# URL adına göre bütçeler (varsayılandan farklı olanlar)
+QUERY_BUDGETS = {
+    # Sözleşme, taraf, imza ve bildirim kayıtlarını birlikte yazan POST'lar
+    'contracts:contract_create': 64,
+    'contracts:declined_contract_recreate': 50,
+    'contracts:add_contract_party': 33,
+    'contracts:contract_pool': 15,
+    'contracts:my_contracts': 15,
+    'contracts:signed_contracts': 15,
+    'contracts:invited_contracts': 15,
+    'contracts:declined_contracts': 15,
+    'contracts:admin_dashboard_widget': 20,
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Sözleşme PDF önbelleği (media dışında tutulur, doğrudan servis edilmez)
+CONTRACT_PDF_CACHE_DIR = config('CONTRACT_PDF_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'pdf'))
+CONTRACT_PDF_CACHE_MAX_BYTES = config('CONTRACT_PDF_CACHE_MAX_BYTES', default=200 * 1024 * 1024, cast=int)
+# Toplu PDF dışa aktarımında paralel süreç sayısı (0: CPU sayısı)
+CONTRACT_PDF_EXPORT_WORKERS = config('CONTRACT_PDF_EXPORT_WORKERS', default=0, cast=int)
+
 # Static files
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
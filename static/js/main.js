@@ -338,13 +338,72 @@ function loadMoreContracts() {
  * Bildirim sistemi
  */
 function setupNotifications() {
+    // Kullanıcı giriş yapmamışsa çalışmasın
+    if (!document.body.hasAttribute('data-user-authenticated')) {
+        return;
+    }
+
     // Sayfa yüklendiğinde bir kez çalıştır
     updateNotificationCounts();
 
-    // Her 30 saniyede bir bildirimleri güncelle
-    setInterval(() => {
-        updateNotificationCounts();
-    }, 30000);
+    // Sunucu değişiklikleri SSE ile iter; desteklenmiyorsa aralıklı yoklama
+    if (window.EventSource) {
+        openNotificationStream();
+    } else {
+        startNotificationPolling();
+    }
+}
+
+/**
+ * SSE bildirim akışı
+ */
+function openNotificationStream() {
+    const source = new EventSource('/api/notifications/stream/');
+
+    source.addEventListener('counts', event => {
+        applyNotificationCounts(JSON.parse(event.data));
+    });
+
+    source.addEventListener('notification', event => {
+        const data = JSON.parse(event.data);
+        applyNotificationCounts(data);
+        handleIncomingNotification(data.notification);
+    });
+
+    source.onerror = () => {
+        // Tarayıcı bağlantıyı kendisi yeniler; sunucu akışı reddettiyse (ör. WSGI'da 503) yoklamaya geç
+        if (source.readyState === EventSource.CLOSED) {
+            console.warn('Bildirim akışı kapandı, aralıklı yoklama kullanılıyor');
+            startNotificationPolling();
+        }
+    };
+}
+
+/**
+ * Aralıklı yoklama: sayaç uç noktası ETag ile doğrulanır, değişiklik yoksa
+ * sunucu 304 döner. Long-polling zincirinin aksine worker'ı bekletmez.
+ */
+const NOTIFICATION_POLL_INTERVAL = 30000;
+let notificationPollTimer = null;
+
+function startNotificationPolling() {
+    if (notificationPollTimer) return;
+    notificationPollTimer = setInterval(updateNotificationCounts, NOTIFICATION_POLL_INTERVAL);
+}
+
+/**
+ * Yeni gelen bildirimi göster
+ */
+function handleIncomingNotification(notification) {
+    if (!notification) return;
+
+    showToast(notification.title, 'info');
+
+    // Dropdown açıksa listeyi yenile
+    const dropdown = document.getElementById('notificationDropdown');
+    if (dropdown && dropdown.classList.contains('show')) {
+        loadNotificationDropdown();
+    }
 }
 
 /**
@@ -373,21 +432,7 @@ function updateNotificationCounts() {
     })
     .then(data => {
         console.log('📊 Bildirim verileri:', data);
-        
-        if (data.invited_contracts_count !== undefined) {
-            console.log(`✉️ Davet edildiğim: ${data.invited_contracts_count}`);
-            updateNotificationBadge('invited-contracts-count', data.invited_contracts_count);
-        }
-        if (data.declined_contracts_count !== undefined) {
-            console.log(`Red edilenler: ${data.declined_contracts_count}`);
-            updateNotificationBadge('declined-contracts-count', data.declined_contracts_count);
-            updateNotificationBadge('declined-contracts-count-warning', data.declined_contracts_count);
-        }
-        if (data.unread_notifications_count !== undefined) {
-            console.log(`Okunmamis bildirimler: ${data.unread_notifications_count}`);
-            updateNotificationBadge('unread-notifications-count', data.unread_notifications_count);
-        }
-        
+        applyNotificationCounts(data);
         console.log('Bildirimler güncellendi');
     })
     .catch(error => {
@@ -395,6 +440,24 @@ function updateNotificationCounts() {
     });
 }
 
+/**
+ * Gelen sayaçları rozetlere uygula (sadece gönderilen alanlar güncellenir)
+ */
+function applyNotificationCounts(data) {
+    if (!data) return;
+
+    if (data.invited_contracts_count !== undefined) {
+        updateNotificationBadge('invited-contracts-count', data.invited_contracts_count);
+    }
+    if (data.declined_contracts_count !== undefined) {
+        updateNotificationBadge('declined-contracts-count', data.declined_contracts_count);
+        updateNotificationBadge('declined-contracts-count-warning', data.declined_contracts_count);
+    }
+    if (data.unread_notifications_count !== undefined) {
+        updateNotificationBadge('unread-notifications-count', data.unread_notifications_count);
+    }
+}
+
 /**
  * Bildirim rozetini güncelle
  */
@@ -603,6 +666,25 @@ function throttle(func, limit) {
     };
 }
 
+/**
+ * Geçen süre ("5 dakika önce"); Notification.time_since_created ile aynı biçim.
+ * Sunucu zaman damgası döndürür, böylece önbellekten (304) gelen yanıt eskimez.
+ */
+function timeSince(isoString) {
+    const seconds = Math.max(0, Math.floor((Date.now() - new Date(isoString).getTime()) / 1000));
+    const days = Math.floor(seconds / 86400);
+    const rest = seconds % 86400;
+
+    if (days > 0) {
+        return `${days} gün önce`;
+    } else if (rest > 3600) {
+        return `${Math.floor(rest / 3600)} saat önce`;
+    } else if (rest > 60) {
+        return `${Math.floor(rest / 60)} dakika önce`;
+    }
+    return 'Az önce';
+}
+
 /**
  * Local storage helper
  */
@@ -664,7 +746,7 @@ function loadNotificationDropdown() {
                                 <div class="flex-grow-1">
                                     <div class="fw-bold small">${notification.title}</div>
                                     <div class="text-muted small">${notification.message.substring(0, 60)}...</div>
-                                    <small class="text-muted">${notification.time_since_created}</small>
+                                    <small class="text-muted">${timeSince(notification.created_at)}</small>
                                 </div>
                                 ${!notification.is_read ? '<span class="badge bg-primary">Yeni</span>' : ''}
                             </div>
@@ -747,6 +829,7 @@ window.SozumSozum = {
     showErrorMessage,
     copyToClipboard,
     updateNotificationCounts,
+    applyNotificationCounts,
     updateNotificationBadge,
     loadNotificationDropdown,
     markNotificationAsRead,